@@ -0,0 +1,160 @@
+"""Fail when the benchmarks regress from a stored baseline.
+
+Run from the NApp directory, for instance:
+
+    python -m benchmarks.compare
+    python -m benchmarks.compare --record
+
+The scenarios of benchmarks.run are run several times with the options
+the baseline was recorded with, and each statistic is the median of the
+runs, so a single slow run does not fail the gate. A scenario regresses
+when its latencies or peak memory grow, or its throughput drops, by more
+than its tolerance. Recording runs the scenarios the same way and writes
+the medians as the new baseline.
+"""
+import argparse
+import json
+import os
+import sys
+from statistics import median
+
+from benchmarks.run import print_stats, run_benchmarks
+
+# Relative changes tolerated, and differences too small to tell apart
+# from noise whatever their relative change.
+TOLERANCES = {"default": {"p50_ms": 0.25, "p99_ms": 0.5, "throughput": 0.2,
+                          "peak_memory_kib": 0.3, "min_ms": 0.05,
+                          "min_kib": 16}}
+
+OPTIONS = ("topologies", "size", "queries", "max_paths", "builds", "flaps",
+           "seed")
+
+
+def median_runs(runs, **options):
+    """Run the benchmarks several times and return the median statistics."""
+    results = [run_benchmarks(**options) for _ in range(runs)]
+    scenarios = {}
+    for name in results[0]["scenarios"]:
+        stats = [result["scenarios"][name] for result in results]
+        scenarios[name] = {key: median(run[key] for run in stats)
+                           for key in stats[0]}
+    return {"meta": dict(results[0]["meta"], runs=runs),
+            "scenarios": scenarios}
+
+
+def tolerance(tolerances, name):
+    """Return the tolerances of a scenario.
+
+    Tolerances given for the whole name, such as "grid/shortest_paths",
+    override those given for the scenario of every topology, such as
+    "shortest_paths", which override the defaults.
+    """
+    merged = dict(TOLERANCES["default"])
+    merged.update(tolerances.get("default", {}))
+    merged.update(tolerances.get(name.split("/", 1)[-1], {}))
+    merged.update(tolerances.get(name, {}))
+    return merged
+
+
+def regressions(baseline, current, tolerances=None):
+    """Return the statistics of current that regressed from baseline.
+
+    Each regression is a (scenario, statistic, baseline value, current
+    value, relative change) tuple.
+    """
+    found = []
+    for name, stats in sorted(current["scenarios"].items()):
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        limits = tolerance(tolerances or {}, name)
+        for key, floor in (("p50_ms", "min_ms"), ("p99_ms", "min_ms"),
+                           ("peak_memory_kib", "min_kib")):
+            change = stats[key] - before[key]
+            if change > limits[floor] and \
+                    change > limits[key] * before[key]:
+                found.append((name, key, before[key], stats[key],
+                              change / before[key] if before[key] else 0))
+        if stats["throughput"] < before["throughput"] * \
+                (1 - limits["throughput"]):
+            found.append((name, "throughput", before["throughput"],
+                          stats["throughput"],
+                          stats["throughput"] / before["throughput"] - 1))
+    return found
+
+
+def report(baseline, current, found):
+    """Return the readable diff of the regressions found."""
+    lines = []
+    missing = sorted(set(baseline["scenarios"]) - set(current["scenarios"]))
+    added = sorted(set(current["scenarios"]) - set(baseline["scenarios"]))
+    if missing:
+        lines.append(f"Not run: {', '.join(missing)}")
+    if added:
+        lines.append(f"Not in the baseline: {', '.join(added)}")
+    if not found:
+        lines.append(f"No regression in {len(current['scenarios'])} "
+                     f"scenarios.")
+        return "\n".join(lines)
+    lines.append(f"{len(found)} regressions:")
+    lines.append(f"  {'scenario':55} {'statistic':16} {'baseline':>12} "
+                 f"{'current':>12} {'change':>8}")
+    for name, key, before, after, change in found:
+        lines.append(f"- {name:55} {key:16} {before:12.3f} {after:12.3f} "
+                     f"{change:+8.1%}")
+    return "\n".join(lines)
+
+
+def parser():
+    """Return the parser of the command line options."""
+    options = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    options.add_argument("--baseline", default="benchmarks/baseline.json",
+                         help="JSON file of the baseline")
+    options.add_argument("--tolerances",
+                         default="benchmarks/tolerances.json",
+                         help="JSON file of tolerances by scenario")
+    options.add_argument("--runs", type=int, default=5,
+                         help="runs whose median is compared")
+    options.add_argument("--record", action="store_true",
+                         help="write the medians as the new baseline")
+    for option in OPTIONS:
+        options.add_argument(f"--{option.replace('_', '-')}",
+                             nargs="+" if option == "topologies" else None,
+                             type=None if option == "topologies" else int,
+                             help="default: the option of the baseline")
+    return options
+
+
+def main(argv=None):
+    """Compare or record the baseline, returning the exit status."""
+    args = parser().parse_args(argv)
+    baseline = None
+    if not args.record:
+        with open(args.baseline) as source:
+            baseline = json.load(source)
+    options = {option: getattr(args, option) for option in OPTIONS}
+    for option, value in options.items():
+        if value is None and baseline is not None:
+            options[option] = baseline["meta"].get(option)
+    options = {option: value for option, value in options.items()
+               if value is not None}
+    current = median_runs(args.runs, **options)
+    for name, stats in current["scenarios"].items():
+        print_stats(name, stats)
+    if args.record:
+        with open(args.baseline, "w") as output:
+            json.dump(current, output, indent=2, sort_keys=True)
+            output.write("\n")
+        print(f"Baseline written to {args.baseline}.")
+        return 0
+    tolerances = {}
+    if os.path.exists(args.tolerances):
+        with open(args.tolerances) as source:
+            tolerances = json.load(source)
+    found = regressions(baseline, current, tolerances)
+    print(report(baseline, current, found))
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
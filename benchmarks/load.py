@@ -0,0 +1,254 @@
+"""Replay path queries against the REST endpoints of Main under load.
+
+Run from the NApp directory, for instance:
+
+    python -m benchmarks.load --topology isp --size 500 --concurrency 8
+    python -m benchmarks.load --queries recorded.jsonl --duration 600
+
+Worker threads post the queries to the v2 and v3 endpoints through Flask
+test clients for a given duration, while links of the topology go down
+and up again and kytos.topology.updated events reach Main. Queries are
+recorded ones, one JSON object per line with the "endpoint" ("v2" or
+"v3") and the "body" of the request, or a synthetic mix over random
+pairs of switches. The report gives the latency percentiles and error
+rates of each endpoint, and the throughput while the graph was being
+updated compared with the rest of the run.
+"""
+import argparse
+import json
+import sys
+from functools import wraps
+from itertools import count
+from random import Random
+from threading import Event, Lock, Thread
+from time import perf_counter, sleep
+from unittest.mock import Mock
+
+from flask import Flask
+
+from benchmarks.run import METRICS, percentile
+from benchmarks.topologies import GENERATORS
+from main import Main
+
+PREFIX = "/api/kytos/pathfinder"
+
+
+def build_app(napp):
+    """Return a Flask app routing the path endpoints to a Main NApp."""
+    app = Flask(__name__)
+    app.add_url_rule(f"{PREFIX}/v2/", "v2", napp.shortest_path,
+                     methods=["POST"])
+    app.add_url_rule(f"{PREFIX}/v3/", "v3", napp.shortest_constrained_path,
+                     methods=["POST"])
+    return app
+
+
+def synthetic_queries(switches, number=200, constrained=0.3, max_paths=8,
+                      seed=0):
+    """Return a mix of v2 and v3 queries between random switches.
+
+    A fraction constrained of the queries are v3 queries relaxing up to
+    two of the benchmark metrics, and half of the v2 queries are weighted
+    by delay.
+    """
+    random = Random(seed)
+    names = sorted(switches)
+    queries = []
+    for _ in range(number):
+        source, destination = random.sample(names, 2)
+        body = {"source": source, "destination": destination,
+                "max_paths": max_paths}
+        if random.random() < constrained:
+            body.update(metrics=METRICS, flexible=random.randint(0, 2))
+            queries.append({"endpoint": "v3", "body": body})
+            continue
+        if random.random() < 0.5:
+            body["parameter"] = "delay"
+        queries.append({"endpoint": "v2", "body": body})
+    return queries
+
+
+def recorded_queries(path):
+    """Return the queries recorded in a JSON lines file."""
+    with open(path) as source:
+        return [json.loads(line) for line in source if line.strip()]
+
+
+class LoadRun:
+    """One load run: the requests and the topology updates it saw."""
+
+    def __init__(self, napp, topology, queries, concurrency=4, duration=10,
+                 update_interval=1.0, seed=0):
+        self.napp = napp
+        self.topology = topology
+        self.queries = queries
+        self.concurrency = concurrency
+        self.duration = duration
+        self.update_interval = update_interval
+        self.random = Random(seed)
+        self.requests = []
+        self.updates = []
+        self._lock = Lock()
+        self._stop = Event()
+        self._next = count()
+
+    def run(self):
+        """Drive the load and return the report of the run."""
+        graph = self.napp.graph
+        update = graph.update_topology
+
+        @wraps(update)
+        def timed_update(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return update(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.updates.append((start, perf_counter()))
+        graph.update_topology = timed_update
+        app = build_app(self.napp)
+        threads = [Thread(target=self._worker, args=(app.test_client(),))
+                   for _ in range(self.concurrency)]
+        if self.update_interval:
+            threads.append(Thread(target=self._flapper))
+        start = perf_counter()
+        for thread in threads:
+            thread.start()
+        sleep(self.duration)
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+        self.napp._updates.flush()
+        del graph.update_topology
+        return self.report(perf_counter() - start)
+
+    def _worker(self, client):
+        """Post queries until the run is over."""
+        while not self._stop.is_set():
+            query = self.queries[next(self._next) % len(self.queries)]
+            start = perf_counter()
+            try:
+                status = client.post(f"{PREFIX}/{query['endpoint']}/",
+                                     json=query["body"]).status_code
+            except Exception:  # pylint: disable=broad-except
+                status = None
+            with self._lock:
+                self.requests.append((query["endpoint"], start,
+                                      perf_counter(), status))
+
+    def _flapper(self):
+        """Take a random link down or up again at every interval."""
+        links = list(self.topology.links.values())
+        while not self._stop.wait(self.update_interval):
+            link = self.random.choice(links)
+            link.is_active.return_value = not link.is_active()
+            self.napp.update_topology(Mock(content={
+                "topology": self.topology}))
+        for link in links:
+            link.is_active.return_value = True
+
+    def report(self, elapsed):
+        """Return the statistics of the requests and of the updates."""
+        def overlaps(start, end):
+            return any(start < update_end and update_start < end
+                       for update_start, update_end in self.updates)
+
+        endpoints = {}
+        for endpoint in sorted({request[0] for request in self.requests}):
+            done = [request for request in self.requests
+                    if request[0] == endpoint]
+            latencies = [end - start for _, start, end, _ in done]
+            errors = sum(1 for *_, status in done if status != 200)
+            endpoints[endpoint] = {
+                "requests": len(done), "error_rate": errors / len(done),
+                "p50_ms": 1000 * percentile(latencies, 0.5),
+                "p90_ms": 1000 * percentile(latencies, 0.9),
+                "p99_ms": 1000 * percentile(latencies, 0.99),
+                "max_ms": 1000 * max(latencies)}
+        updating = sum(end - start for start, end in self.updates)
+        during = sum(1 for _, start, end, _ in self.requests
+                     if overlaps(start, end))
+        outside = len(self.requests) - during
+        return {"elapsed_s": elapsed, "requests": len(self.requests),
+                "throughput": len(self.requests) / elapsed,
+                "endpoints": endpoints,
+                "updates": {
+                    "applied": len(self.updates),
+                    "time_s": updating,
+                    "events": self.napp._updates.stats,
+                    "throughput_during": during / updating
+                    if updating else None,
+                    "throughput_outside": outside / (elapsed - updating)
+                    if elapsed > updating else None}}
+
+
+def loaded_napp(topology):
+    """Return a Main NApp with the topology applied to its graph."""
+    napp = Main.__new__(Main)
+    napp.setup()
+    napp.update_topology(Mock(content={"topology": topology}))
+    napp._updates.flush()
+    return napp
+
+
+def run_load(topology="isp", size=200, queries=None, concurrency=4,
+             duration=10, update_interval=1.0, constrained=0.3,
+             max_paths=8, seed=0):
+    """Run the load harness and return its report.
+
+    Queries is the path of recorded queries, or None for a synthetic mix.
+    """
+    switches, links = GENERATORS[topology](size, seed)
+    topology = Mock(switches=switches, links=links)
+    if queries is None:
+        queries = synthetic_queries(switches, constrained=constrained,
+                                    max_paths=max_paths, seed=seed)
+    else:
+        queries = recorded_queries(queries)
+    napp = loaded_napp(topology)
+    try:
+        return LoadRun(napp, topology, queries, concurrency, duration,
+                       update_interval, seed).run()
+    finally:
+        napp.shutdown()
+
+
+def parser():
+    """Return the parser of the command line options."""
+    options = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    options.add_argument("--topology", default="isp",
+                         choices=list(GENERATORS))
+    options.add_argument("--size", type=int, default=200,
+                         help="approximate number of switches")
+    options.add_argument("--queries",
+                         help="JSON lines file of recorded queries")
+    options.add_argument("--concurrency", type=int, default=4,
+                         help="threads posting queries")
+    options.add_argument("--duration", type=float, default=10,
+                         help="seconds of load")
+    options.add_argument("--update-interval", type=float, default=1.0,
+                         help="seconds between link flaps, 0 for none")
+    options.add_argument("--constrained", type=float, default=0.3,
+                         help="fraction of synthetic v3 queries")
+    options.add_argument("--max-paths", type=int, default=8)
+    options.add_argument("--seed", type=int, default=0)
+    options.add_argument("--output", help="JSON file written with the report")
+    return options
+
+
+def main(argv=None):
+    """Run the load harness and print its report."""
+    args = parser().parse_args(argv)
+    report = run_load(args.topology, args.size, args.queries,
+                      args.concurrency, args.duration, args.update_interval,
+                      args.constrained, args.max_paths, args.seed)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
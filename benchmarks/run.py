@@ -0,0 +1,171 @@
+"""Time the pathfinder graph operations on synthetic topologies.
+
+Run from the NApp directory, for instance:
+
+    python -m benchmarks.run --size 1000 --output baseline.json
+
+Every scenario runs its operation a number of times on one topology and
+records the throughput, the 50th and 99th percentile latencies and the
+peak memory allocated. Memory is measured with tracemalloc in a separate,
+shorter pass, so tracing does not slow down the timed one. Searches run
+without the path cache.
+"""
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from math import ceil
+from random import Random
+from time import perf_counter
+from unittest.mock import Mock
+
+import networkx as nx
+
+from benchmarks.topologies import GENERATORS
+from graph import KytosGraph
+
+METRICS = {"bandwidth": 40, "delay": 40, "reliability": 2, "ownership": "A"}
+
+MEMORY_CALLS = 10
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[max(0, ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(calls):
+    """Time each call and return the statistics of a scenario."""
+    latencies = []
+    for call in calls:
+        start = perf_counter()
+        call()
+        latencies.append(perf_counter() - start)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for call in calls[:MEMORY_CALLS]:
+            call()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    total = sum(latencies)
+    return {"operations": len(calls),
+            "throughput": len(calls) / total if total else 0.0,
+            "p50_ms": 1000 * percentile(latencies, 0.5),
+            "p99_ms": 1000 * percentile(latencies, 0.99),
+            "peak_memory_kib": peak / 1024}
+
+
+def scenarios(switches, links, queries=50, max_paths=8, builds=3, flaps=10,
+              seed=0):
+    """Yield the name and the calls of every scenario of a topology."""
+    topology = Mock(switches=switches, links=links)
+
+    def build():
+        graph = KytosGraph(cache_size=0)
+        graph.update_topology(topology)
+        graph.shutdown()
+    yield "update_topology", [build] * builds
+
+    graph = KytosGraph(cache_size=0)
+    graph.update_topology(topology)
+    random = Random(seed)
+    names = sorted(switches)
+    pairs = [random.sample(names, 2) for _ in range(queries)]
+    yield "shortest_paths", [
+        lambda pair=pair: graph.shortest_paths(*pair, max_paths=max_paths)
+        for pair in pairs]
+    yield "shortest_paths[delay]", [
+        lambda pair=pair: graph.shortest_paths(*pair, "delay",
+                                               max_paths=max_paths)
+        for pair in pairs]
+    for flexible in range(len(METRICS) + 1):
+        yield f"constrained_flexible_paths[flexible={flexible}]", [
+            lambda pair=pair, flexible=flexible:
+            graph.constrained_flexible_paths(*pair, flexible,
+                                             max_paths=max_paths, **METRICS)
+            for pair in pairs]
+    yield "_filter_edges", [lambda: graph._filter_edges(**METRICS)] * queries
+
+    def flap(link):
+        link.is_active.return_value = False
+        graph.update_topology(topology)
+        link.is_active.return_value = True
+        graph.update_topology(topology)
+    yield "update_topology[flap]", [
+        lambda link=link: flap(link)
+        for link in random.sample(list(links.values()),
+                                  min(flaps, len(links)))]
+    graph.shutdown()
+
+
+def run_benchmarks(topologies=tuple(GENERATORS), size=200, queries=50,
+                   max_paths=8, builds=3, flaps=10, seed=0, report=None):
+    """Run the scenarios of every topology and return their statistics.
+
+    Scenarios are named <topology>/<scenario>, and report, when given,
+    is called with the name and the statistics of each one.
+    """
+    results = {}
+    for name in topologies:
+        switches, links = GENERATORS[name](size, seed)
+        for scenario, calls in scenarios(switches, links, queries,
+                                         max_paths, builds, flaps, seed):
+            stats = measure(calls)
+            results[f"{name}/{scenario}"] = stats
+            if report is not None:
+                report(f"{name}/{scenario}", stats)
+    return {"meta": {"topologies": list(topologies),
+                     "python": platform.python_version(),
+                     "networkx": nx.__version__,
+                     "machine": platform.machine(), "size": size,
+                     "queries": queries, "max_paths": max_paths,
+                     "builds": builds, "flaps": flaps, "seed": seed},
+            "scenarios": results}
+
+
+def print_stats(name, stats):
+    """Print the statistics of a scenario on one line."""
+    print(f"{name:55} {stats['throughput']:10.1f}/s "
+          f"p50 {stats['p50_ms']:9.3f}ms p99 {stats['p99_ms']:9.3f}ms "
+          f"{stats['peak_memory_kib']:10.1f}KiB")
+
+
+def parser():
+    """Return the parser of the command line options."""
+    options = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    options.add_argument("--topologies", nargs="+", default=list(GENERATORS),
+                         choices=list(GENERATORS))
+    options.add_argument("--size", type=int, default=200,
+                         help="approximate number of switches")
+    options.add_argument("--queries", type=int, default=50,
+                         help="path queries of each scenario")
+    options.add_argument("--max-paths", type=int, default=8,
+                         help="paths returned by each query")
+    options.add_argument("--builds", type=int, default=3,
+                         help="full topology updates timed")
+    options.add_argument("--flaps", type=int, default=10,
+                         help="links going down and up again")
+    options.add_argument("--seed", type=int, default=0)
+    options.add_argument("--output", default="benchmarks/baseline.json",
+                         help="JSON file written with the results")
+    return options
+
+
+def main(argv=None):
+    """Run the benchmarks and write their results."""
+    args = parser().parse_args(argv)
+    results = run_benchmarks(args.topologies, args.size, args.queries,
+                             args.max_paths, args.builds, args.flaps,
+                             args.seed, print_stats)
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+        output.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
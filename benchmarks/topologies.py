@@ -0,0 +1,147 @@
+"""Synthetic topologies for the pathfinder benchmarks.
+
+Each generator takes an approximate number of switches and a seed and
+returns the switches and links of a topology, like the generateTopology
+methods of the tests. Switches, interfaces and links are mocked kytos.core
+objects with the attributes that KytosGraph reads, and every link gets
+random bandwidth, delay, reliability, utilization, priority and ownership
+metadata. Switch i is named S<i> and its ports S<i>:<port>.
+"""
+from math import ceil, dist, sqrt
+from random import Random
+from unittest.mock import Mock
+
+import networkx as nx
+
+OWNERS = ("A", "B", "C")
+
+
+class TopologyBuilder:
+    """Switches and the links between them, each link on new ports."""
+
+    def __init__(self, seed=0):
+        self.random = Random(seed)
+        self.switches = {}
+        self.links = {}
+
+    def switch(self, index):
+        """Return switch index, creating it."""
+        name = f"S{index}"
+        if name not in self.switches:
+            self.switches[name] = Mock(id=name, interfaces={})
+        return self.switches[name]
+
+    def interface(self, switch):
+        """Add an interface on the next port of a switch."""
+        name = f"{switch.id}:{len(switch.interfaces) + 1}"
+        interface = Mock(id=name, switch=switch)
+        switch.interfaces[name] = interface
+        return interface
+
+    def link(self, index_a, index_b, delay=None):
+        """Link two switches, with random metadata unless delay is given."""
+        endpoint_a = self.interface(self.switch(index_a))
+        endpoint_b = self.interface(self.switch(index_b))
+        random = self.random
+        metadata = {"bandwidth": random.choice((10, 40, 100, 400)),
+                    "delay": random.randint(1, 50) if delay is None
+                    else delay,
+                    "reliability": random.randint(1, 5),
+                    "utilization": round(random.random(), 2),
+                    "priority": random.randint(1, 10),
+                    "ownership": random.choice(OWNERS)}
+        link = Mock(endpoint_a=endpoint_a, endpoint_b=endpoint_b,
+                    metadata=metadata)
+        link.is_active.return_value = True
+        self.links[f"{endpoint_a.id}<->{endpoint_b.id}"] = link
+        return link
+
+    def from_graph(self, graph, delay=None):
+        """Link the switches of the edges of a networkx graph.
+
+        Delay, when given, is called with the endpoints of an edge.
+        """
+        for index in graph.nodes:
+            self.switch(index)
+        for index_a, index_b in graph.edges:
+            self.link(index_a, index_b,
+                      None if delay is None else delay(index_a, index_b))
+        return self.switches, self.links
+
+
+def fat_tree(size, seed=0):
+    """Return a k-ary fat tree with about size switches.
+
+    k is the even number whose 5k²/4 switches are the closest to size:
+    (k/2)² core switches and k pods of k/2 aggregation and k/2 edge
+    switches, every edge switch linked to every aggregation switch of its
+    pod and aggregation switch j of each pod linked to core switches
+    jk/2 to (j+1)k/2 - 1.
+    """
+    half = max(1, round(sqrt(size / 5)))
+    builder = TopologyBuilder(seed)
+    core = half * half
+    for pod in range(2 * half):
+        aggregation = core + pod * 2 * half
+        edge = aggregation + half
+        for j in range(half):
+            for i in range(half):
+                builder.link(edge + i, aggregation + j)
+                builder.link(aggregation + j, j * half + i)
+    return builder.switches, builder.links
+
+
+def ring(size, seed=0):
+    """Return a ring of size switches."""
+    return TopologyBuilder(seed).from_graph(nx.cycle_graph(max(size, 3)))
+
+
+def grid(size, seed=0):
+    """Return a square grid with about size switches."""
+    side = max(2, ceil(sqrt(size)))
+    graph = nx.convert_node_labels_to_integers(nx.grid_2d_graph(side, side))
+    return TopologyBuilder(seed).from_graph(graph)
+
+
+def waxman(size, seed=0, degree=4):
+    """Return a connected Waxman random graph of size switches.
+
+    Switches are placed in the unit square and linked with a probability
+    decaying with their distance, scaled for an average degree of about
+    degree, with delays following the distance. Components are joined
+    through their closest switches. Every pair of switches is drawn, so
+    the time grows with the square of size.
+    """
+    # 0.085 is about the mean of exp(-d / (0.1 L)) over the unit square.
+    beta = min(1, degree / (max(size, 2) * 0.085))
+    graph = nx.waxman_graph(size, beta=beta, alpha=0.1, seed=seed)
+    position = nx.get_node_attributes(graph, "pos")
+    components = [list(component)
+                  for component in nx.connected_components(graph)]
+    for component, other in zip(components, components[1:]):
+        graph.add_edge(*min(((a, b) for a in component for b in other),
+                            key=lambda edge: dist(position[edge[0]],
+                                                  position[edge[1]])))
+    return TopologyBuilder(seed).from_graph(
+        graph, lambda a, b: 1 + round(100 * dist(position[a], position[b])))
+
+
+def isp(size, seed=0):
+    """Return an ISP-like topology with about size switches.
+
+    A fifth of the switches form a backbone with the heavy-tailed degrees
+    of measured ISP networks (Barabási-Albert), and the others are access
+    switches dual-homed to two linked backbone switches.
+    """
+    core = max(3, size // 5)
+    graph = nx.barabasi_albert_graph(core, 2, seed=seed)
+    random = Random(seed)
+    backbone = list(graph.edges)
+    for index in range(core, max(size, core + 1)):
+        graph.add_edges_from((index, router)
+                             for router in random.choice(backbone))
+    return TopologyBuilder(seed).from_graph(graph)
+
+
+GENERATORS = {"fat_tree": fat_tree, "ring": ring, "grid": grid,
+              "waxman": waxman, "isp": isp}
@@ -0,0 +1,166 @@
+"""Module Builder of kytos/pathfinder Kytos Network Application."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.hierarchy import contract
+from napps.kytos.pathfinder.search import Landmarks
+from napps.kytos.pathfinder.trees import shortest_path_tree
+
+# pylint: enable=import-error
+
+
+class SnapshotBuilderMixin:
+    """Build the structures of the published snapshots of a KytosGraph.
+
+    The A* landmarks, the shortest path trees of the hot sources and the
+    contraction hierarchies are built by a background thread after each
+    update. Landmarks are built for the parameters of the A* queries seen
+    so far.
+    """
+
+    def _build_in_background(self, snapshot):
+        """Build the structures of a published snapshot in the background.
+
+        Queries search without the landmarks, the trees and the
+        hierarchies until they are built, and a build stops as soon as
+        another snapshot is published.
+        """
+        with self._pool_lock:
+            if self._builder is None:
+                self._builder = ThreadPoolExecutor(max_workers=1)
+            self._building = self._builder.submit(
+                self._pinned_call, snapshot, self._build, snapshot)
+
+    def _build(self, snapshot):
+        """Build the structures of a snapshot while it is current."""
+        def cancelled():
+            return snapshot is not self._snapshot or self._builder is None
+
+        if (self._find_landmarks(snapshot, cancelled) and
+                self._grow_trees(snapshot, cancelled)):
+            self._contract(snapshot, cancelled)
+
+    def _find_landmarks(self, snapshot, cancelled):
+        """Store the landmarks of every A* parameter in a snapshot.
+
+        Return False when cancelled.
+        """
+        with self._pool_lock:
+            parameters = list(self._landmark_parameters)
+        for parameter in parameters:
+            if cancelled():
+                return False
+            if parameter not in snapshot.landmarks:
+                snapshot.landmarks[parameter] = Landmarks(
+                    snapshot.graph.neighbors, snapshot.graph.nodes,
+                    self._edge_cost(snapshot, parameter), self.LANDMARKS)
+        return True
+
+    def _grow_trees(self, snapshot, cancelled):
+        """Store the shortest path trees of the hot sources of a snapshot.
+
+        Trees are stored one at a time, so queries use them as soon as
+        they are grown, and the trees repaired when the snapshot was
+        published are kept. Return False when cancelled.
+        """
+        if not self.tree_sources:
+            return True
+        if self.tree_sources == "switches":
+            switches = self._switch_graph()
+            sources = [node for node in snapshot.graph
+                       if switches is None or node not in switches.switch_of]
+        else:
+            sources = [snapshot.nodes.get(name) for name in self.tree_sources
+                       if snapshot.nodes.get(name) in snapshot.graph]
+        for parameter in self.tree_parameters:
+            weight = self._edge_cost(snapshot, parameter)
+            trees = snapshot.trees.setdefault(parameter, {})
+            for source in sources:
+                if cancelled():
+                    return False
+                if source in trees:
+                    continue
+                trees[source] = shortest_path_tree(snapshot.graph.neighbors,
+                                                   source, weight)
+        snapshot.trees_ready = True
+        return True
+
+    def _repair_trees(self, previous, draft):
+        """Repair the trees of the previous snapshot after an update.
+
+        Only the parts of each tree whose shortest paths changed are
+        searched again, so the trees answer queries as soon as the update
+        is published. Trees that can not be repaired are grown again in
+        the background, along with those of new sources.
+        """
+        removed, added, updated = [], [], []
+        for edges_removed, edges_added, edges_updated in draft.changes:
+            removed += edges_removed
+            added += edges_added
+            updated += edges_updated
+        graph = draft.graph
+        added = [edge for edge in added if graph.has_edge(*edge)]
+        updated = [edge for edge in updated if graph.has_edge(*edge)]
+
+        def neighbors(node):
+            return graph[node] if node in graph else ()
+
+        names, previous_names = draft.nodes.names, previous.nodes.names
+        for parameter, trees in previous.trees.items():
+            weight = self._edge_cost(draft, parameter)
+            changed = (removed, added) if parameter is None else \
+                (removed + updated, added + updated)
+            repaired = draft.trees.setdefault(parameter, {})
+            for source, tree in trees.items():
+                if source not in graph or \
+                        names[source] != previous_names[source]:
+                    continue
+                tree = tree.repaired(neighbors, *changed, weight)
+                if tree is not None:
+                    repaired[source] = tree
+
+    def _contract(self, snapshot, cancelled):
+        """Build the hierarchy of every parameter while snapshot is current."""
+        for parameter in self.hierarchies:
+            if parameter in snapshot.hierarchies:
+                continue
+            store_weight = snapshot.store.weight(parameter)
+
+            def weight(endpoint_a, endpoint_b, store_weight=store_weight):
+                return store_weight(endpoint_a, endpoint_b, None)
+            hierarchy = contract(snapshot.graph.neighbors,
+                                 list(snapshot.graph.nodes), weight,
+                                 cancelled)
+            if hierarchy is None:
+                return
+            snapshot.hierarchies[parameter] = hierarchy
+
+    def _landmarks(self, snapshot, parameter):
+        """Return the landmarks of a snapshot, or None until they are built.
+
+        The first A* query of a parameter has its landmarks built in the
+        background, and so does every snapshot published afterwards.
+        """
+        landmarks = snapshot.landmarks.get(parameter)
+        if landmarks is None:
+            with self._pool_lock:
+                requested = parameter not in self._landmark_parameters
+                self._landmark_parameters.add(parameter)
+            if requested:
+                self._build_in_background(self._snapshot)
+        return landmarks
+
+    @staticmethod
+    def _edge_cost(snapshot, parameter):
+        """Return the cost of the edges of a snapshot by their endpoints.
+
+        Return None when the parameter is None and every edge costs 1.
+        """
+        if parameter is None:
+            return None
+        store_weight = snapshot.store.weight(parameter)
+
+        def cost(endpoint_a, endpoint_b):
+            return store_weight(endpoint_a, endpoint_b, None)
+        return cost
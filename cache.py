@@ -0,0 +1,115 @@
+"""Module Cache of kytos/pathfinder Kytos Network Application."""
+
+from collections import OrderedDict
+
+
+class PathCache:
+    """Bounded LRU cache for path results.
+
+    Entries are evicted in least recently used order once ``max_size`` is
+    reached. A ``max_size`` of 0 disables the cache.
+
+    Each entry may be registered under the edges its paths use and the
+    nodes it depends on, so that a topology change only drops the entries
+    it can affect.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._edge_index = {}
+        self._node_index = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @staticmethod
+    def edge_key(endpoint_a, endpoint_b):
+        """Return the direction independent key of an edge."""
+        return frozenset((endpoint_a, endpoint_b))
+
+    def get(self, key, default=None):
+        """Return the value cached for key, marking it as recently used."""
+        try:
+            value = self._entries[key][0]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value, edges=(), nodes=()):
+        """Cache a value, evicting the least recently used entries.
+
+        The entry is indexed by the given edges, as returned by
+        ``edge_key``, and by the given nodes.
+        """
+        if self.max_size <= 0:
+            return
+        self._pop(key)
+        edges = frozenset(edges)
+        nodes = frozenset(nodes)
+        self._entries[key] = (value, edges, nodes)
+        for edge in edges:
+            self._edge_index.setdefault(edge, set()).add(key)
+        for node in nodes:
+            self._node_index.setdefault(node, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._pop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _pop(self, key):
+        """Remove an entry and its index references."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        _, edges, nodes = entry
+        for index, items in ((self._edge_index, edges),
+                             (self._node_index, nodes)):
+            for item in items:
+                keys = index[item]
+                keys.discard(key)
+                if not keys:
+                    del index[item]
+        return True
+
+    def _invalidate(self, index, items, predicate=None):
+        """Drop the entries indexed by items that match the predicate."""
+        dropped = 0
+        for item in items:
+            for key in list(index.get(item, ())):
+                if predicate is None or predicate(key):
+                    dropped += self._pop(key)
+        self.invalidations += dropped
+        return dropped
+
+    def invalidate_edges(self, edges, predicate=None):
+        """Drop the entries whose paths use any of the given edges."""
+        return self._invalidate(self._edge_index, edges, predicate)
+
+    def invalidate_nodes(self, nodes, predicate=None):
+        """Drop the entries that depend on any of the given nodes."""
+        return self._invalidate(self._node_index, nodes, predicate)
+
+    def clear(self):
+        """Drop every cached entry."""
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._edge_index.clear()
+        self._node_index.clear()
+
+    @property
+    def stats(self):
+        """Return the cache size and its counters."""
+        return {"size": len(self._entries), "max_size": self.max_size,
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations}
@@ -0,0 +1,344 @@
+"""Module Constraints of kytos/pathfinder Kytos Network Application."""
+
+from functools import partial
+from itertools import combinations, islice
+from math import inf
+
+from kytos.core import log
+
+try:
+    import networkx as nx
+except ImportError:
+    PACKAGE = 'networkx>=2.2'
+    log.error(f"Package {PACKAGE} not found. Please 'pip install {PACKAGE}'")
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.csr import shared_search
+from napps.kytos.pathfinder.pareto import label_setting
+
+# pylint: enable=import-error
+
+
+class ConstrainedSearchMixin:
+    """Search the paths of a KytosGraph under metric constraints.
+
+    Metric filters are bitmasks over the store edge ids read from the
+    metric index, and the combinations of metrics relaxed by flexible
+    queries are searched on the search pool of the graph. Pareto and
+    budget queries run a label setting search instead.
+    """
+
+    def _flexible_searches(self, flexible, metrics, search, remote=None):
+        """Yield each combination of metrics relaxing up to flexible.
+
+        Each metric filter is evaluated once per edge into a bitmask, so a
+        combination of metrics is just the AND of their masks. The search
+        is called with the edges and the mask of a combination, and
+        combinations that keep the same edges are searched only once.
+        Yield every combination with the result of its search, in order.
+        """
+        length = len(metrics)
+        flexible = min(length, max(0, flexible))
+        edges, masks = self._edge_masks(**metrics)
+        alive = self.index.alive
+        combos = []
+        for i in range(0, flexible + 1):
+            for combo in combinations(metrics.items(), length - i):
+                combos.append((combo, self._combine_masks(alive, masks,
+                                                          combo)))
+        searched = self._run_searches(
+            search, edges, list(dict.fromkeys(mask for _, mask in combos)),
+            remote)
+        for combo, mask in combos:
+            yield combo, searched[mask]
+
+    def _run_searches(self, search, edges, masks, remote=None):
+        """Run the search of every mask on the pool, by mask.
+
+        Worker threads are pinned to the snapshot of the query.
+        """
+        return self.pool.run(search, edges, masks, remote, partial(
+            self._pinned_call, self._current(), search))
+
+    def _constrained_flexible_paths(self, source, destination, flexible=0, *,
+                                    max_paths=None, **metrics):
+        """Search every combination of metrics relaxing up to flexible.
+
+        Source and destination are node ids, and so are the paths found.
+        Process workers search the CSR graph in shared memory.
+        """
+        def search(_edges, mask):
+            return self._masked_shortest_paths(source, destination, mask,
+                                               max_paths)
+
+        remote = None
+        method = self.CSR_METHODS.get(self._path_fun)
+        csr = self._compiled() if method else None
+        if self.pool.remote and csr is not None:
+            remote = partial(shared_search, csr.share(), method, source,
+                             destination, max_paths)
+
+        return [{"paths": paths, "metrics": dict(combo)}
+                for combo, paths in self._flexible_searches(
+                    flexible, metrics, search, remote)
+                if paths]
+
+    def _constrained_flexible_paths_from(self, source, destinations,
+                                         flexible=0, *, max_paths=None,
+                                         **metrics):
+        """Search the combinations of metrics from source to destinations.
+
+        Return the results of every destination id, searching each
+        combination once for all of them.
+        """
+        def search(_edges, mask):
+            return self._search_from(source, destinations, mask=mask,
+                                     max_paths=max_paths)
+
+        results = {destination: [] for destination in destinations}
+        for combo, found in self._flexible_searches(flexible, metrics,
+                                                    search):
+            for destination, paths in found.items():
+                if paths:
+                    results[destination].append({"paths": paths,
+                                                 "metrics": dict(combo)})
+        return results
+
+    def _minimum_relaxation_paths(self, source, destination, flexible=0, *,
+                                  max_paths=None, **metrics):
+        """Search the levels of relaxation in order, stopping at paths.
+
+        Source and destination are node ids, and so are the paths found.
+
+        A search without paths means that the destination can not be
+        reached with the edges of its mask, nor with any subset of them,
+        so masks within a failed one are not searched. The destination is
+        first checked to be reachable with the edges of every combination
+        of the last level, so unreachable queries search nothing.
+        """
+        length = len(metrics)
+        flexible = min(length, max(0, flexible))
+        edges, masks = self._edge_masks(**metrics)
+        alive = self.index.alive
+        levels = [[(combo, self._combine_masks(alive, masks, combo))
+                   for combo in combinations(metrics.items(), length - i)]
+                  for i in range(0, flexible + 1)]
+        widest = 0
+        for _, mask in levels[-1]:
+            widest |= mask
+        if not self._reachable(source, destination, widest):
+            return []
+
+        def search(_edges, mask):
+            return self._masked_shortest_paths(source, destination,
+                                               mask, max_paths)
+
+        failed = []
+        for level in levels:
+            pending = [mask for mask in dict.fromkeys(m for _, m in level)
+                       if not any(mask & ~other == 0 for other in failed)]
+            searched = self._run_searches(search, edges, pending)
+            failed.extend(mask for mask, paths in searched.items()
+                          if not paths)
+            results = [{"paths": searched[mask], "metrics": dict(combo)}
+                       for combo, mask in level if searched.get(mask)]
+            if results:
+                return results
+        return []
+
+    def _reachable(self, source, destination, mask):
+        """Tell whether the edges of a mask connect source to destination."""
+        if source == destination:
+            return True
+        graph = self._masked_graph(mask)
+        return (source in graph and destination in graph and
+                nx.has_path(graph, source, destination))
+
+    def _pareto_costs(self, metrics):
+        """Return the cost of every edge for a Pareto search, and bounds.
+
+        Costs are lower for better values and a path costs the largest
+        cost of its edges. ``>=`` metrics cost the opposite of their
+        value, ``<=`` metrics cost their value, and ``==`` metrics or
+        values of another type cost 1 when the edge does not match. Edges
+        without a metric cost -inf. A path satisfies a metric when its cost
+        is at most the bound of the metric. Return the costs function and
+        the bound and the comparison (``==``, ``>=`` or ``<=``) of each
+        metric.
+        """
+        index = self.index
+        store = self.store
+        columns, bounds = [], []
+        for metric, value in metrics.items():
+            operator = index.operators[metric]
+            code = store.code(metric, value)
+            if operator == "==" or code is None:
+                columns.append((store.columns[metric], store.present[metric],
+                                lambda cost, code=code: float(cost != code)))
+                bounds.append((0.0, "=="))
+            elif operator == ">=":
+                columns.append((store.columns[metric], store.present[metric],
+                                lambda cost: -cost))
+                bounds.append((-code, ">="))
+            else:
+                columns.append((store.columns[metric], store.present[metric],
+                                float))
+                bounds.append((code, "<="))
+
+        costs = {}
+
+        def edge_costs(endpoint_a, endpoint_b):
+            edge_id = store.edge_id(endpoint_a, endpoint_b)
+            if edge_id not in costs:
+                costs[edge_id] = tuple(
+                    convert(column[edge_id]) if present[edge_id] else -inf
+                    for column, present, convert in columns)
+            return costs[edge_id]
+        return edge_costs, bounds
+
+    def _pareto_paths(self, source, destination, **metrics):
+        """Search the Pareto frontier between node ids.
+
+        Paths cost their hop count and the largest cost of their edges
+        for each metric, and labels that are dominated are dropped.
+        """
+        index = self.index
+        metrics = {metric: value for metric, value in metrics.items()
+                   if metric in index.operators}
+        edge_costs, bounds = self._pareto_costs(metrics)
+
+        def extend(vector, node, neighbor):
+            costs = edge_costs(node, neighbor)
+            return (vector[0] + 1,) + tuple(map(max, vector[1:], costs))
+
+        results = []
+        frontier = label_setting(self.graph.neighbors, source, destination,
+                                 (0,) + (-inf,) * len(metrics), extend)
+        for vector, path in frontier:
+            values = {"hops": vector[0]}
+            satisfied = {}
+            for (metric, value), cost, (bound, operator) in zip(
+                    metrics.items(), vector[1:], bounds):
+                if cost <= bound:
+                    satisfied[metric] = value
+                if operator == "==":
+                    values[metric] = cost <= 0
+                elif cost != -inf:
+                    values[metric] = -cost if operator == ">=" else cost
+            results.append({"paths": [list(path)], "metrics": satisfied,
+                            "values": values})
+        return results
+
+    def _budget_paths(self, source, destination, budgets, minimize=None, *,
+                      max_paths=None, **metrics):
+        """Search the cheapest paths within budgets between node ids.
+
+        Labels hold the sum of minimize followed by the sum of every
+        budgeted metric, and are pruned once over a budget or dominated.
+        Links without a value for a metric add nothing to its sum.
+        """
+        summed = [*budgets] if minimize is None else [minimize, *budgets]
+        invalid = [metric for metric in summed if not self._additive(metric)]
+        if invalid:
+            raise ValueError(f"{', '.join(map(repr, invalid))} can not be "
+                             "summed along a path")
+        index = self.index
+        metrics = {metric: value for metric, value in metrics.items()
+                   if metric in index.operators}
+        sums = [minimize or "hops", *budgets]
+        weights = [self._additive_weight(metric) for metric in sums]
+        limits = [inf, *budgets.values()]
+        allowed = self._masked_graph(self._filter_mask(**metrics))
+
+        def neighbors(node):
+            return allowed.neighbors(node) if node in allowed else ()
+
+        def extend(vector, node, neighbor):
+            extended = tuple(total + weight(node, neighbor, None)
+                             for total, weight in zip(vector, weights))
+            if any(total > limit for total, limit in zip(extended, limits)):
+                return None
+            return extended
+
+        frontier = label_setting(neighbors, source, destination,
+                                 (0,) * len(sums), extend)
+        cheapest = [(vector, path) for vector, path in frontier
+                    if vector[0] == frontier[0][0][0]]
+        return [{"paths": [list(path)], "metrics": metrics,
+                 "values": dict(zip(sums, vector))}
+                for vector, path in islice(cheapest, max_paths)]
+
+    def _additive(self, metric):
+        """Tell whether the sum of a metric along a path can be budgeted."""
+        return metric in self.ADDITIVE_METRICS
+
+    def _additive_weight(self, metric):
+        """Return the weight of the edges for the sum of a metric."""
+        if metric == "hops":
+            return lambda endpoint_a, endpoint_b, _data: 1
+        return self.store.weight(metric, default=0)
+
+    def _constrained_shortest_paths(self, source, destination, **metrics):
+        """Search the paths using only the edges that pass every metric.
+
+        Source and destination are node ids, and so are the paths found.
+        """
+        edges, masks = self._edge_masks(**metrics)
+        mask = self._combine_masks(self.index.alive, masks, metrics.items())
+        paths = self._masked_shortest_paths(source, destination, mask)
+        return {"paths": paths, "metrics": metrics}
+
+    def _masked_shortest_paths(self, source, destination, mask,
+                               max_paths=None):
+        """Search the paths using only the edges selected by a mask."""
+        return self._search(source, destination, mask=mask,
+                            max_paths=max_paths)
+
+    def _edge_masks(self, **metrics):
+        """Return the indexed edges and a bitmask of them per metric.
+
+        Bit i of a mask is set when edges[i] passes the metric filter.
+        Metrics without a filter are left out.
+        """
+        index = self.index
+        masks = {}
+        for metric, value in metrics.items():
+            if metric in index.operators:
+                masks[metric] = index.query(metric, value)
+        return index.edges, masks
+
+    @staticmethod
+    def _combine_masks(alive, masks, metrics):
+        """Return the mask of the edges passing all the given metrics."""
+        mask = alive
+        for metric, _ in metrics:
+            mask &= masks.get(metric, mask)
+        return mask
+
+    def _masked_graph(self, mask):
+        """Return a view of the graph keeping the edges of a mask.
+
+        The bit of an edge is only tested when a search reaches it, so no
+        subgraph is built for the mask.
+        """
+        edge_id = self.store.edge_id
+
+        def selected(endpoint_a, endpoint_b):
+            return mask >> edge_id(endpoint_a, endpoint_b) & 1
+        return nx.subgraph_view(self.graph, filter_edge=selected)
+
+    @staticmethod
+    def _masked_edges(edges, mask):
+        """Return the endpoints of the edges selected by a mask."""
+        bits = format(mask, f"0{len(edges)}b")[::-1]
+        return [edge for edge, bit in zip(edges, bits) if bit == "1"]
+
+    def _filter_mask(self, **metrics):
+        """Return the mask of the edges that pass every metric."""
+        _, masks = self._edge_masks(**metrics)
+        return self._combine_masks(self.index.alive, masks, metrics.items())
+
+    def _filter_edges(self, **metrics):
+        """Return the endpoints of the edges that pass every metric."""
+        return self._masked_edges(self.index.edges,
+                                  self._filter_mask(**metrics))
@@ -0,0 +1,387 @@
+"""Module CSR of kytos/pathfinder Kytos Network Application."""
+
+from heapq import heappop, heappush
+from itertools import count, islice
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from weakref import finalize
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra
+except ImportError:
+    np = None
+
+# CSR graphs attached to shared memory by a process worker, by block names.
+_ATTACHED = {}
+
+
+def _release(blocks):
+    """Free shared memory blocks.
+
+    Workers unregister the blocks they attach from their resource tracker,
+    which may be the one of this process, so the blocks are registered
+    again before unlink unregisters them.
+    """
+    for block in blocks:
+        block.close()
+        # pylint: disable=protected-access
+        resource_tracker.register(block._name, "shared_memory")
+        block.unlink()
+
+
+def shared_search(descriptor, method, source, destination, max_paths, mask):
+    """Run a hop count search of a process worker on a shared CSR graph.
+
+    The graph is attached once per worker from the descriptor returned by
+    CSRGraph.share.
+    """
+    csr = CSRGraph.attach(descriptor)
+    return list(islice(getattr(csr, method)(source, destination, None, mask),
+                       max_paths))
+
+
+class CSRGraph:
+    """Compressed sparse row representation of a KytosGraph.
+
+    The graph nodes are the dense integer ids of a NodeInterner, and the
+    neighbors of node i are ``indices[indptr[i]:indptr[i + 1]]``, reached
+    through the store edges ``edge_ids[indptr[i]:indptr[i + 1]]``. Edge
+    filters are bitmasks over the store edge ids, and weights are arrays
+    over the CSR entries. Searches take and return node ids.
+    """
+
+    def __init__(self, graph, store, size):
+        self.size = size
+        indptr, indices, edge_ids = [0], [], []
+        adjacency = graph.adj
+        for node in range(size):
+            for neighbor in adjacency.get(node, ()):
+                indices.append(neighbor)
+                edge_ids.append(store.edge_id(node, neighbor))
+            indptr.append(len(indices))
+        self.store = store
+        self.edge_count = len(store.edges)
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.edge_ids = np.array(edge_ids, dtype=np.int64)
+        self._adjacency = (indptr, indices, edge_ids)
+        self._weights = {}
+        self._shared = None
+
+    ARRAYS = ("indptr", "indices", "edge_ids")
+
+    def share(self):
+        """Copy the arrays to shared memory for process workers.
+
+        The blocks are freed when this graph is garbage collected. Return
+        a descriptor that workers pass to attach.
+        """
+        if self._shared is None:
+            blocks = []
+            for name in self.ARRAYS:
+                values = getattr(self, name)
+                block = SharedMemory(create=True, size=max(1, values.nbytes))
+                np.ndarray(values.shape, values.dtype,
+                           buffer=block.buf)[:] = values
+                blocks.append(block)
+            finalize(self, _release, blocks)
+            self._shared = (self.size, self.edge_count,
+                            tuple((block.name, len(getattr(self, name)))
+                                  for name, block in zip(self.ARRAYS,
+                                                         blocks)))
+        return self._shared
+
+    @classmethod
+    def attach(cls, descriptor):
+        """Return the CSR graph shared with a descriptor, without a store.
+
+        Graphs without a store only run hop count searches. A worker only
+        keeps the last graph it attached.
+        """
+        if descriptor not in _ATTACHED:
+            for blocks, attached in _ATTACHED.values():
+                attached.indptr = attached.indices = attached.edge_ids = None
+                for block in blocks:
+                    block.close()
+            _ATTACHED.clear()
+            size, edge_count, arrays = descriptor
+            csr = cls.__new__(cls)
+            csr.size, csr.edge_count, csr.store = size, edge_count, None
+            blocks = []
+            for name, (block_name, length) in zip(cls.ARRAYS, arrays):
+                block = SharedMemory(name=block_name)
+                # The block belongs to the process that shared it, so the
+                # tracker of this worker must not unlink it (bpo-39959).
+                # pylint: disable=protected-access
+                resource_tracker.unregister(block._name, "shared_memory")
+                blocks.append(block)
+                setattr(csr, name, np.ndarray((length,), np.int64,
+                                              buffer=block.buf))
+            csr._adjacency = (csr.indptr.tolist(), csr.indices.tolist(),
+                              csr.edge_ids.tolist())
+            csr._weights = {}
+            csr._shared = descriptor
+            _ATTACHED[descriptor] = (blocks, csr)
+        return _ATTACHED[descriptor][1]
+
+    @staticmethod
+    def available():
+        """Tell whether numpy and scipy could be imported."""
+        return np is not None
+
+    def weights(self, parameter=None):
+        """Return the weight of every CSR entry for a metadata key.
+
+        Entries whose link does not have the key weigh 1, like networkx
+        does for missing weight attributes.
+        """
+        if parameter is None:
+            return np.ones(len(self.indices))
+        if parameter not in self._weights:
+            store = self.store
+            if store.kinds.get(parameter) == "float":
+                column = np.frombuffer(store.columns[parameter],
+                                       dtype=np.float64)
+                present = np.frombuffer(store.present[parameter],
+                                        dtype=np.uint8)
+                present = present[self.edge_ids].astype(bool)
+                weights = np.where(present, column[self.edge_ids], 1.0)
+            else:
+                weights = np.array([store.get(edge_id, parameter, 1)
+                                    for edge_id in self.edge_ids],
+                                   dtype=np.float64)
+            self._weights[parameter] = weights
+        return self._weights[parameter]
+
+    def allowed(self, mask):
+        """Return which CSR entries a bitmask over edge ids allows."""
+        if mask is None:
+            return None
+        size = self.edge_count
+        bits = np.frombuffer(format(mask, f"0{size}b")[::-1].encode(),
+                             dtype=np.uint8) == ord("1")
+        return bits[self.edge_ids] if size else bits
+
+    def _matrix(self, weights, allowed):
+        """Return a scipy matrix with the allowed entries."""
+        size = self.size
+        if allowed is None:
+            return csr_matrix((weights, self.indices, self.indptr),
+                              shape=(size, size))
+        rows = np.repeat(np.arange(size), np.diff(self.indptr))[allowed]
+        return csr_matrix((weights[allowed], (rows, self.indices[allowed])),
+                          shape=(size, size))
+
+    def all_shortest_paths(self, source, destination, parameter=None,
+                           mask=None):
+        """Yield every shortest path between source and destination.
+
+        Distances from both ends are computed with scipy, and the paths
+        are enumerated over the entries lying on a shortest path.
+        """
+        if source == destination:
+            yield [source]
+            return
+        weights = self.weights(parameter)
+        allowed = self.allowed(mask)
+        matrix = self._matrix(weights, allowed)
+        distances = dijkstra(matrix, indices=[source, destination],
+                             unweighted=parameter is None)
+        from_source, to_destination = distances.tolist()
+        total = from_source[destination]
+        if total == np.inf:
+            return
+        tolerance = 1e-9 * max(1.0, abs(total))
+        weights = weights.tolist()
+        allowed = allowed.tolist() if allowed is not None else None
+        indptr, indices, _ = self._adjacency
+        stack = [(source, iter(range(indptr[source], indptr[source + 1])))]
+        path, on_path = [source], {source}
+        while stack:
+            node, entries = stack[-1]
+            for entry in entries:
+                neighbor = indices[entry]
+                if (neighbor in on_path or
+                        (allowed is not None and not allowed[entry])):
+                    continue
+                if (abs(from_source[node] + weights[entry] -
+                        from_source[neighbor]) > tolerance or
+                        abs(from_source[neighbor] + to_destination[neighbor]
+                            - total) > tolerance):
+                    continue
+                if neighbor == destination:
+                    yield path + [neighbor]
+                    continue
+                path.append(neighbor)
+                on_path.add(neighbor)
+                stack.append((neighbor, iter(range(indptr[neighbor],
+                                                   indptr[neighbor + 1]))))
+                break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
+
+    def single_source_paths(self, source, destinations, parameter=None,
+                            mask=None, max_paths=None):
+        """Return the shortest paths from source to each destination.
+
+        Distances from the source are computed once with scipy, and the
+        paths of each destination are enumerated backwards over the
+        entries lying on a shortest path, up to max_paths of them. Return
+        a dict of paths by destination.
+        """
+        weights = self.weights(parameter)
+        allowed = self.allowed(mask)
+        matrix = self._matrix(weights, allowed)
+        distances = dijkstra(matrix, indices=source,
+                             unweighted=parameter is None).tolist()
+        weights = weights.tolist()
+        allowed = allowed.tolist() if allowed is not None else None
+        return {destination: self._paths_to(source, destination, distances,
+                                            weights, allowed, max_paths)
+                for destination in destinations}
+
+    def _paths_to(self, source, destination, distances, weights, allowed,
+                  max_paths=None):
+        """Enumerate the shortest paths reaching destination from source."""
+        if source == destination:
+            return [[source]]
+        total = distances[destination]
+        if total == np.inf:
+            return []
+        indptr, indices, _ = self._adjacency
+        paths = []
+        stack = [(destination,
+                  iter(range(indptr[destination], indptr[destination + 1])))]
+        path, on_path = [destination], {destination}
+        while stack:
+            node, entries = stack[-1]
+            for entry in entries:
+                neighbor = indices[entry]
+                if (neighbor in on_path or
+                        (allowed is not None and not allowed[entry])):
+                    continue
+                tolerance = 1e-9 * max(1.0, abs(distances[node]))
+                if abs(distances[neighbor] + weights[entry] -
+                       distances[node]) > tolerance:
+                    continue
+                if neighbor == source:
+                    paths.append((path + [neighbor])[::-1])
+                    if len(paths) == max_paths:
+                        return paths
+                    continue
+                path.append(neighbor)
+                on_path.add(neighbor)
+                stack.append((neighbor, iter(range(indptr[neighbor],
+                                                   indptr[neighbor + 1]))))
+                break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
+        return paths
+
+    def _shortest_path(self, source_id, destination_id, weights, allowed,
+                       banned_nodes=(), banned_edges=(), potential=None):
+        """Return the cost and node ids of one shortest path, or None.
+
+        A potential giving a lower bound of the distance from every node
+        to the destination turns the search into A*, and nodes whose
+        potential is infinite are never visited.
+        """
+        indptr, indices, edge_ids = self._adjacency
+        if potential is None:
+            potential = [0.0] * self.size
+        distances = {source_id: 0}
+        previous = {}
+        tie = count()
+        heap = [(potential[source_id], next(tie), 0, source_id)]
+        while heap:
+            _, _, distance, node = heappop(heap)
+            if node == destination_id:
+                path = [node]
+                while path[-1] != source_id:
+                    path.append(previous[path[-1]])
+                return distance, path[::-1]
+            if distance > distances[node]:
+                continue
+            for entry in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[entry]
+                if (neighbor in banned_nodes or
+                        edge_ids[entry] in banned_edges or
+                        (allowed is not None and not allowed[entry]) or
+                        potential[neighbor] == np.inf):
+                    continue
+                candidate = distance + weights[entry]
+                if candidate < distances.get(neighbor, np.inf):
+                    distances[neighbor] = candidate
+                    previous[neighbor] = node
+                    heappush(heap, (candidate + potential[neighbor],
+                                    next(tie), candidate, neighbor))
+        return None
+
+    def shortest_simple_paths(self, source, destination, parameter=None,
+                              mask=None):
+        """Yield simple paths from the shortest, using Yen's algorithm.
+
+        Paths are produced lazily, so a caller stopping after k paths
+        only pays for k iterations. The distances to the destination are
+        computed once and guide every spur search as an A* potential,
+        since banning nodes and edges can only make them longer. Each
+        path only spurs from the node where it deviated from the path it
+        was derived from, as the earlier spurs were already searched.
+        """
+        if source == destination:
+            yield [source]
+            return
+        weights = self.weights(parameter)
+        allowed = self.allowed(mask)
+        potential = dijkstra(self._matrix(weights, allowed),
+                             indices=destination).tolist()
+        if potential[source] == np.inf:
+            return
+        weights = weights.tolist()
+        allowed = allowed.tolist() if allowed is not None else None
+        first = self._shortest_path(source, destination, weights, allowed,
+                                    potential=potential)
+        edge_ids = self._adjacency[2]
+        found = [first[1]]
+        deviations = [0]
+        candidates, seen, tie = [], {tuple(first[1])}, count()
+        while True:
+            yield list(found[-1])
+            last = found[-1]
+            root_cost = 0
+            for i in range(len(last) - 1):
+                if i > 0:
+                    root_cost += weights[self._entry(last[i - 1], last[i])]
+                if i < deviations[-1]:
+                    continue
+                root = last[:i + 1]
+                banned_edges = {edge_ids[self._entry(path[i], path[i + 1])]
+                                for path in found if path[:i + 1] == root}
+                spur = self._shortest_path(last[i], destination, weights,
+                                           allowed, set(root[:-1]),
+                                           banned_edges, potential)
+                if spur is None:
+                    continue
+                path = root[:-1] + spur[1]
+                if tuple(path) in seen:
+                    continue
+                seen.add(tuple(path))
+                heappush(candidates, (root_cost + spur[0], next(tie), i,
+                                      path))
+            if not candidates:
+                return
+            _, _, deviation, path = heappop(candidates)
+            found.append(path)
+            deviations.append(deviation)
+
+    def _entry(self, node_a, node_b):
+        """Return the CSR entry from node_a to node_b."""
+        indptr, indices, _ = self._adjacency
+        for entry in range(indptr[node_a], indptr[node_a + 1]):
+            if indices[entry] == node_b:
+                return entry
+        return None
@@ -0,0 +1,109 @@
+"""Module Debounce of kytos/pathfinder Kytos Network Application."""
+
+from threading import Condition, Lock, Thread
+from time import monotonic
+
+from kytos.core import log
+
+
+class Debouncer:
+    """Coalesce bursts of values into a single call with the latest one.
+
+    Values are applied once none arrived for ``quiet`` seconds, and no
+    later than ``max_delay`` seconds after the first value of the burst,
+    so a steady stream of values is still applied regularly. Only the
+    latest value of a burst is applied, the others are counted as merged.
+    Calls run one at a time on a worker thread, and a quiet window of 0
+    applies every value right away on the calling thread.
+    """
+
+    def __init__(self, apply, quiet=0.1, max_delay=1.0):
+        self.apply = apply
+        self.quiet = quiet
+        self.max_delay = max_delay
+        self.received = 0
+        self.applied = 0
+        self.merged = 0
+        self._condition = Condition()
+        self._calls = Lock()
+        self._pending = None
+        self._first = self._last = None
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def stats(self):
+        """Return the values received, applied, merged and pending."""
+        with self._condition:
+            return {"received": self.received, "applied": self.applied,
+                    "merged": self.merged,
+                    "pending": self._pending is not None}
+
+    def submit(self, value):
+        """Apply a value once its burst is over."""
+        with self._condition:
+            self.received += 1
+            if self.quiet <= 0:
+                self.applied += 1
+            else:
+                now = monotonic()
+                if self._pending is None:
+                    self._first = now
+                else:
+                    self.merged += 1
+                self._pending = (value,)
+                self._last = now
+                if self._thread is None:
+                    self._thread = Thread(target=self._run, daemon=True,
+                                          name="pathfinder-debounce")
+                    self._thread.start()
+                self._condition.notify()
+                return
+        with self._calls:
+            self._call(value)
+
+    def flush(self):
+        """Apply the pending value now, if there is one."""
+        with self._calls:
+            with self._condition:
+                pending = self._take()
+            if pending is not None:
+                self._call(*pending)
+
+    def stop(self):
+        """Stop the worker thread, dropping the pending value."""
+        with self._condition:
+            self._stopped = True
+            self._pending = None
+            self._condition.notify()
+
+    def _take(self):
+        """Return the pending value counted as applied, or None."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self.applied += 1
+        return pending
+
+    def _run(self):
+        """Wait for the end of each burst and apply its latest value."""
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    if self._pending is None:
+                        self._condition.wait()
+                        continue
+                    delay = min(self._last + self.quiet,
+                                self._first + self.max_delay) - monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+            self.flush()
+
+    def _call(self, value):
+        """Apply a value, logging the errors so the worker keeps running."""
+        try:
+            self.apply(value)
+        except Exception as error:  # pylint: disable=broad-except
+            log.error(f"Failed to apply a coalesced update: {error}")
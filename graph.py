@@ -4,78 +4,543 @@ from kytos.core import log
 
 try:
     import networkx as nx
-    from networkx.exception import NodeNotFound, NetworkXNoPath
 except ImportError:
     PACKAGE = 'networkx>=2.2'
     log.error(f"Package {PACKAGE} not found. Please 'pip install {PACKAGE}'")
 
-from itertools import combinations
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock, RLock, local
 
-class KytosGraph:
-    """Class responsible for the graph generation."""
+# pylint: disable=import-error
+from napps.kytos.pathfinder.builder import SnapshotBuilderMixin
+from napps.kytos.pathfinder.cache import PathCache
+from napps.kytos.pathfinder.constraints import ConstrainedSearchMixin
+from napps.kytos.pathfinder.csr import CSRGraph
+from napps.kytos.pathfinder.index import MetricIndex
+from napps.kytos.pathfinder.pool import SearchPool
+from napps.kytos.pathfinder.routing import PathSearchMixin
+from napps.kytos.pathfinder.snapshot import GraphSnapshot, SharedGraph
+from napps.kytos.pathfinder.store import LinkAttributeStore, NodeInterner
 
-    def __init__(self):
-        self.graph = nx.Graph()
-        self._filter_fun_dict = {}
-        def filterLEQ(metric):# Lower values are better
-            return lambda x: (lambda y: y[2].get(metric,x) <= x)
-        def filterGEQ(metric):# Higher values  are better
-            return lambda x: (lambda y: y[2].get(metric,x) >= x)
-        def filterEEQ(metric):# Equivalence
-            return lambda x: (lambda y: y[2].get(metric,x) == x)
+# pylint: enable=import-error
 
 
-        self._filter_fun_dict["ownership"] = filterEEQ("ownership")
-        self._filter_fun_dict["bandwidth"] = filterGEQ("bandwidth")
-        self._filter_fun_dict["priority"] = filterGEQ("priority")
-        self._filter_fun_dict["reliability"] = filterGEQ("reliability")
-        self._filter_fun_dict["utilization"] = filterLEQ("utilization")
-        self._filter_fun_dict["delay"] = filterLEQ("delay")
+def reads_snapshot(method):
+    """Run a query on the snapshot published when it started."""
+    @wraps(method)
+    def pinned(self, *args, **kwargs):
+        with self._pinned():
+            return method(self, *args, **kwargs)
+    return pinned
+
+
+def writes_snapshot(method):
+    """Apply an update to a copy of the snapshot and then publish it."""
+    @wraps(method)
+    def publishing(self, *args, **kwargs):
+        with self._writing():
+            return method(self, *args, **kwargs)
+    return publishing
+
+
+class KytosGraph(SnapshotBuilderMixin, PathSearchMixin,
+                 ConstrainedSearchMixin):
+    """Class responsible for the graph generation.
+
+    The graph and the structures compiled from it are kept in an immutable
+    GraphSnapshot. Updates work on a copy that replaces it when they end,
+    and queries pin the snapshot they started with, so they never block
+    on updates nor see a topology that is half updated. The searches
+    answering the queries live in the mixins of routing and constraints,
+    and builder builds the structures of the published snapshots.
+    """
+
+    CSR_METHODS = {nx.all_shortest_paths: "all_shortest_paths",
+                   nx.shortest_simple_paths: "shortest_simple_paths"}
+
+    ALGORITHMS = ("auto", "dijkstra", "bidirectional", "astar")
+
+    # Weighted point queries on graphs with at least this many nodes run
+    # A* with landmarks when the algorithm is chosen automatically.
+    ASTAR_MIN_NODES = 1000
+
+    LANDMARKS = 8
+
+    # Comparison of the links metadata with the values of metric filters.
+    OPERATORS = {"ownership": "==", "bandwidth": ">=", "priority": ">=",
+                 "reliability": ">=", "utilization": "<=", "delay": "<="}
+
+    # Sums along a path that budget queries can bound or minimize.
+    ADDITIVE_METRICS = ("hops",) + tuple(
+        metric for metric, operator in OPERATORS.items() if operator == "<=")
+
+    def __init__(self, incremental=True, cache_size=1024,
+                 backend="networkx", workers=0, executor="thread",
+                 deadline=None, algorithm="auto", hierarchies=(),
+                 tree_sources=(), tree_parameters=(None,)):
+        self.backend = backend
+        if backend == "csr" and not CSRGraph.available():
+            PACKAGE = 'scipy>=1.0'
+            log.error(f"Package {PACKAGE} not found. Please 'pip install "
+                      f"{PACKAGE}'. Falling back to the networkx backend.")
+            self.backend = "networkx"
+        self.incremental = incremental
+        self.last_delta = self._empty_delta()
+        self.cache = PathCache(cache_size)
+        store = LinkAttributeStore({
+            "ownership": "label", "bandwidth": "float", "priority": "float",
+            "reliability": "float", "utilization": "float", "delay": "float"})
+        index = MetricIndex(store, self.OPERATORS)
+        self._snapshot = GraphSnapshot(SharedGraph(), NodeInterner(), store,
+                                       index)
+        self._local = local()
+        self._write_lock = RLock()
+        self._cache_lock = Lock()
         self._path_fun = nx.all_shortest_paths
-        
+        self.pool = SearchPool(workers, executor, deadline)
+        self.algorithm = algorithm
+        self.hierarchies = tuple(hierarchies)
+        self.tree_sources = tree_sources if tree_sources == "switches" \
+            else tuple(tree_sources)
+        self.tree_parameters = tuple(tree_parameters)
+        self._pool_lock = Lock()
+        self._landmark_parameters = set()
+        self._builder = None
+        self._building = None
+
+    def shutdown(self):
+        """Stop the workers of the flexible searches and of the builds."""
+        self.pool.shutdown()
+        with self._pool_lock:
+            if self._builder is not None:
+                self._builder.shutdown(wait=False)
+                self._builder = None
+
+    def _current(self):
+        """Return the snapshot pinned by this thread, or the published one."""
+        return getattr(self._local, "snapshot", None) or self._snapshot
+
+    @property
+    def graph(self):
+        """Return the networkx graph of the current snapshot."""
+        return self._current().graph
+
+    @property
+    def nodes(self):
+        """Return the node ids of the current snapshot."""
+        return self._current().nodes
+
+    @property
+    def store(self):
+        """Return the links metadata of the current snapshot."""
+        return self._current().store
+
+    @property
+    def index(self):
+        """Return the metric index of the current snapshot."""
+        return self._current().index
+
+    @property
+    def topology_version(self):
+        """Return the version of the current snapshot."""
+        return self._current().version
+
+    @property
+    def trees_ready(self):
+        """Tell whether the shortest path trees of the snapshot are built."""
+        return self._current().trees_ready
+
+    def tree_stats(self):
+        """Return the readiness and the memory of the shortest path trees.
+
+        Bytes are an estimate of the dicts and lists holding the trees.
+        """
+        snapshot = self._current()
+        trees = [tree for trees in snapshot.trees.values()
+                 for tree in trees.values()]
+        return {"ready": snapshot.trees_ready, "trees": len(trees),
+                "predecessors": sum(tree.entries for tree in trees),
+                "bytes": sum(tree.size() for tree in trees)}
+
+    @contextmanager
+    def _pinned(self):
+        """Make the queries of this thread read the published snapshot."""
+        if getattr(self._local, "snapshot", None) is not None:
+            yield
+            return
+        self._local.snapshot = self._snapshot
+        try:
+            yield
+        finally:
+            self._local.snapshot = None
+
+    def _pinned_call(self, snapshot, function, *args):
+        """Call a function of a worker thread reading a given snapshot."""
+        self._local.snapshot = snapshot
+        try:
+            return function(*args)
+        finally:
+            self._local.snapshot = None
+
+    @contextmanager
+    def _writing(self):
+        """Make the updates of this thread change a copy of the snapshot.
+
+        Updates are serialized, and nested updates share the copy of the
+        outermost one. The copy is published when the outermost update
+        ends, and dropped if it raises.
+        """
+        with self._write_lock:
+            if getattr(self._local, "draft", None) is not None:
+                yield
+                return
+            draft = self._local.draft = self._snapshot.copy()
+            self._local.snapshot = draft
+            try:
+                yield
+            finally:
+                self._local.draft = self._local.snapshot = None
+            self._publish(draft)
+
+    def _publish(self, draft):
+        """Compile a snapshot and make it the one read by new queries.
+
+        The cache invalidations of the update are applied one by one after
+        the swap, and queries use the cache of the new snapshot only once
+        they are all applied, so no query can cache a result of the
+        previous snapshot after them. Queries never wait for them.
+        """
+        if self.backend == "csr" and draft.csr is None:
+            draft.csr = CSRGraph(draft.graph, draft.store,
+                                 len(draft.nodes.names))
+        if self.tree_sources and draft.changes is not None:
+            self._repair_trees(self._snapshot, draft)
+        self._snapshot = draft
+        for invalidate, args in draft.pending:
+            with self._cache_lock:
+                invalidate(*args)
+        draft.pending = []
+        draft.cache_ready = True
+        if (self._landmark_parameters or self.hierarchies or
+                self.tree_sources):
+            self._build_in_background(draft)
+
+    def _invalidate(self, invalidate, *args):
+        """Apply a cache invalidation when the current update is published."""
+        draft = getattr(self._local, "draft", None)
+        if draft is not None:
+            draft.pending.append((invalidate, args))
+            return
+        with self._cache_lock:
+            invalidate(*args)
+
+    def _cache_usable(self):
+        """Tell if the cache holds the results of the pinned snapshot."""
+        snapshot = self._current()
+        return snapshot is self._snapshot and snapshot.cache_ready
+
+    def _cache_get(self, key):
+        """Return a cached result of the pinned snapshot, or None.
+
+        The cache is skipped instead of waiting when its lock is taken.
+        """
+        if key is None or not self._cache_usable():
+            return None
+        if not self._cache_lock.acquire(blocking=False):
+            return None
+        try:
+            return self.cache.get(key) if self._cache_usable() else None
+        finally:
+            self._cache_lock.release()
+
+    def _cache_put(self, key, value, edges=(), nodes=()):
+        """Cache a result unless a newer snapshot was published.
+
+        The result is not cached instead of waiting when the lock is taken.
+        """
+        if key is None or not self._cache_usable():
+            return
+        if not self._cache_lock.acquire(blocking=False):
+            return
+        try:
+            if self._cache_usable():
+                self.cache.put(key, value, edges, nodes)
+        finally:
+            self._cache_lock.release()
 
     def set_path_fun(self, path_fun):
         self._path_fun = path_fun
+        self._invalidate(self.cache.clear)
 
+    @writes_snapshot
     def clear(self):
         """Remove all nodes and links registered."""
         self.graph.clear()
+        self.nodes.clear()
+        self.store.clear()
+        self.index.clear()
+        self._current().interfaces = {}
+        self._topology_changed()
+
+    def _add_edge(self, endpoint_a, endpoint_b, metadata=None):
+        """Add an edge between node ids and its metadata to the store."""
+        self.graph.add_edge(endpoint_a, endpoint_b)
+        edge_id = self.store.add(endpoint_a, endpoint_b)
+        self.index.discard(edge_id)
+        if metadata:
+            self.store.update(edge_id, metadata)
+        self.index.add(edge_id)
+        return edge_id
+
+    def _replace_metadata(self, edge_id, metadata):
+        """Replace the metadata of an edge, returning True if it changed.
+
+        Only the index entries of the edge are refreshed, and only when
+        its metadata differs.
+        """
+        if self.store.metadata(edge_id) == metadata:
+            return False
+        self.index.discard(edge_id)
+        changed = self.store.replace(edge_id, metadata)
+        self.index.add(edge_id)
+        return changed
+
+    def _remove_edge(self, endpoint_a, endpoint_b):
+        """Remove an edge between node ids from the graph and the store."""
+        self.graph.remove_edge(endpoint_a, endpoint_b)
+        self.index.discard(self.store.edge_id(endpoint_a, endpoint_b))
+        self.store.remove(endpoint_a, endpoint_b)
+
+    def _topology_changed(self):
+        """Move to a new topology version, invalidating cached paths."""
+        self._current().version += 1
+        self._current().changes = None
+        self._graph_changed()
+        self._invalidate(self.cache.clear)
+
+    def _graph_changed(self):
+        """Mark the structures compiled from the graph as outdated."""
+        self._current().csr = None
+
+    @staticmethod
+    def _depends_on_metadata(key):
+        """Tell whether a cached result depends on the links metadata."""
+        return key[0] != "shortest_paths" or key[3] is not None
+
+    def _edges_changed(self, removed=(), added=(), updated=(), nodes=()):
+        """Move to a new topology version, dropping only affected paths.
+
+        Removing an edge can only invalidate the paths that use it, and a
+        node only matters to the queries that start or end on it. A new
+        edge, on the other hand, may shorten any path whose source is in
+        its connected component, so every entry in that component is
+        dropped. Changing the metadata of an edge does the same, but only
+        for the results that filter or weigh edges by metadata.
 
+        Edges are given by node ids and nodes by name.
+        """
+        snapshot = self._current()
+        snapshot.version += 1
+        if snapshot.changes is not None:
+            snapshot.changes.append((list(removed), list(added),
+                                     list(updated)))
+        self._graph_changed()
+        self._invalidate(self.cache.invalidate_edges,
+                         [PathCache.edge_key(*edge) for edge in removed])
+        self._invalidate(self.cache.invalidate_nodes, list(nodes))
+        for edges, predicate in ((added, None),
+                                 (updated, self._depends_on_metadata)):
+            visited = set()
+            for endpoint, _ in edges:
+                if endpoint in visited or endpoint not in self.graph:
+                    continue
+                component = nx.node_connected_component(self.graph,
+                                                        endpoint)
+                visited.update(component)
+                self._invalidate(self.cache.invalidate_nodes,
+                                 self.nodes.path(component), predicate)
+
+    @writes_snapshot
     def update_topology(self, topology):
-        """Update all nodes and links inside the graph."""
-        self.graph.clear()
+        """Update all nodes and links inside the graph.
+
+        When the graph is in incremental mode only the differences between
+        the current graph and the new topology are applied, otherwise the
+        graph is cleared and rebuilt. Return the delta that was applied.
+        """
+        if self.incremental:
+            return self.apply_topology_diff(topology)
+
+        self.clear()
         self.update_nodes(topology.switches)
         self.update_links(topology.links)
+        self.last_delta = self._empty_delta()
+        self.last_delta["full_rebuild"] = True
+        return self.last_delta
+
+    @staticmethod
+    def _empty_delta():
+        """Return a delta report with every counter set to zero."""
+        return {"nodes_added": 0, "nodes_removed": 0, "edges_added": 0,
+                "edges_removed": 0, "edges_updated": 0,
+                "full_rebuild": False}
+
+    @staticmethod
+    def _topology_elements(topology):
+        """Return the nodes, edges and interfaces of a topology.
+
+        Edges are keyed by their endpoints and map to the metadata that the
+        store must hold for them, mirroring update_nodes/update_links.
+        Interfaces map to the id of their switch.
+        """
+        nodes = set()
+        edges = {}
+        interfaces = {}
+        for node in topology.switches.values():
+            try:
+                nodes.add(node.id)
+                for interface in node.interfaces.values():
+                    nodes.add(interface.id)
+                    edges[(node.id, interface.id)] = {}
+                    interfaces[interface.id] = node.id
+            except AttributeError:
+                pass
 
+        for link in topology.links.values():
+            if link.is_active():
+                endpoint_a = link.endpoint_a.id
+                endpoint_b = link.endpoint_b.id
+                nodes.update((endpoint_a, endpoint_b))
+                if (endpoint_b, endpoint_a) in edges:
+                    endpoint_a, endpoint_b = endpoint_b, endpoint_a
+                data = edges.setdefault((endpoint_a, endpoint_b), {})
+                data.update(link.metadata)
+        return nodes, edges, interfaces
+
+    @writes_snapshot
+    def apply_topology_diff(self, topology):
+        """Apply only what changed between the graph and a new topology.
+
+        Nodes and edges missing from the topology are removed, new ones are
+        added and edges whose metadata differ are re-attributed. Return a
+        dict counting each kind of change, also kept in ``last_delta``.
+        """
+        nodes, edges, interfaces = self._topology_elements(topology)
+        if interfaces != self._current().interfaces:
+            self._current().interfaces = interfaces
+        removed_edges, added_edges, updated_edges = [], [], []
+        names = self.nodes.names
+
+        for endpoint_a, endpoint_b in list(self.graph.edges):
+            name_a, name_b = names[endpoint_a], names[endpoint_b]
+            if ((name_a, name_b) not in edges and
+                    (name_b, name_a) not in edges):
+                self._remove_edge(endpoint_a, endpoint_b)
+                removed_edges.append((endpoint_a, endpoint_b))
+
+        removed_nodes = [names[node] for node in self.graph.nodes
+                         if names[node] not in nodes]
+        for node in removed_nodes:
+            self.graph.remove_node(self.nodes.get(node))
+            self.nodes.release(node)
+        added_nodes = [node for node in nodes if node not in self.nodes]
+        self.graph.add_nodes_from(self.nodes.intern(node)
+                                  for node in added_nodes)
+
+        for (name_a, name_b), data in edges.items():
+            endpoint_a = self.nodes.get(name_a)
+            endpoint_b = self.nodes.get(name_b)
+            edge_id = self.store.edge_id(endpoint_a, endpoint_b)
+            if edge_id is None:
+                self._add_edge(endpoint_a, endpoint_b, data)
+                added_edges.append((endpoint_a, endpoint_b))
+            elif self._replace_metadata(edge_id, data):
+                updated_edges.append((endpoint_a, endpoint_b))
+
+        delta = self._empty_delta()
+        delta.update(nodes_added=len(added_nodes),
+                     nodes_removed=len(removed_nodes),
+                     edges_added=len(added_edges),
+                     edges_removed=len(removed_edges),
+                     edges_updated=len(updated_edges))
+        if delta != self._empty_delta():
+            self._edges_changed(removed_edges, added_edges, updated_edges,
+                                removed_nodes + added_nodes)
+        self.last_delta = delta
+        return delta
+
+    def _intern(self, name, added):
+        """Return the id of a node, adding it to the graph if needed."""
+        if name not in self.nodes:
+            added.append(name)
+        node_id = self.nodes.intern(name)
+        self.graph.add_node(node_id)
+        return node_id
+
+    @writes_snapshot
     def update_nodes(self, nodes):
         """Update all nodes inside the graph."""
+        added_nodes, added_edges = [], []
+        snapshot = self._current()
+        interfaces = {}
         for node in nodes.values():
             try:
-                self.graph.add_node(node.id)
+                node_id = self._intern(node.id, added_nodes)
 
                 for interface in node.interfaces.values():
-                    self.graph.add_node(interface.id)
-                    self.graph.add_edge(node.id, interface.id)
+                    interface_id = self._intern(interface.id, added_nodes)
+                    if not self.graph.has_edge(node_id, interface_id):
+                        added_edges.append((node_id, interface_id))
+                        self._add_edge(node_id, interface_id)
+                    interfaces[interface.id] = node.id
 
             except AttributeError:
                 pass
+        if any(snapshot.interfaces.get(interface) != switch
+               for interface, switch in interfaces.items()):
+            snapshot.interfaces = {**snapshot.interfaces, **interfaces}
+        self._edges_changed(added=added_edges, nodes=added_nodes)
 
+    @writes_snapshot
     def update_links(self, links):
-        """Update all links inside the graph."""
-        keys = []
+        """Update all links inside the graph.
+
+        Active links are added with their metadata and the edges of
+        inactive links are removed. The metadata of a link replaces the
+        stored one, so added, changed and removed keys all count as a
+        change. Only the cached paths and the index entries affected by
+        these changes are refreshed.
+        """
+        removed, added, updated, nodes = [], [], [], []
         for link in links.values():
-            if link.is_active():
-                self.graph.add_edge(link.endpoint_a.id, link.endpoint_b.id)
-                for key, value in link.metadata.items():
-                    keys.append(key)
-                    endpoint_a = link.endpoint_a.id
-                    endpoint_b = link.endpoint_b.id
-                    self.graph[endpoint_a][endpoint_b][key] = value
+            if not link.is_active():
+                endpoint_a = self.nodes.get(link.endpoint_a.id)
+                endpoint_b = self.nodes.get(link.endpoint_b.id)
+                if self.graph.has_edge(endpoint_a, endpoint_b):
+                    self._remove_edge(endpoint_a, endpoint_b)
+                    removed.append((endpoint_a, endpoint_b))
+                continue
+
+            endpoint_a = self._intern(link.endpoint_a.id, nodes)
+            endpoint_b = self._intern(link.endpoint_b.id, nodes)
+            edge_id = self.store.edge_id(endpoint_a, endpoint_b)
+            if edge_id is None:
+                self._add_edge(endpoint_a, endpoint_b, link.metadata)
+                added.append((endpoint_a, endpoint_b))
+            elif self._replace_metadata(edge_id, link.metadata):
+                updated.append((endpoint_a, endpoint_b))
+        self._edges_changed(removed, added, updated, nodes)
 
+    @reads_snapshot
     def get_metadata_from_link(self, endpoint_a, endpoint_b):
         """Return the metadata of a link."""
-        return self.graph.edges[endpoint_a, endpoint_b]
-            
+        edge_id = self.store.edge_id(self.nodes.get(endpoint_a),
+                                     self.nodes.get(endpoint_b))
+        if edge_id is None:
+            raise KeyError((endpoint_a, endpoint_b))
+        return self.store.metadata(edge_id)
+
     @staticmethod
     def _remove_switch_hops(circuit):
         """Remove switch hops from a circuit hops list."""
@@ -83,55 +548,272 @@ class KytosGraph:
             if len(hop.split(':')) == 8:
                 circuit['hops'].remove(hop)
 
-    def shortest_paths(self, source, destination, parameter=None):
-        """Calculate the shortest paths and return them."""
-        try:
-            paths = list(self._path_fun(self.graph,
-                                        source, destination, parameter))
-        except (NodeNotFound, NetworkXNoPath):
-            return []
-        return paths
-
-    def constrained_flexible_paths(self, source, destination, flexible = 0,  **metrics):
-        combos = []
-        length = len(metrics)
-        flexible = max(0,flexible)
-        flexible = min(length,flexible)
-        results = []
-        for i in range(0,flexible+1):
-            y = combinations(metrics.items(),length-i)
-            found = False
-            for x in y:
-                tempDict = {}
-                for k,v in x:
-                    tempDict[k] = v
-                res0 = self._constrained_shortest_paths(source,destination,**tempDict)
-                if res0["paths"] != []:
-                    results.append(res0)
-        return results
-
-    def _constrained_shortest_paths(self, source, destination, **metrics):
-        paths = []
-        edges = self._filter_edges(**metrics)
+    @staticmethod
+    def _cache_key(*args):
+        """Return a cache key for the given query arguments.
+
+        Return None when the arguments can not be hashed, so that the
+        result is computed without going through the cache.
+        """
         try:
-            paths = list(self._path_fun(self.graph.edge_subgraph(edges),
-                                        source, destination))
-        except NetworkXNoPath:
-            pass
-        except NodeNotFound:
-            if source == destination:
-                if source in self.graph.nodes:
-                    paths = [[source]]
-        return {"paths":paths, "metrics":metrics}
-
-    def _filter_edges(self, **metrics):
-        edges = self.graph.edges(data=True)
-        for metric, value in metrics.items():
-            fun0 = self._filter_fun_dict.get(metric, None)
-            if fun0 != None:
-                fun1 = fun0(value)
-                edges = filter(fun1,edges)
-        edges = ((u,v) for u,v,d in edges)
-        return edges
-
-    
+            hash(args)
+        except TypeError:
+            return None
+        return args
+
+    @staticmethod
+    def _path_edges(paths):
+        """Return the edge keys used by a list of paths."""
+        return {PathCache.edge_key(endpoint_a, endpoint_b)
+                for path in paths
+                for endpoint_a, endpoint_b in zip(path, path[1:])}
+
+    def _endpoint_ids(self, source, destination):
+        """Return the node ids of source and destination, or None."""
+        source_id = self.nodes.get(source)
+        destination_id = self.nodes.get(destination)
+        if source_id is None or destination_id is None:
+            return None
+        return source_id, destination_id
+
+    @reads_snapshot
+    def shortest_paths(self, source, destination, parameter=None,
+                       max_paths=None, desired=(), undesired=(),
+                       algorithm=None):
+        """Calculate the shortest paths and return them.
+
+        When max_paths is given the paths are enumerated lazily and the
+        search stops after that many paths. Desired and undesired links
+        are given by the names of their endpoints: every path goes through
+        all the desired links and none of the undesired ones. Algorithm
+        is one of ALGORITHMS, or None for the one of the graph. Every
+        algorithm finds the same shortest paths, so results are cached
+        regardless of it.
+        """
+        desired = tuple(tuple(link) for link in desired)
+        undesired = tuple(tuple(link) for link in undesired)
+        key = self._cache_key("shortest_paths", source, destination,
+                              parameter, max_paths, desired, undesired)
+        paths = self._cache_get(key)
+        if paths is None:
+            paths = []
+            endpoints = self._endpoint_ids(source, destination)
+            if endpoints is not None:
+                paths = self._links_search(*endpoints, parameter, max_paths,
+                                           desired, undesired, algorithm)
+            self._cache_put(key, paths, self._path_edges(paths),
+                            (source, destination))
+        return [self.nodes.path(path) for path in paths]
+
+    @reads_snapshot
+    def constrained_flexible_paths(self, source, destination, flexible=0, *,
+                                   max_paths=None, **metrics):
+        """Calculate the shortest paths relaxing up to flexible metrics.
+
+        When max_paths is given each combination of metrics stops after
+        that many paths. It is keyword only, so every other keyword is a
+        metric.
+        """
+        key = self._cache_key("constrained_flexible_paths", source,
+                              destination, flexible, tuple(metrics.items()),
+                              max_paths)
+        results = self._cache_get(key)
+        if results is None:
+            results = []
+            endpoints = self._endpoint_ids(source, destination)
+            if endpoints is not None:
+                results = self._constrained_flexible_paths(
+                    *endpoints, flexible, max_paths=max_paths, **metrics)
+            edges = self._path_edges(path for result in results
+                                     for path in result["paths"])
+            self._cache_put(key, results, edges, (source, destination))
+        return [{"paths": [self.nodes.path(path) for path in result["paths"]],
+                 "metrics": dict(result["metrics"])} for result in results]
+
+    @reads_snapshot
+    def minimum_relaxation_paths(self, source, destination, flexible=0, *,
+                                 max_paths=None, **metrics):
+        """Calculate the shortest paths relaxing as few metrics as possible.
+
+        The combinations relaxing no metric are searched first, then the
+        ones relaxing one metric and so on up to flexible, stopping at the
+        first level where some combination has paths. Return the results
+        of that level, like constrained_flexible_paths does.
+        """
+        key = self._cache_key("minimum_relaxation_paths", source,
+                              destination, flexible, tuple(metrics.items()),
+                              max_paths)
+        results = self._cache_get(key)
+        if results is None:
+            results = []
+            endpoints = self._endpoint_ids(source, destination)
+            if endpoints is not None:
+                results = self._minimum_relaxation_paths(
+                    *endpoints, flexible, max_paths=max_paths, **metrics)
+            edges = self._path_edges(path for result in results
+                                     for path in result["paths"])
+            self._cache_put(key, results, edges, (source, destination))
+        return [{"paths": [self.nodes.path(path) for path in result["paths"]],
+                 "metrics": dict(result["metrics"])} for result in results]
+
+    @reads_snapshot
+    def pareto_paths(self, source, destination, **metrics):
+        """Return the Pareto frontier of the paths over the given metrics.
+
+        A single search finds the paths that no other path beats on the
+        hop count and on every metric at once. Each result has one path,
+        the metrics it satisfies as in constrained_flexible_paths, and
+        the values of the path: the hop count, the bottleneck of the
+        ``>=`` metrics, the largest value of the ``<=`` metrics and
+        whether every link matches the ``==`` metrics.
+        """
+        key = self._cache_key("pareto_paths", source, destination,
+                              tuple(metrics.items()))
+        results = self._cache_get(key)
+        if results is None:
+            results = []
+            endpoints = self._endpoint_ids(source, destination)
+            if endpoints is not None:
+                results = self._pareto_paths(*endpoints, **metrics)
+            edges = self._path_edges(path for result in results
+                                     for path in result["paths"])
+            self._cache_put(key, results, edges, (source, destination))
+        return [{"paths": [self.nodes.path(path) for path in result["paths"]],
+                 "metrics": dict(result["metrics"]),
+                 "values": dict(result["values"])} for result in results]
+
+    @reads_snapshot
+    def budget_paths(self, source, destination, budgets, minimize=None, *,
+                     max_paths=None, **metrics):
+        """Return the cheapest paths whose sums fit the given budgets.
+
+        Budgets bound the sum of a ``<=`` metric along the path, like its
+        total delay, or its hop count with "hops". Paths minimize the sum
+        of the minimize metric, or their hop count, and only use links
+        passing every metric filter. Each result has one path, the metric
+        filters and the values of the path: its sum for minimize and for
+        every budget. Raise ValueError when a budget or minimize is not
+        one of ADDITIVE_METRICS.
+        """
+        key = self._cache_key("budget_paths", source, destination,
+                              tuple(budgets.items()), minimize, max_paths,
+                              tuple(metrics.items()))
+        results = self._cache_get(key)
+        if results is None:
+            results = []
+            endpoints = self._endpoint_ids(source, destination)
+            if endpoints is not None:
+                results = self._budget_paths(*endpoints, budgets, minimize,
+                                             max_paths=max_paths, **metrics)
+            edges = self._path_edges(path for result in results
+                                     for path in result["paths"])
+            self._cache_put(key, results, edges, (source, destination))
+        return [{"paths": [self.nodes.path(path) for path in result["paths"]],
+                 "metrics": dict(result["metrics"]),
+                 "values": dict(result["values"])} for result in results]
+
+    @reads_snapshot
+    def shortest_paths_batch(self, queries):
+        """Answer many shortest_paths queries, sharing work between them.
+
+        Queries are (source, destination, parameter, max_paths) tuples.
+        Queries not in the cache are grouped by source, parameter and
+        max_paths, and each group is answered by a single search from its
+        source. Return the paths of every query, in the order of the
+        queries.
+        """
+        results = [None] * len(queries)
+        groups = {}
+        for position, query in enumerate(queries):
+            source, destination, parameter, max_paths = query
+            key = self._cache_key("shortest_paths", source, destination,
+                                  parameter, max_paths, (), ())
+            paths = self._cache_get(key)
+            if paths is not None:
+                results[position] = paths
+                continue
+            group_key = self._cache_key(source, parameter, max_paths)
+            if group_key is None:
+                group_key = position
+            group = groups.setdefault(group_key,
+                                      (source, parameter, max_paths, {}))
+            group[3].setdefault(destination, []).append((position, key))
+
+        for source, parameter, max_paths, destinations in groups.values():
+            source_id = self.nodes.get(source)
+            ids = {destination: self.nodes.get(destination)
+                   for destination in destinations}
+            found = {}
+            if source_id is not None:
+                found = self._search_from(
+                    source_id, [node_id for node_id in ids.values()
+                                if node_id is not None], parameter,
+                    max_paths=max_paths)
+            for destination, positions in destinations.items():
+                paths = found.get(ids[destination], [])
+                for position, key in positions:
+                    results[position] = paths
+                    self._cache_put(key, paths, self._path_edges(paths),
+                                    (source, destination))
+        return [[self.nodes.path(path) for path in paths]
+                for paths in results]
+
+    @reads_snapshot
+    def constrained_flexible_paths_batch(self, queries):
+        """Answer many constrained_flexible_paths queries at once.
+
+        Queries are (source, destination, flexible, metrics, max_paths)
+        tuples. Queries not in the cache are grouped by everything but
+        their destination, so every combination of metrics is searched
+        once per group. Return the results of every query, in the order of
+        the queries, or the TimeoutError of the queries whose group did not
+        end its searches in time.
+        """
+        results = [None] * len(queries)
+        groups = {}
+        for position, query in enumerate(queries):
+            source, destination, flexible, metrics, max_paths = query
+            key = self._cache_key("constrained_flexible_paths", source,
+                                  destination, flexible,
+                                  tuple(metrics.items()), max_paths)
+            found = self._cache_get(key)
+            if found is not None:
+                results[position] = found
+                continue
+            group_key = self._cache_key(source, flexible,
+                                        tuple(metrics.items()), max_paths)
+            if group_key is None:
+                group_key = position
+            group = groups.setdefault(
+                group_key, (source, flexible, metrics, max_paths, {}))
+            group[4].setdefault(destination, []).append((position, key))
+
+        for source, flexible, metrics, max_paths, destinations in \
+                groups.values():
+            source_id = self.nodes.get(source)
+            ids = {destination: self.nodes.get(destination)
+                   for destination in destinations}
+            found = {}
+            try:
+                if source_id is not None:
+                    found = self._constrained_flexible_paths_from(
+                        source_id, [node_id for node_id in ids.values()
+                                    if node_id is not None], flexible,
+                        max_paths=max_paths, **metrics)
+            except TimeoutError as error:
+                for positions in destinations.values():
+                    for position, _ in positions:
+                        results[position] = error
+                continue
+            for destination, positions in destinations.items():
+                found_results = found.get(ids[destination], [])
+                edges = self._path_edges(path for result in found_results
+                                         for path in result["paths"])
+                for position, key in positions:
+                    results[position] = found_results
+                    self._cache_put(key, found_results, edges,
+                                    (source, destination))
+        return [found if isinstance(found, TimeoutError) else
+                [{"paths": [self.nodes.path(path) for path in result["paths"]],
+                  "metrics": dict(result["metrics"])} for result in found]
+                for found in results]
@@ -0,0 +1,202 @@
+"""Module Hierarchy of kytos/pathfinder Kytos Network Application."""
+
+from heapq import heappop, heappush
+from itertools import count
+from math import inf
+
+
+class ContractionHierarchy:
+    """Shortcuts answering shortest path queries with small searches.
+
+    Nodes are contracted one at a time, least important first, adding a
+    shortcut between two neighbors of the node whenever no path avoiding
+    it is strictly shorter. Paths of the same cost are kept as well, with
+    every middle node of a shortcut, so queries find all the shortest
+    paths. A query searches upwards in the contraction order from both
+    ends, and the shortcuts of the cheapest meetings are unpacked back
+    into the edges of the graph. Edges are undirected.
+    """
+
+    def __init__(self):
+        self.rank = {}
+        self.up = {}
+        self.edges = {}
+
+    def record(self, endpoint_a, endpoint_b, cost, middle=None):
+        """Record an edge, or a shortcut through middle, keeping the cheapest.
+
+        Return whether the edge costs the least between its endpoints.
+        """
+        key = frozenset((endpoint_a, endpoint_b))
+        best, middles = self.edges.get(key, (inf, []))
+        if cost > best:
+            return False
+        if cost < best:
+            self.edges[key] = (cost, [middle])
+        elif middle not in middles:
+            middles.append(middle)
+        return True
+
+    def shortest_paths(self, source, destination):
+        """Generate every shortest path between two nodes of the graph."""
+        if source == destination:
+            yield [source]
+            return
+        distance, before = self._upward(source)
+        other, after = self._upward(destination)
+        totals = {node: cost + other[node] for node, cost in distance.items()
+                  if node in other}
+        if not totals:
+            return
+        total = min(totals.values())
+        found = set()
+        for meeting, cost in totals.items():
+            if cost != total:
+                continue
+            for up in self._chains(before, meeting):
+                for down in self._chains(after, meeting):
+                    hops = up + down[-2::-1]
+                    if len(set(hops)) < len(hops):
+                        continue
+                    for path in self._unpack(hops):
+                        if tuple(path) not in found:
+                            found.add(tuple(path))
+                            yield path
+
+    def _upward(self, source):
+        """Search the nodes above source, keeping every cheapest parent."""
+        distance = {source: 0}
+        predecessors = {source: []}
+        settled = set()
+        tie = count()
+        heap = [(0, next(tie), source)]
+        while heap:
+            cost, _, node = heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            for neighbor, weight in self.up.get(node, {}).items():
+                total = cost + weight
+                if total < distance.get(neighbor, inf):
+                    distance[neighbor] = total
+                    predecessors[neighbor] = [node]
+                    heappush(heap, (total, next(tie), neighbor))
+                elif total == distance[neighbor]:
+                    predecessors[neighbor].append(node)
+        return distance, predecessors
+
+    def _chains(self, predecessors, node):
+        """Generate the upward paths ending at node, from the search root."""
+        if not predecessors[node]:
+            yield [node]
+            return
+        for previous in predecessors[node]:
+            for chain in self._chains(predecessors, previous):
+                yield chain + [node]
+
+    def _unpack(self, hops, visited=frozenset()):
+        """Generate the simple paths of the graph behind a path of shortcuts.
+
+        Visited holds the nodes before the first hop, which the paths can
+        not go through again.
+        """
+        if len(hops) == 1:
+            yield list(hops)
+            return
+        for first in self._expand(hops[0], hops[1], visited):
+            for rest in self._unpack(hops[1:], visited.union(first[:-1])):
+                yield first + rest[1:]
+
+    def _expand(self, endpoint_a, endpoint_b, visited):
+        """Generate the simple paths of the graph behind a shortcut or edge."""
+        _, middles = self.edges[frozenset((endpoint_a, endpoint_b))]
+        for middle in middles:
+            if middle is None:
+                if endpoint_b not in visited:
+                    yield [endpoint_a, endpoint_b]
+                continue
+            for left in self._expand(endpoint_a, middle, visited):
+                for right in self._expand(middle, endpoint_b,
+                                          visited.union(left[:-1])):
+                    yield left + right[1:]
+
+
+def contract(neighbors, nodes, weight, cancelled=None, settle_limit=64):
+    """Build the contraction hierarchy of a graph.
+
+    Weight is called with the endpoints of an edge and returns its cost.
+    Nodes are contracted by their edge difference, the shortcuts they add
+    minus the edges they remove, plus their neighbors already contracted,
+    updated lazily. Witness searches settle up to settle_limit nodes and
+    add the shortcut when they give up, which keeps results exact.
+
+    Return None when cancelled, called between contractions, returns True.
+    """
+    hierarchy = ContractionHierarchy()
+    adjacency = {node: {} for node in nodes}
+    for node in adjacency:
+        for neighbor in neighbors(node):
+            cost = weight(node, neighbor)
+            if neighbor != node and hierarchy.record(node, neighbor, cost):
+                adjacency[node][neighbor] = cost
+
+    def shortcuts(node):
+        needed = []
+        around = list(adjacency[node].items())
+        for i, (endpoint_a, cost_a) in enumerate(around):
+            limits = {endpoint_b: cost_a + cost_b
+                      for endpoint_b, cost_b in around[i + 1:]}
+            if not limits:
+                continue
+            witness = _witness(adjacency, endpoint_a, node,
+                               max(limits.values()), settle_limit)
+            needed.extend((endpoint_a, endpoint_b, cost)
+                          for endpoint_b, cost in limits.items()
+                          if witness.get(endpoint_b, inf) >= cost)
+        return needed
+
+    contracted = dict.fromkeys(adjacency, 0)
+    tie = count()
+    heap = [(len(shortcuts(node)) - len(adjacency[node]), next(tie), node)
+            for node in adjacency]
+    heap.sort()
+    while heap:
+        if cancelled is not None and cancelled():
+            return None
+        _, _, node = heappop(heap)
+        needed = shortcuts(node)
+        priority = len(needed) - len(adjacency[node]) + contracted[node]
+        if heap and priority > heap[0][0]:
+            heappush(heap, (priority, next(tie), node))
+            continue
+        hierarchy.rank[node] = len(hierarchy.rank)
+        hierarchy.up[node] = adjacency.pop(node)
+        for neighbor in hierarchy.up[node]:
+            del adjacency[neighbor][node]
+            contracted[neighbor] += 1
+        for endpoint_a, endpoint_b, cost in needed:
+            if hierarchy.record(endpoint_a, endpoint_b, cost, node):
+                adjacency[endpoint_a][endpoint_b] = cost
+                adjacency[endpoint_b][endpoint_a] = cost
+    return hierarchy
+
+
+def _witness(adjacency, source, avoided, limit, settle_limit):
+    """Return the distances from source avoiding a node, up to limit."""
+    distance = {source: 0}
+    settled = set()
+    tie = count()
+    heap = [(0, next(tie), source)]
+    while heap and len(settled) < settle_limit:
+        cost, _, node = heappop(heap)
+        if node in settled:
+            continue
+        if cost > limit:
+            break
+        settled.add(node)
+        for neighbor, weight in adjacency[node].items():
+            total = cost + weight
+            if neighbor != avoided and total < distance.get(neighbor, inf):
+                distance[neighbor] = total
+                heappush(heap, (total, next(tie), neighbor))
+    return distance
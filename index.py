@@ -0,0 +1,152 @@
+"""Module Index of kytos/pathfinder Kytos Network Application."""
+
+from bisect import bisect_left, bisect_right, insort
+from math import inf
+
+
+class MetricIndex:
+    """Indexes of the links metadata used to answer threshold queries.
+
+    Metrics compared with ``<=`` or ``>=`` keep their edges sorted by value,
+    so the edges passing a threshold are a slice found by binary search.
+    Metrics compared with ``==`` keep a hash map from value to edges.
+
+    The index reads the columns of a LinkAttributeStore, and is kept up to
+    date edge by edge: ``add`` indexes the values an edge has in the store,
+    and ``discard`` forgets them, so it must be called before the values of
+    the edge change in the store. Query results are bitmasks over the store
+    edge ids, where bit i is set when edge i passes the filter. Edges
+    without the metric always pass.
+    """
+
+    def __init__(self, store, operators):
+        self.store = store
+        self.operators = operators
+        self.alive = 0
+        self._sorted = {}
+        self._hashed = {}
+        self._missing = {}
+        self._owned = set()
+        self.clear()
+
+    @property
+    def edges(self):
+        """Return the edges by id, with None for the free ids."""
+        return self.store.edges
+
+    def copy(self, store):
+        """Return an index of a copy of the store, sharing the entries.
+
+        Sorted lists and value groups are copied by the first change made
+        to them in either index, so an update only copies the entries of
+        the metrics it changes.
+        """
+        index = MetricIndex.__new__(MetricIndex)
+        index.store = store
+        index.operators = self.operators
+        index.alive = self.alive
+        index._sorted = dict(self._sorted)
+        index._hashed = {metric: dict(groups)
+                         for metric, groups in self._hashed.items()}
+        index._missing = dict(self._missing)
+        index._owned = set()
+        self._owned = set()
+        return index
+
+    def clear(self):
+        """Forget every edge."""
+        self.alive = 0
+        self._owned = set()
+        for metric, operator in self.operators.items():
+            if operator == "==":
+                self._hashed[metric] = {}
+            else:
+                self._sorted[metric] = []
+            self._missing[metric] = 0
+
+    def _own(self, *key):
+        """Copy the entries of a key unless this index already did."""
+        if key in self._owned:
+            return
+        self._owned.add(key)
+        if key[0] == "sorted":
+            self._sorted[key[1]] = list(self._sorted[key[1]])
+        else:
+            groups = self._hashed[key[1]]
+            groups[key[2]] = set(groups.get(key[2], ()))
+
+    def add(self, edge_id):
+        """Index the current store values of an edge."""
+        bit = 1 << edge_id
+        self.alive |= bit
+        store = self.store
+        for metric, operator in self.operators.items():
+            if not store.present[metric][edge_id]:
+                self._missing[metric] |= bit
+                continue
+            self._missing[metric] &= ~bit
+            code = store.columns[metric][edge_id]
+            if operator == "==":
+                self._own("hashed", metric, code)
+                self._hashed[metric][code].add(edge_id)
+            else:
+                self._own("sorted", metric)
+                insort(self._sorted[metric], (code, edge_id))
+
+    def discard(self, edge_id):
+        """Forget the store values of an edge."""
+        bit = 1 << edge_id
+        if not self.alive & bit:
+            return
+        self.alive &= ~bit
+        store = self.store
+        for metric, operator in self.operators.items():
+            self._missing[metric] &= ~bit
+            if not store.present[metric][edge_id]:
+                continue
+            code = store.columns[metric][edge_id]
+            if operator == "==":
+                self._own("hashed", metric, code)
+                self._hashed[metric][code].discard(edge_id)
+            else:
+                self._own("sorted", metric)
+                entries = self._sorted[metric]
+                del entries[bisect_left(entries, (code, edge_id))]
+
+    @staticmethod
+    def mask(edge_ids):
+        """Return the bitmask of the given edge ids.
+
+        Only the given ids are visited, the bytes in between are zeroed
+        and converted at once.
+        """
+        edge_ids = list(edge_ids)
+        if not edge_ids:
+            return 0
+        bits = bytearray((max(edge_ids) >> 3) + 1)
+        for edge_id in edge_ids:
+            bits[edge_id >> 3] |= 1 << (edge_id & 7)
+        return int.from_bytes(bits, "little")
+
+    def matching(self, metric, value):
+        """Return the ids of the edges whose metric passes the value.
+
+        Edges without the metric are not included. A value that does not
+        match the column type is passed by no edge.
+        """
+        code = self.store.code(metric, value)
+        if code is None:
+            return []
+        operator = self.operators[metric]
+        if operator == "==":
+            return list(self._hashed[metric].get(code, ()))
+        entries = self._sorted[metric]
+        if operator == ">=":
+            passing = entries[bisect_left(entries, (code,)):]
+        else:
+            passing = entries[:bisect_right(entries, (code, inf))]
+        return [edge_id for _, edge_id in passing]
+
+    def query(self, metric, value):
+        """Return the bitmask of the edges passing a metric filter."""
+        return self._missing[metric] | self.mask(self.matching(metric, value))
@@ -5,6 +5,8 @@ from kytos.core import KytosNApp, log, rest
 from kytos.core.helpers import listen_to
 
 # pylint: disable=import-error
+from napps.kytos.pathfinder import settings
+from napps.kytos.pathfinder.debounce import Debouncer
 from napps.kytos.pathfinder.graph import KytosGraph
 
 # pylint: enable=import-error
@@ -18,101 +20,287 @@ class Main(KytosNApp):
 
     def setup(self):
         """Create a graph to handle the nodes and edges."""
-        self.graph = KytosGraph()
+        self.graph = KytosGraph(
+            incremental=settings.INCREMENTAL_TOPOLOGY_UPDATE,
+            cache_size=settings.PATH_CACHE_SIZE,
+            backend=settings.GRAPH_BACKEND,
+            workers=settings.FLEXIBLE_WORKERS,
+            executor=settings.FLEXIBLE_EXECUTOR,
+            deadline=settings.FLEXIBLE_DEADLINE,
+            algorithm=settings.SEARCH_ALGORITHM,
+            hierarchies=settings.CONTRACTION_HIERARCHIES,
+            tree_sources=settings.TREE_SOURCES,
+            tree_parameters=settings.TREE_PARAMETERS)
         self._topology = None
+        self._updates = Debouncer(self._apply_topology,
+                                  settings.TOPOLOGY_QUIET_WINDOW,
+                                  settings.TOPOLOGY_MAX_DELAY)
 
     def execute(self):
         """Do nothing."""
 
     def shutdown(self):
         """Shutdown the napp."""
+        self._updates.stop()
+        self.graph.shutdown()
 
-    def _filter_paths(self, paths, desired, undesired):
-        """Apply filters to the paths list.
+    def _link_endpoints(self, link_ids):
+        """Return the endpoints of the links with the given ids.
 
-        Make sure that each path in the list has all the desired links and none
-        of the undesired ones.
+        Links that are not in the topology are left out.
         """
-        filtered_paths = []
+        links = self._topology.links if self._topology else {}
+        endpoints = []
+        for link_id in link_ids or ():
+            try:
+                link = links[link_id]
+            except (KeyError, TypeError):
+                continue
+            endpoints.append((link.endpoint_a.id, link.endpoint_b.id))
+        return endpoints
 
-        if desired:
-            for link_id in desired:
-                try:
-                    endpoint_a = self._topology.links[link_id].endpoint_a.id
-                    endpoint_b = self._topology.links[link_id].endpoint_b.id
-                except KeyError:
-                    return []
-
-                for path in paths:
-                    head = path['hops'][:-1]
-                    tail = path['hops'][1:]
-                    if (((endpoint_a, endpoint_b) in zip(head, tail)) or
-                            ((endpoint_b, endpoint_a) in zip(head, tail))):
-                        filtered_paths.append(path)
-        else:
-            filtered_paths = paths
-
-        if undesired:
-            for link_id in undesired:
-                try:
-                    endpoint_a = self._topology.links[link_id].endpoint_a.id
-                    endpoint_b = self._topology.links[link_id].endpoint_b.id
-                except KeyError:
-                    continue
+    def _links_paths(self, data):
+        """Return the hops of the paths honoring the links of a query.
+
+        Every path goes through all the desired links and none of the
+        undesired ones, so a desired link missing from the topology leaves
+        no path.
+        """
+        desired = data.get('desired_links') or []
+        desired_endpoints = self._link_endpoints(desired)
+        if len(desired_endpoints) < len(desired):
+            return []
+        paths = self.graph.shortest_paths(
+            data['source'], data['destination'], data.get('parameter'),
+            data.get('max_paths'), desired_endpoints,
+            self._link_endpoints(data.get('undesired_links')),
+            data.get('algorithm'))
+        return [{'hops': path} for path in paths]
 
-                for path in paths:
-                    head = path['hops'][:-1]
-                    tail = path['hops'][1:]
-                    if (((endpoint_a, endpoint_b) in zip(head, tail)) or
-                            ((endpoint_b, endpoint_a) in zip(head, tail))):
+    @staticmethod
+    def _max_paths_error(data):
+        """Return why max_paths is invalid, or None if it is valid."""
+        max_paths = data.get('max_paths')
+        if max_paths is None:
+            return None
+        if (not isinstance(max_paths, int) or isinstance(max_paths, bool) or
+                max_paths < 1):
+            return 'max_paths must be a positive integer'
+        return None
 
-                        filtered_paths.remove(path)
+    @staticmethod
+    def _links_error(data):
+        """Return why the links of a v2 query are invalid, or None."""
+        for field in ('desired_links', 'undesired_links'):
+            if not isinstance(data.get(field) or [], list):
+                return f'{field} must be a list'
+        if len(data.get('desired_links') or []) > settings.MAX_DESIRED_LINKS:
+            return (f'desired_links may have at most '
+                    f'{settings.MAX_DESIRED_LINKS} links')
+        return None
 
-        return filtered_paths
+    @staticmethod
+    def _algorithm_error(data):
+        """Return why the algorithm of a v2 query is invalid, or None."""
+        if data.get('algorithm') not in (None, *KytosGraph.ALGORITHMS):
+            return ('algorithm must be one of ' +
+                    ', '.join(map(repr, KytosGraph.ALGORITHMS)))
+        return None
 
     @rest('v2/', methods=['POST'])
     def shortest_path(self):
         """Calculate the best path between the source and destination."""
         data = request.get_json()
 
-        desired = data.get('desired_links')
-        undesired = data.get('undesired_links')
-        parameter = data.get('parameter')
+        error = self._query_error(data, constrained=False)
+        if error is not None:
+            return jsonify({'error': error}), 400
 
-        paths = []
-        for path in self.graph.shortest_paths(data['source'],
-                                              data['destination'],
-                                              parameter):
-
-            paths.append({'hops': path})
-
-        paths = self._filter_paths(paths, desired, undesired)
-        return jsonify({'paths': paths})
+        return jsonify({'paths': self._links_paths(data)})
 
     @rest('v3/', methods=['POST'])
     def shortest_constrained_path(self):
         """Get the set of shortest paths between the source and destination."""
         data = request.get_json()
 
+        error = self._query_error(data, constrained=True)
+        if error is not None:
+            return jsonify({'error': error}), 400
+
+        try:
+            paths = self._constrained_paths(data)
+        except TimeoutError as error:
+            return jsonify({'error': str(error)}), 504
+
+        return jsonify(paths)
+
+    @staticmethod
+    def _mode_error(data):
+        """Return why the mode of a v3 query is invalid, or None."""
+        mode = data.get('mode', 'all')
+        if mode not in ('all', 'budget', 'minimum', 'pareto'):
+            return "mode must be 'all', 'budget', 'minimum' or 'pareto'"
+        if mode == 'budget':
+            budgets = data.get('budgets', {})
+            if not isinstance(budgets, dict) or not all(
+                    isinstance(budget, (int, float)) and
+                    not isinstance(budget, bool) and budget >= 0
+                    for budget in budgets.values()):
+                return 'budgets must map metrics to non-negative numbers'
+            if not isinstance(data.get('minimize'), (str, type(None))):
+                return 'minimize must be a string'
+            additive = KytosGraph.ADDITIVE_METRICS
+            if any(metric not in additive for metric in
+                   [*budgets, data.get('minimize') or 'hops']):
+                return ('budgets and minimize must be one of ' +
+                        ', '.join(map(repr, additive)))
+        return None
+
+    def _constrained_paths(self, data):
+        """Return the paths of a v3 query according to its mode.
+
+        The 'all' mode searches every combination of metrics relaxing up
+        to flexible of them, the 'minimum' mode only the combinations
+        relaxing the fewest metrics that have paths, and the 'pareto' mode
+        returns the Pareto frontier of the paths over the metrics. The
+        'budget' mode returns the paths minimizing the sum of a metric with
+        the sums of others, or the hop count, within budgets.
+        """
         source = data.get('source')
         destination = data.get('destination')
         flexible = data.get('flexible', 0)
         metrics = data.get('metrics',{})
 
-        paths = self.graph.constrained_flexible_paths(source, destination,
-                                              flexible, **metrics)
-                                            
-        return jsonify(paths)
+        if data.get('mode') == 'pareto':
+            return self.graph.pareto_paths(source, destination, **metrics)
+        if data.get('mode') == 'budget':
+            return self.graph.budget_paths(
+                source, destination, data.get('budgets', {}),
+                data.get('minimize'), max_paths=data.get('max_paths'),
+                **metrics)
+        if data.get('mode') == 'minimum':
+            return self.graph.minimum_relaxation_paths(
+                source, destination, flexible,
+                max_paths=data.get('max_paths'), **metrics)
+        return self.graph.constrained_flexible_paths(
+            source, destination, flexible, max_paths=data.get('max_paths'),
+            **metrics)
+
+    @staticmethod
+    def _constrained(query):
+        """Tell whether a batch query is a v3 query."""
+        return 'metrics' in query or 'flexible' in query or 'mode' in query
+
+    @staticmethod
+    def _query_error(data, constrained):
+        """Return why a v2 or v3 query is invalid, or None if it is valid.
+
+        Every endpoint answering the queries checks them here, so a query
+        is rejected the same way by v2/, v3/ and v2/batch.
+        """
+        if not isinstance(data, dict):
+            return 'query must be an object'
+        for field in ('source', 'destination'):
+            if not isinstance(data.get(field), str):
+                return f'{field} must be a string'
+        if constrained:
+            if not isinstance(data.get('metrics', {}), dict):
+                return 'metrics must be an object'
+            flexible = data.get('flexible', 0)
+            if not isinstance(flexible, int) or isinstance(flexible, bool):
+                return 'flexible must be an integer'
+            if Main._mode_error(data) is not None:
+                return Main._mode_error(data)
+        elif not isinstance(data.get('parameter'), (str, type(None))):
+            return 'parameter must be a string'
+        elif Main._algorithm_error(data) is not None:
+            return Main._algorithm_error(data)
+        return Main._links_error(data) or Main._max_paths_error(data)
+
+    @rest('v2/batch', methods=['POST'])
+    def batch_paths(self):
+        """Answer many path queries in a single request.
+
+        Each query has the body of a v2 query, or of a v3 query when it
+        has metrics, flexible or mode. Queries sharing a source are
+        answered by a single search from it. Return the result of every
+        query in order, or an error for the invalid ones and the ones whose
+        searches did not end in time.
+        """
+        data = request.get_json()
+        queries = data.get('queries') if isinstance(data, dict) else None
+        if not isinstance(queries, list):
+            return jsonify({'error': 'queries must be a list'}), 400
+
+        results = [None] * len(queries)
+        shortest, constrained = [], []
+        for position, query in enumerate(queries):
+            error = self._query_error(
+                query, isinstance(query, dict) and self._constrained(query))
+            if error is not None:
+                results[position] = {'error': error}
+            elif query.get('mode', 'all') != 'all':
+                try:
+                    results[position] = self._constrained_paths(query)
+                except TimeoutError as error:
+                    results[position] = {'error': str(error)}
+            elif self._constrained(query):
+                constrained.append(position)
+            elif (query.get('desired_links') or
+                  query.get('undesired_links') or query.get('algorithm')):
+                results[position] = {'paths': self._links_paths(query)}
+            else:
+                shortest.append(position)
+
+        found = self.graph.shortest_paths_batch(
+            [(queries[position]['source'], queries[position]['destination'],
+              queries[position].get('parameter'),
+              queries[position].get('max_paths'))
+             for position in shortest])
+        for position, paths in zip(shortest, found):
+            results[position] = {'paths': [{'hops': path} for path in paths]}
+
+        found = self.graph.constrained_flexible_paths_batch(
+            [(queries[position]['source'], queries[position]['destination'],
+              queries[position].get('flexible', 0),
+              queries[position].get('metrics', {}),
+              queries[position].get('max_paths'))
+             for position in constrained])
+        for position, paths in zip(constrained, found):
+            if isinstance(paths, TimeoutError):
+                paths = {'error': str(paths)}
+            results[position] = paths
+
+        return jsonify({'results': results})
+
+    @rest('v2/stats', methods=['GET'])
+    def stats(self):
+        """Return counters about the path computations."""
+        return jsonify({'topology_version': self.graph.topology_version,
+                        'last_delta': self.graph.last_delta,
+                        'cache': self.graph.cache.stats,
+                        'trees': self.graph.tree_stats(),
+                        'topology_events': self._updates.stats})
 
     @listen_to('kytos.topology.updated')
     def update_topology(self, event):
         """Update the graph when the network topology was updated.
 
-        Clear the current graph and create a new with the most topoly updated.
+        Bursts of events are coalesced, and the graph is updated once with
+        the latest topology when they are over.
         """
         if 'topology' not in event.content:
             return
-        topology = event.content['topology']
+        self._updates.submit(event.content['topology'])
+
+    def _apply_topology(self, topology):
+        """Apply a topology to the graph.
+
+        Apply the differences between the current graph and the most updated
+        topology, or rebuild it from scratch when incremental updates are
+        disabled in the settings. The links of the queries are looked up in
+        the topology of the graph, so it is kept only once applied.
+        """
+        delta = self.graph.update_topology(topology)
         self._topology = topology
-        self.graph.update_topology(topology)
-        log.debug('Topology graph updated.')
+        log.debug(f'Topology graph updated: {delta}')
@@ -0,0 +1,47 @@
+"""Module Pareto of kytos/pathfinder Kytos Network Application."""
+
+from heapq import heappop, heappush
+from itertools import count
+
+
+def dominates(vector, other):
+    """Tell whether a cost vector is at least as good as another one.
+
+    Lower values are better in every position, and equal vectors dominate
+    each other, so only the first path found for a vector is kept.
+    """
+    return all(value <= other_value
+               for value, other_value in zip(vector, other))
+
+
+def label_setting(neighbors, source, destination, start, extend):
+    """Return the Pareto frontier of the paths from source to destination.
+
+    Every node keeps the cost vectors of the paths reaching it that no
+    other path dominates. Labels are expanded in lexicographic order of
+    their vectors, so extend must never make a vector lexicographically
+    smaller. It is called with a vector and an edge, and returns the
+    vector of the extended path or None to prune it.
+
+    Return the (vector, path) labels of the destination sorted by vector.
+    """
+    labels = {source: [(start, (source,))]}
+    tie = count()
+    heap = [(start, next(tie), (source,))]
+    while heap:
+        vector, _, path = heappop(heap)
+        node = path[-1]
+        if (vector, path) not in labels[node] or node == destination:
+            continue
+        for neighbor in neighbors(node):
+            extended = extend(vector, node, neighbor)
+            if extended is None:
+                continue
+            reached = labels.setdefault(neighbor, [])
+            if any(dominates(other, extended) for other, _ in reached):
+                continue
+            reached[:] = [(other, other_path) for other, other_path in reached
+                          if not dominates(extended, other)]
+            reached.append((extended, path + (neighbor,)))
+            heappush(heap, (extended, next(tie), path + (neighbor,)))
+    return sorted(labels.get(destination, []))
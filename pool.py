@@ -0,0 +1,86 @@
+"""Module Pool of kytos/pathfinder Kytos Network Application."""
+
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                wait)
+from multiprocessing import get_context
+from threading import Lock
+from time import monotonic
+
+
+class SearchPool:
+    """Workers running the searches of the flexible metric combinations.
+
+    Searches run on a thread pool, or on a process pool when they read a
+    CSR graph shared in memory. Worker processes are spawned instead of
+    forked, since a fork of the napp would copy the locks held by its
+    other threads, and the workers would deadlock on them.
+    """
+
+    def __init__(self, workers=0, executor="thread", deadline=None):
+        self.workers = workers
+        self.executor = executor
+        self.deadline = deadline
+        self._lock = Lock()
+        self._pool = None
+
+    @property
+    def remote(self):
+        """Tell whether the searches run on worker processes."""
+        return self.executor == "process" and self.workers > 0
+
+    def shutdown(self):
+        """Stop the workers, which are started again when needed."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def _executor(self):
+        """Return the pool running the searches, creating it."""
+        with self._lock:
+            if self._pool is None:
+                if self.executor == "process":
+                    self._pool = ProcessPoolExecutor(
+                        self.workers, mp_context=get_context("spawn"))
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix="pathfinder")
+            return self._pool
+
+    def run(self, search, edges, masks, remote=None, threaded=None):
+        """Run the search of every mask and return the results by mask.
+
+        Without workers the searches run one after another in this
+        thread. Worker threads run the threaded search, the search itself
+        by default, and worker processes run the remote search, called
+        with the mask only, or no worker runs when it is not given. Raise
+        TimeoutError when the deadline passes, cancelling the searches
+        that did not start.
+        """
+        deadline = None if self.deadline is None else \
+            monotonic() + self.deadline
+        if (self.workers <= 0 or len(masks) < 2 or
+                (self.executor == "process" and remote is None)):
+            searched = {}
+            for mask in masks:
+                if deadline is not None and monotonic() > deadline:
+                    raise TimeoutError(f"{len(masks) - len(searched)} of "
+                                       f"{len(masks)} searches not run")
+                searched[mask] = search(edges, mask)
+            return searched
+
+        pool = self._executor()
+        if self.executor == "process":
+            futures = {pool.submit(remote, mask): mask for mask in masks}
+        else:
+            threaded = threaded or search
+            futures = {pool.submit(threaded, edges, mask): mask
+                       for mask in masks}
+        timeout = None if deadline is None else max(0, deadline - monotonic())
+        done, pending = wait(futures, timeout)
+        if pending:
+            for future in pending:
+                future.cancel()
+            raise TimeoutError(f"{len(pending)} of {len(masks)} searches "
+                               "did not end in time")
+        return {futures[future]: future.result() for future in done}
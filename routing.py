@@ -0,0 +1,433 @@
+"""Module Routing of kytos/pathfinder Kytos Network Application."""
+
+from itertools import islice, permutations, product
+
+from kytos.core import log
+
+try:
+    import networkx as nx
+    from networkx.exception import NodeNotFound, NetworkXNoPath
+except ImportError:
+    PACKAGE = 'networkx>=2.2'
+    log.error(f"Package {PACKAGE} not found. Please 'pip install {PACKAGE}'")
+
+# pylint: disable=import-error
+from napps.kytos.pathfinder.csr import CSRGraph
+from napps.kytos.pathfinder.search import (astar_predecessors,
+                                           bidirectional_predecessors)
+from napps.kytos.pathfinder.switches import SwitchGraph
+
+# pylint: enable=import-error
+
+
+class PathSearchMixin:
+    """Search the shortest paths of a KytosGraph between node ids.
+
+    Searches pick a stored tree, a contraction hierarchy, a search from
+    both ends, A* or the path function of the graph, on the networkx
+    graph or on its CSR compilation, and may be restricted to the edges
+    of a mask or go through desired links.
+    """
+
+    def _weight(self, parameter):
+        """Return the weight argument of a search weighted by parameter."""
+        if isinstance(parameter, str):
+            return self.store.weight(parameter)
+        return parameter
+
+    def _compiled(self):
+        """Return the CSR graph, compiling it if the graph changed.
+
+        Return None when the networkx backend is selected.
+        """
+        if self.backend != "csr":
+            return None
+        snapshot = self._current()
+        if snapshot.csr is None:
+            snapshot.csr = CSRGraph(snapshot.graph, snapshot.store,
+                                    len(snapshot.nodes.names))
+        return snapshot.csr
+
+    def _search(self, source, destination, parameter=None, mask=None,
+                max_paths=None, algorithm=None):
+        """Search the paths with the path function of the graph.
+
+        Source and destination are node ids of the graph, and so are the
+        paths found. When a mask is given only the edges it selects are
+        used. Searches run on the CSR backend when it is selected and
+        implements the path function, and on networkx otherwise. Paths
+        are generated lazily and the search stops after max_paths. All
+        shortest paths may be read from the stored tree of an endpoint,
+        or searched from both ends or with A* instead, see _algorithm.
+        """
+        algorithm = algorithm or self.algorithm
+        if mask is None and algorithm == "auto":
+            paths = self._tree_paths(source, destination, parameter,
+                                     max_paths)
+            if paths is not None:
+                return paths
+        algorithm = self._algorithm(parameter, algorithm, mask)
+        if algorithm == "hierarchy":
+            if source not in self.graph and source != destination:
+                return []
+            hierarchy = self._current().hierarchies[parameter]
+            return list(islice(hierarchy.shortest_paths(source, destination),
+                               max_paths))
+        if algorithm is not None:
+            return self._point_search(source, destination, parameter, mask,
+                                      max_paths, algorithm)
+        method = self.CSR_METHODS.get(self._path_fun)
+        csr = self._compiled() if method else None
+        if csr is not None and (parameter is None or
+                                isinstance(parameter, str)):
+            return list(islice(getattr(csr, method)(
+                source, destination, parameter, mask), max_paths))
+
+        graph = self.graph if mask is None else self._masked_graph(mask)
+        try:
+            return list(islice(self._path_fun(
+                graph, source, destination, self._weight(parameter)),
+                max_paths))
+        except NetworkXNoPath:
+            return []
+        except NodeNotFound:
+            if source == destination:
+                return [[source]]
+            return []
+
+    def _tree(self, source, parameter):
+        """Return the stored shortest path tree of a source, or None."""
+        if (self._path_fun is not nx.all_shortest_paths or
+                not (parameter is None or isinstance(parameter, str))):
+            return None
+        return self._current().trees.get(parameter, {}).get(source)
+
+    def _tree_paths(self, source, destination, parameter, max_paths):
+        """Return the shortest paths read from a stored tree, or None.
+
+        The tree of either endpoint answers, since edges are undirected.
+        """
+        tree = self._tree(source, parameter)
+        if tree is not None:
+            return self._paths_from_predecessors(
+                source, destination, tree.predecessors, max_paths)
+        tree = self._tree(destination, parameter)
+        if tree is not None:
+            return [path[::-1] for path in self._paths_from_predecessors(
+                destination, source, tree.predecessors, max_paths)]
+        return None
+
+    def _algorithm(self, parameter, algorithm, mask=None):
+        """Return the algorithm searching all the shortest paths, or None.
+
+        None searches with the path function, which is always the case
+        for other path functions and parameters that are not metrics.
+        "dijkstra" searches with the path function as well. "auto" answers
+        from the contraction hierarchy of the parameter when it is built
+        and every edge can be used, keeps the path function on the CSR
+        backend, and otherwise searches from both ends, or with A* and
+        landmarks when the paths are weighted on a large graph.
+        """
+        if (self._path_fun is not nx.all_shortest_paths or
+                not (parameter is None or isinstance(parameter, str)) or
+                algorithm == "dijkstra"):
+            return None
+        if algorithm != "auto":
+            return algorithm
+        if mask is None and parameter in self._current().hierarchies:
+            return "hierarchy"
+        if self._compiled() is not None:
+            return None
+        if (parameter is not None and
+                len(self.graph) >= self.ASTAR_MIN_NODES):
+            return "astar"
+        return "bidirectional"
+
+    def _point_search(self, source, destination, parameter, mask,
+                      max_paths, algorithm):
+        """Search all the shortest paths from both ends or with A*.
+
+        Only the nodes around the shortest paths are expanded, and the
+        paths are built from their predecessors like nx.all_shortest_paths
+        does. The search runs on the switch-level graph when there is one.
+        A* searches from both ends instead until the landmarks of the
+        snapshot are built.
+        """
+        switches = self._switch_graph()
+        if switches is not None:
+            return self._switch_search(switches, source, destination,
+                                       parameter, mask, max_paths, algorithm)
+        graph = self.graph if mask is None else self._masked_graph(mask)
+        if source not in graph or destination not in graph:
+            return [[source]] if source == destination else []
+        weight = self._weight(parameter)
+        cost = None if weight is None else (
+            lambda endpoint_a, endpoint_b: weight(endpoint_a, endpoint_b,
+                                                  None))
+        landmarks = None if algorithm != "astar" else \
+            self._landmarks(self._current(), parameter)
+        if landmarks is not None:
+            predecessors = astar_predecessors(
+                graph.neighbors, source, destination, cost,
+                landmarks.heuristic(destination))
+        else:
+            predecessors = bidirectional_predecessors(
+                graph.neighbors, source, destination, cost)
+        return self._paths_from_predecessors(source, destination,
+                                             predecessors, max_paths)
+
+    def _switch_graph(self):
+        """Return the switch-level graph, building it if the graph changed.
+
+        Return None when the graph is not made of switches linked through
+        their interfaces.
+        """
+        snapshot = self._current()
+        if snapshot.switches is None:
+            snapshot.switches = SwitchGraph.build(
+                snapshot.graph, snapshot.nodes.names,
+                snapshot.interfaces) or False
+        return snapshot.switches or None
+
+    def _switch_search(self, switches, source, destination, parameter,
+                       mask, max_paths, algorithm):
+        """Search all the shortest paths visiting only switches.
+
+        Interfaces are only put back into the paths found, so paths are
+        those of the whole graph, and hops using edges outside the mask
+        are left out.
+        """
+        if source not in self.graph or destination not in self.graph:
+            return [[source]] if source == destination else []
+        weight = self._weight(parameter)
+        if weight is None:
+            def cost(_endpoint_a, _endpoint_b):
+                return 1
+        else:
+            def cost(endpoint_a, endpoint_b):
+                return weight(endpoint_a, endpoint_b, None)
+        allowed = None
+        if mask is not None:
+            edge_id = self.store.edge_id
+
+            def allowed(nodes):
+                return all(mask >> edge_id(endpoint_a, endpoint_b) & 1
+                           for endpoint_a, endpoint_b in zip(nodes, nodes[1:]))
+        view = switches.view(source, destination, parameter, cost, allowed)
+        landmarks = None if algorithm != "astar" else \
+            self._landmarks(self._current(), parameter)
+        if landmarks is not None:
+            predecessors = astar_predecessors(
+                view.neighbors, source, destination, view.cost,
+                landmarks.heuristic(destination))
+        else:
+            predecessors = bidirectional_predecessors(
+                view.neighbors, source, destination, view.cost)
+        paths = (path for hops in self._paths_from_predecessors(
+                     source, destination, predecessors)
+                 for path in view.expand(hops))
+        return list(islice(paths, max_paths))
+
+    def _links_search(self, source, destination, parameter=None,
+                      max_paths=None, desired=(), undesired=(),
+                      algorithm=None):
+        """Search the paths through the desired links avoiding undesired.
+
+        Undesired links are left out of the edges searched, so paths using
+        them are never enumerated. Desired links are waypoints: the paths
+        are stitched from searches between consecutive desired links.
+        Links are given by endpoint names, and unknown undesired links are
+        ignored while unknown desired links leave no path. A link desired
+        more than once, in either direction, is required once.
+        """
+        mask = None
+        if undesired:
+            index = self.index
+            excluded = [self.store.edge_id(self.nodes.get(endpoint_a),
+                                           self.nodes.get(endpoint_b))
+                        for endpoint_a, endpoint_b in undesired]
+            mask = index.alive & ~index.mask(edge_id for edge_id in excluded
+                                             if edge_id is not None)
+        if not desired:
+            return self._search(source, destination, parameter, mask,
+                                max_paths=max_paths, algorithm=algorithm)
+
+        required = {}
+        for endpoint_a, endpoint_b in desired:
+            link = (self.nodes.get(endpoint_a), self.nodes.get(endpoint_b))
+            edge_id = self.store.edge_id(*link)
+            if edge_id is None or (mask is not None and
+                                   not mask >> edge_id & 1):
+                return []
+            required.setdefault(edge_id, link)
+        return self._waypoint_paths(source, destination,
+                                    list(required.values()), parameter,
+                                    mask, max_paths, algorithm)
+
+    def _waypoint_paths(self, source, destination, links, parameter=None,
+                        mask=None, max_paths=None, algorithm=None):
+        """Search the paths going through every link, in any order.
+
+        Each order and direction of the links splits the path in segments
+        from the source to the first link, between consecutive links and
+        from the last link to the destination. A segment can not visit
+        the endpoints of the other segments, so each one is searched once
+        for every order, and the combinations forming simple paths are
+        sorted by cost. With nx.all_shortest_paths only the cheapest paths
+        are kept. When max_paths is given each segment contributes up to
+        that many paths too.
+
+        Segments searched on their own may all cross each other when a
+        path through the links exists, so when no combination is simple
+        each order is searched again segment by segment, every segment
+        avoiding the nodes of the previous ones. Paths found that way may
+        not be the cheapest, and a path may still be missed: finding one
+        through given links is NP-hard, which is also why Main bounds the
+        number of desired links.
+        """
+        weight = self._weight(parameter)
+
+        def cost(path):
+            if weight is None:
+                return len(path) - 1
+            return sum(weight(u, v, self.graph[u][v])
+                       for u, v in zip(path, path[1:]))
+
+        waypoints = {source, destination}.union(*links)
+        routes = []
+        for order in permutations(links):
+            for flips in product((False, True), repeat=len(order)):
+                hops = [source]
+                for (endpoint_a, endpoint_b), flip in zip(order, flips):
+                    hops += [endpoint_b, endpoint_a] if flip else \
+                        [endpoint_a, endpoint_b]
+                hops.append(destination)
+                routes.append(list(zip(hops[::2], hops[1::2])))
+
+        segments = {}
+        found = {}
+        for route in routes:
+            legs = []
+            for start, end in route:
+                if (start, end) not in segments:
+                    segments[(start, end)] = self._search(
+                        start, end, parameter, self._without_nodes(
+                            mask, waypoints - {start, end}),
+                        max_paths=max_paths, algorithm=algorithm)
+                legs.append(segments[(start, end)])
+            for parts in product(*legs):
+                path = [hop for part in parts for hop in part]
+                if len(set(path)) == len(path):
+                    found.setdefault(tuple(path), cost(path))
+        if not found:
+            for route in routes:
+                path = self._sequential_path(route, parameter, mask,
+                                             waypoints, algorithm)
+                if path is not None:
+                    found.setdefault(tuple(path), cost(path))
+
+        paths = sorted(found, key=found.get)
+        if paths and self._path_fun is nx.all_shortest_paths:
+            paths = [path for path in paths if found[path] == found[paths[0]]]
+        return [list(path) for path in islice(paths, max_paths)]
+
+    def _sequential_path(self, route, parameter, mask, waypoints, algorithm):
+        """Return a simple path along the segments of a route, or None.
+
+        Each segment is the shortest one avoiding the waypoints of the
+        other segments and the nodes of the segments before it. Segments
+        may still meet at the endpoints shared by the links, so paths
+        visiting a node twice are left out.
+        """
+        path = []
+        for start, end in route:
+            excluded = waypoints.union(path) - {start, end}
+            parts = self._search(start, end, parameter,
+                                 self._without_nodes(mask, excluded),
+                                 max_paths=1, algorithm=algorithm)
+            if not parts:
+                return None
+            path += parts[0]
+        return path if len(set(path)) == len(path) else None
+
+    def _without_nodes(self, mask, nodes):
+        """Return a mask leaving out the edges of the given node ids."""
+        index = self.index
+        excluded = [self.store.edge_id(node, neighbor) for node in nodes
+                    for neighbor in self.graph[node]]
+        mask = index.alive if mask is None else mask
+        return mask & ~index.mask(excluded)
+
+    def _search_from(self, source, destinations, parameter=None, mask=None,
+                     max_paths=None):
+        """Search the paths from source to every destination.
+
+        Return a dict with the paths of each destination id. When the path
+        function is nx.all_shortest_paths a single shortest path tree from
+        the source answers every destination, the stored one when the
+        source has it, otherwise each destination is searched on its own.
+        """
+        if self._path_fun is not nx.all_shortest_paths:
+            return {destination: self._search(source, destination, parameter,
+                                              mask, max_paths)
+                    for destination in destinations}
+
+        tree = self._tree(source, parameter) if mask is None else None
+        if tree is not None:
+            return {destination: self._paths_from_predecessors(
+                        source, destination, tree.predecessors, max_paths)
+                    for destination in destinations}
+
+        csr = self._compiled()
+        if csr is not None and (parameter is None or
+                                isinstance(parameter, str)):
+            return csr.single_source_paths(source, destinations, parameter,
+                                           mask, max_paths)
+
+        graph = self.graph if mask is None else self._masked_graph(mask)
+        if source not in graph:
+            return {destination: [[source]] if destination == source else []
+                    for destination in destinations}
+        weight = self._weight(parameter)
+        if weight is None:
+            predecessors = nx.predecessor(graph, source)
+        else:
+            predecessors, _ = nx.dijkstra_predecessor_and_distance(
+                graph, source, weight=weight)
+        return {destination: self._paths_from_predecessors(
+                    source, destination, predecessors, max_paths)
+                for destination in destinations}
+
+    @staticmethod
+    def _paths_from_predecessors(source, destination, predecessors,
+                                 max_paths=None):
+        """Return every path from source to destination in a predecessors map.
+
+        The paths are built backwards from the destination, in the same
+        order as nx.all_shortest_paths, stopping after max_paths.
+        """
+        if destination not in predecessors:
+            return []
+        paths = []
+        stack = [[destination, 0]]
+        top = 0
+        while top >= 0:
+            node, i = stack[top]
+            if node == source:
+                paths.append([hop for hop, _ in reversed(stack[:top + 1])])
+                if len(paths) == max_paths:
+                    break
+                top -= 1
+            elif len(predecessors[node]) > i:
+                stack[top][1] = i + 1
+                previous = predecessors[node][i]
+                if any(previous == hop for hop, _ in stack[:top + 1]):
+                    continue
+                top += 1
+                if top == len(stack):
+                    stack.append([previous, 0])
+                else:
+                    stack[top] = [previous, 0]
+            else:
+                top -= 1
+        return paths
@@ -0,0 +1,231 @@
+"""Module Search of kytos/pathfinder Kytos Network Application."""
+
+from heapq import heappop, heappush
+from itertools import count
+from math import inf
+
+
+def distances(neighbors, source, weight=None):
+    """Return the distance from source to every node it reaches.
+
+    Weight is called with the endpoints of an edge and returns its cost,
+    and every edge costs 1 when it is None.
+    """
+    found = {}
+    seen = {source: 0}
+    if weight is None:
+        level = [source]
+        while level:
+            following = []
+            for node in level:
+                found[node] = seen[node]
+                for neighbor in neighbors(node):
+                    if neighbor not in seen:
+                        seen[neighbor] = seen[node] + 1
+                        following.append(neighbor)
+            level = following
+        return found
+    tie = count()
+    heap = [(0, next(tie), source)]
+    while heap:
+        distance, _, node = heappop(heap)
+        if node in found:
+            continue
+        found[node] = distance
+        for neighbor in neighbors(node):
+            cost = distance + weight(node, neighbor)
+            if neighbor not in found and cost < seen.get(neighbor, inf):
+                seen[neighbor] = cost
+                heappush(heap, (cost, next(tie), neighbor))
+    return found
+
+
+def bidirectional_predecessors(neighbors, source, destination, weight=None):
+    """Return the predecessors of the shortest paths between two nodes.
+
+    Searches grow from both ends, always expanding the smaller frontier,
+    and stop once no shorter path can join them. Every shortest path is
+    then a prefix settled from the source followed by a suffix settled
+    from the destination, so the predecessors of a node are its neighbors
+    on the same side at the right distance, or on the source side when
+    the edge joins a shortest path across both. Edges are undirected.
+
+    Return a dict mapping the nodes to lists of predecessors, empty when
+    the destination can not be reached.
+    """
+    if source == destination:
+        return {source: []}
+    if weight is None:
+        forward, backward, total = _bidirectional_bfs(neighbors, source,
+                                                      destination)
+        weight = _unit
+    else:
+        forward, backward, total = _bidirectional_dijkstra(
+            neighbors, source, destination, weight)
+    if total == inf:
+        return {}
+
+    predecessors = {}
+    stack = [destination]
+    while stack:
+        node = stack.pop()
+        if node in predecessors:
+            continue
+        if node in forward:
+            previous = [neighbor for neighbor in neighbors(node)
+                        if neighbor in forward and
+                        forward[neighbor] + weight(neighbor, node) ==
+                        forward[node]]
+        else:
+            previous = []
+            for neighbor in neighbors(node):
+                cost = weight(neighbor, node)
+                if neighbor in forward:
+                    if forward[neighbor] + cost + backward[node] == total:
+                        previous.append(neighbor)
+                elif (neighbor in backward and
+                      backward[node] + cost == backward[neighbor]):
+                    previous.append(neighbor)
+        predecessors[node] = previous
+        stack.extend(previous)
+    return predecessors
+
+
+def _unit(_endpoint_a, _endpoint_b):
+    """Return the cost of an edge of an unweighted graph."""
+    return 1
+
+
+def _bidirectional_bfs(neighbors, source, destination):
+    """Return the depths reached from both ends and the distance between.
+
+    Whole levels are expanded from the smaller frontier until the two
+    searches meet, so every node within the returned depths is exact.
+    """
+    depths = ({source: 0}, {destination: 0})
+    frontiers = ([source], [destination])
+    total = inf
+    while frontiers[0] and frontiers[1] and total == inf:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        reached, other = depths[side], depths[1 - side]
+        following = []
+        for node in frontiers[side]:
+            for neighbor in neighbors(node):
+                if neighbor not in reached:
+                    reached[neighbor] = reached[node] + 1
+                    following.append(neighbor)
+                    if neighbor in other:
+                        total = min(total,
+                                    reached[neighbor] + other[neighbor])
+        frontiers[side][:] = following
+    return depths[0], depths[1], total
+
+
+def _bidirectional_dijkstra(neighbors, source, destination, weight):
+    """Return the distances settled from both ends and the distance between.
+
+    The searches stop once the smallest distances left on both sides add
+    up to more than the best path found. Only the nodes settled closer
+    than the smallest distance left on their side are returned, so every
+    node of a shortest path is in one of them.
+    """
+    settled = ({}, {})
+    seen = ({source: 0}, {destination: 0})
+    tie = count()
+    heaps = ([(0, next(tie), source)], [(0, next(tie), destination)])
+    total = inf
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] <= total:
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        distance, _, node = heappop(heaps[side])
+        if node in settled[side]:
+            continue
+        settled[side][node] = distance
+        for neighbor in neighbors(node):
+            cost = distance + weight(node, neighbor)
+            if neighbor not in settled[side] and \
+                    cost < seen[side].get(neighbor, inf):
+                seen[side][neighbor] = cost
+                heappush(heaps[side], (cost, next(tie), neighbor))
+            if neighbor in seen[1 - side]:
+                total = min(total, cost + seen[1 - side][neighbor])
+    sides = []
+    for side in (0, 1):
+        while heaps[side] and heaps[side][0][2] in settled[side]:
+            heappop(heaps[side])
+        left = heaps[side][0][0] if heaps[side] else inf
+        sides.append({node: distance for node, distance
+                      in settled[side].items() if distance < left})
+    return sides[0], sides[1], total
+
+
+def astar_predecessors(neighbors, source, destination, weight, heuristic):
+    """Return the predecessors of the shortest paths found by A*.
+
+    The heuristic bounds the distance from a node to the destination and
+    must be consistent. Nodes are expanded until their bound exceeds the
+    distance to the destination, so ties with the shortest path are kept.
+    Return a dict mapping the nodes to lists of predecessors, empty when
+    the destination can not be reached.
+    """
+    weight = weight or _unit
+    distance = {source: 0}
+    predecessors = {source: []}
+    expanded = set()
+    tie = count()
+    heap = [(heuristic(source), next(tie), source)]
+    best = inf
+    while heap:
+        bound, _, node = heappop(heap)
+        if bound > best:
+            break
+        if node in expanded:
+            continue
+        expanded.add(node)
+        if node == destination:
+            best = distance[node]
+            continue
+        for neighbor in neighbors(node):
+            cost = distance[node] + weight(node, neighbor)
+            if cost < distance.get(neighbor, inf):
+                distance[neighbor] = cost
+                predecessors[neighbor] = [node]
+                heappush(heap, (cost + heuristic(neighbor), next(tie),
+                                neighbor))
+            elif cost == distance[neighbor]:
+                predecessors[neighbor].append(node)
+    return predecessors if best < inf else {}
+
+
+class Landmarks:
+    """Distances from a few landmark nodes bounding all the others (ALT).
+
+    By the triangle inequality, the distance between two nodes is at least
+    the difference of their distances to any landmark. Landmarks are
+    picked farthest first: each one is the node farthest from the ones
+    already picked, starting over from an unreached node when the graph is
+    not connected. The bounds hold on any subgraph as well.
+    """
+
+    def __init__(self, neighbors, nodes, weight=None, size=8):
+        self.distances = []
+        nodes = list(nodes)
+        closest = dict.fromkeys(nodes, inf)
+        while nodes and len(self.distances) < size:
+            landmark = max(nodes, key=closest.get)
+            if closest[landmark] == 0:
+                break
+            reached = distances(neighbors, landmark, weight)
+            self.distances.append(reached)
+            for node in nodes:
+                closest[node] = min(closest[node], reached.get(node, inf))
+
+    def heuristic(self, destination):
+        """Return a consistent bound of the distance to destination."""
+        bounds = [(reached, reached[destination])
+                  for reached in self.distances if destination in reached]
+
+        def heuristic(node):
+            return max((abs(target - reached[node])
+                        for reached, target in bounds if node in reached),
+                       default=0)
+        return heuristic
@@ -1 +1,57 @@
 """Settings for the pathfinder NApp."""
+
+# Apply only the differences between the graph and each updated topology
+# instead of clearing and rebuilding the whole graph on every event.
+INCREMENTAL_TOPOLOGY_UPDATE = True
+
+# Maximum number of path results kept in the LRU cache. Results are
+# invalidated whenever the topology changes. Use 0 to disable the cache.
+PATH_CACHE_SIZE = 1024
+
+# Graph backend used by the path searches: 'networkx', or 'csr' to compile
+# the graph into compressed sparse row arrays searched with scipy.
+GRAPH_BACKEND = 'networkx'
+
+# Workers running the searches of the flexible metric combinations of v3
+# queries in parallel. Use 0 to run them one after another.
+FLEXIBLE_WORKERS = 0
+
+# Pool of the flexible searches: 'thread', or 'process' to search a CSR
+# graph shared in memory (needs GRAPH_BACKEND = 'csr'). Worker processes
+# are started with the spawn method.
+FLEXIBLE_EXECUTOR = 'thread'
+
+# Seconds a v3 query may spend on its flexible searches before the
+# outstanding ones are cancelled. Use None for no deadline.
+FLEXIBLE_DEADLINE = None
+
+# Algorithm finding all the shortest paths of a query: 'dijkstra' searches
+# from the source, 'bidirectional' from both ends and 'astar' with landmark
+# bounds. 'auto' picks one for each query. v2 queries may override it with
+# their 'algorithm' field.
+SEARCH_ALGORITHM = 'auto'
+
+# Most desired links of a v2 query. Paths may go through them in any order
+# and direction, which makes n! * 2^n routes for n links, so queries with
+# more are rejected.
+MAX_DESIRED_LINKS = 4
+
+# Parameters whose contraction hierarchy is built in the background after
+# every topology change, answering the 'auto' queries weighted by them
+# once it is ready. Use [] to build none.
+CONTRACTION_HIERARCHIES = []
+
+# Hot sources whose shortest path trees are grown in the background after
+# every topology change, answering the 'auto' queries from or to them in
+# time proportional to the paths: a list of node ids, or 'switches' for
+# every switch. Use [] to grow none.
+TREE_SOURCES = []
+
+# Parameters weighting the shortest path trees, None for hop counts.
+TREE_PARAMETERS = [None]
+
+# Seconds without topology events before a burst of them is applied to the
+# graph as a single update with the latest topology, and the most seconds
+# the first event of a burst may wait. Use 0 to apply every event at once.
+TOPOLOGY_QUIET_WINDOW = 0.1
+TOPOLOGY_MAX_DELAY = 1.0
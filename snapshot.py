@@ -0,0 +1,131 @@
+"""Module Snapshot of kytos/pathfinder Kytos Network Application."""
+
+import networkx as nx
+
+
+class SharedGraph(nx.Graph):
+    """A networkx graph sharing the neighbors of its nodes with its copies.
+
+    ``copy_on_write`` returns a graph whose outer dicts are flat copies,
+    while the dicts of neighbors are shared until either graph changes
+    them: each graph copies the neighbors of a node before its first change
+    to them. An update thus copies the neighbors of the nodes it touches
+    instead of the whole adjacency. Node and edge attribute dicts are
+    always shared, the metadata of the links lives in the store.
+    """
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self._owned = set()
+        super().__init__(incoming_graph_data, **attr)
+
+    def copy_on_write(self):
+        """Return a copy sharing the neighbors of every node."""
+        graph = self.__class__()
+        graph.graph.update(self.graph)
+        graph._node.update(self._node)
+        graph._adj.update(self._adj)
+        self._owned = set()
+        return graph
+
+    def _own(self, *nodes):
+        """Copy the neighbors of nodes unless this graph already did."""
+        adj = self._adj
+        for node in nodes:
+            if node in adj and node not in self._owned:
+                adj[node] = dict(adj[node])
+                self._owned.add(node)
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        """Add an edge, copying the neighbors of its nodes first."""
+        self._own(u_of_edge, v_of_edge)
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        """Add edges, copying the neighbors of their nodes first."""
+        ebunch_to_add = list(ebunch_to_add)
+        for edge in ebunch_to_add:
+            self._own(*edge[:2])
+        super().add_edges_from(ebunch_to_add, **attr)
+
+    def remove_edge(self, u, v):
+        """Remove an edge, copying the neighbors of its nodes first."""
+        self._own(u, v)
+        super().remove_edge(u, v)
+
+    def remove_edges_from(self, ebunch):
+        """Remove edges, copying the neighbors of their nodes first."""
+        ebunch = list(ebunch)
+        for edge in ebunch:
+            self._own(*edge[:2])
+        super().remove_edges_from(ebunch)
+
+    def remove_node(self, n):
+        """Remove a node, copying the neighbors of its neighbors first."""
+        if n in self._adj:
+            self._own(*self._adj[n])
+        super().remove_node(n)
+
+    def remove_nodes_from(self, nodes):
+        """Remove nodes, copying the neighbors of their neighbors first."""
+        nodes = list(nodes)
+        for node in nodes:
+            if node in self._adj:
+                self._own(*self._adj[node])
+        super().remove_nodes_from(nodes)
+
+    def clear(self):
+        """Remove every node, sharing nothing with the copies anymore."""
+        self._owned = set()
+        super().clear()
+
+
+class GraphSnapshot:
+    """One version of the graph and of the structures compiled from it.
+
+    Queries read a snapshot that is never changed once it is published.
+    Updates apply their changes to a copy, compile it and publish the copy
+    in a single assignment, so a query always sees a whole version of the
+    topology. The copy shares every structure its update does not touch.
+    Cache invalidations of an update are kept in ``pending`` until the copy
+    is published, and ``cache_ready`` tells when they are all applied. The
+    A* landmarks and the contraction hierarchies of each parameter are kept
+    in ``landmarks`` and ``hierarchies``. The id of the switch of every
+    interface is kept by interface id in ``interfaces``, a dict replaced
+    rather than changed by updates.
+    The shortest path trees of the hot sources are kept by parameter and
+    source in ``trees``, and ``trees_ready`` tells when all are grown.
+    The edges removed, added and updated by an update are kept in
+    ``changes`` to repair the trees, which is None when the whole graph
+    changed.
+    """
+
+    def __init__(self, graph, nodes, store, index, version=0):
+        self.graph = graph
+        self.nodes = nodes
+        self.store = store
+        self.index = index
+        self.csr = None
+        self.switches = None
+        self.interfaces = {}
+        self.landmarks = {}
+        self.hierarchies = {}
+        self.trees = {}
+        self.trees_ready = False
+        self.changes = []
+        self.version = version
+        self.pending = []
+        self.cache_ready = True
+
+    def copy(self):
+        """Return a snapshot sharing the graph and its structures.
+
+        Each structure is copied piecewise by the first change made to it,
+        in the copy or in this snapshot.
+        """
+        store = self.store.copy()
+        snapshot = GraphSnapshot(self.graph.copy_on_write(),
+                                 self.nodes.copy(), store,
+                                 self.index.copy(store), self.version)
+        snapshot.interfaces = self.interfaces
+        snapshot.cache_ready = False
+        return snapshot
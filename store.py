@@ -0,0 +1,323 @@
+"""Module Store of kytos/pathfinder Kytos Network Application."""
+
+from array import array
+from numbers import Real
+
+from kytos.core import log
+
+
+class LinkAttributeStore:
+    """Columnar store of the edges and their links metadata.
+
+    Every edge of the graph gets an integer id. Each known metric is kept in
+    a typed column indexed by edge id, with a presence mask telling which
+    edges have a value. ``float`` columns hold numbers and ``label`` columns
+    hold strings as codes of a symbol table. Values of another type are
+    rejected when they are stored. Other metadata keys are kept in sparse
+    dicts by edge id.
+
+    Copies share the containers, and each store copies a container before
+    its first change to it, so an update only copies the columns it
+    changes.
+    """
+
+    def __init__(self, columns):
+        self.kinds = dict(columns)
+        self.edges = []
+        self.ids = {}
+        self._free = []
+        self.columns = {}
+        self.present = {}
+        self.extras = {}
+        self.labels = []
+        self._codes = {}
+        self._shared = set()
+        self.clear()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def copy(self):
+        """Return a store sharing the edges and values of this one."""
+        store = LinkAttributeStore.__new__(LinkAttributeStore)
+        store.kinds = self.kinds
+        store.edges, store.ids, store._free = self.edges, self.ids, self._free
+        store.columns = dict(self.columns)
+        store.present = dict(self.present)
+        store.extras = dict(self.extras)
+        store.labels, store._codes = self.labels, self._codes
+        shared = {("edges",), ("ids",), ("_free",), ("labels",), ("_codes",)}
+        shared.update(("columns", metric) for metric in self.kinds)
+        shared.update(("present", metric) for metric in self.kinds)
+        shared.update(("extras", key) for key in self.extras)
+        store._shared = shared
+        self._shared = set(shared)
+        return store
+
+    def clear(self):
+        """Remove every edge and value."""
+        self.edges = []
+        self.ids = {}
+        self._free = []
+        self.extras = {}
+        self.labels = []
+        self._codes = {}
+        self._shared = set()
+        for metric, kind in self.kinds.items():
+            self.columns[metric] = array("d" if kind == "float" else "q")
+            self.present[metric] = bytearray()
+
+    def _own(self, *key):
+        """Copy a container shared with a copy of the store.
+
+        The key is an attribute name, followed by the metric or metadata
+        key for the containers kept by key.
+        """
+        if key not in self._shared:
+            return
+        self._shared.discard(key)
+        if len(key) == 1:
+            setattr(self, key[0], getattr(self, key[0]).copy())
+            return
+        containers = getattr(self, key[0])
+        value = containers[key[1]]
+        containers[key[1]] = array(value.typecode, value) \
+            if isinstance(value, array) else value.copy()
+
+    @staticmethod
+    def edge_key(endpoint_a, endpoint_b):
+        """Return the direction independent key of an edge."""
+        return frozenset((endpoint_a, endpoint_b))
+
+    def edge_id(self, endpoint_a, endpoint_b):
+        """Return the id of an edge, or None if it is not stored."""
+        return self.ids.get(self.edge_key(endpoint_a, endpoint_b))
+
+    def add(self, endpoint_a, endpoint_b):
+        """Store an edge without metadata and return its id."""
+        key = self.edge_key(endpoint_a, endpoint_b)
+        if key in self.ids:
+            return self.ids[key]
+        self._own("edges")
+        if self._free:
+            self._own("_free")
+            edge_id = self._free.pop()
+            self.edges[edge_id] = (endpoint_a, endpoint_b)
+        else:
+            edge_id = len(self.edges)
+            self.edges.append((endpoint_a, endpoint_b))
+            for metric in self.kinds:
+                self._own("columns", metric)
+                self._own("present", metric)
+                self.columns[metric].append(0)
+                self.present[metric].append(0)
+        self._own("ids")
+        self.ids[key] = edge_id
+        return edge_id
+
+    def remove(self, endpoint_a, endpoint_b):
+        """Remove an edge and its values, freeing its id."""
+        key = self.edge_key(endpoint_a, endpoint_b)
+        if key not in self.ids:
+            return
+        self._own("ids")
+        edge_id = self.ids.pop(key)
+        self._clear_values(edge_id)
+        self._own("edges")
+        self._own("_free")
+        self.edges[edge_id] = None
+        self._free.append(edge_id)
+
+    def _clear_values(self, edge_id):
+        """Remove every value of an edge."""
+        for metric in self.kinds:
+            if self.present[metric][edge_id]:
+                self._own("present", metric)
+                self.present[metric][edge_id] = 0
+        for key, values in self.extras.items():
+            if edge_id in values:
+                self._own("extras", key)
+                del self.extras[key][edge_id]
+
+    def _encode(self, metric, value):
+        """Return the column representation of a value.
+
+        Raise TypeError when the value does not match the column type.
+        """
+        if self.kinds[metric] == "float":
+            if isinstance(value, bool) or not isinstance(value, Real):
+                raise TypeError(f"{metric} must be a number, not {value!r}")
+            return float(value)
+        if not isinstance(value, str):
+            raise TypeError(f"{metric} must be a string, not {value!r}")
+        if value not in self._codes:
+            self._own("labels")
+            self._own("_codes")
+            self._codes[value] = len(self.labels)
+            self.labels.append(value)
+        return self._codes[value]
+
+    def update(self, edge_id, metadata):
+        """Store the metadata values of an edge.
+
+        Values that do not match their column type are rejected and logged.
+        Return True if any stored value changed.
+        """
+        changed = False
+        for key, value in metadata.items():
+            if key not in self.kinds:
+                values = self.extras.get(key, {})
+                if edge_id not in values or values[edge_id] != value:
+                    changed = True
+                    self._own("extras", key)
+                    self.extras.setdefault(key, {})[edge_id] = value
+                continue
+            try:
+                encoded = self._encode(key, value)
+            except TypeError as error:
+                endpoint_a, endpoint_b = self.edges[edge_id]
+                log.warning(f"Ignoring metadata of link {endpoint_a} <-> "
+                            f"{endpoint_b}: {error}")
+                continue
+            if not self.present[key][edge_id] \
+                    or self.columns[key][edge_id] != encoded:
+                changed = True
+                self._own("columns", key)
+                self._own("present", key)
+                self.columns[key][edge_id] = encoded
+                self.present[key][edge_id] = 1
+        return changed
+
+    def replace(self, edge_id, metadata):
+        """Replace the metadata of an edge, returning True if it changed."""
+        current = self.metadata(edge_id)
+        self._clear_values(edge_id)
+        self.update(edge_id, metadata)
+        return self.metadata(edge_id) != current
+
+    def get(self, edge_id, key, default=None):
+        """Return a metadata value of an edge."""
+        if key in self.kinds:
+            if not self.present[key][edge_id]:
+                return default
+            value = self.columns[key][edge_id]
+            if self.kinds[key] == "label":
+                return self.labels[value]
+            return value
+        return self.extras.get(key, {}).get(edge_id, default)
+
+    def metadata(self, edge_id):
+        """Return the metadata of an edge as a dict."""
+        metadata = {}
+        for key in self.kinds:
+            if self.present[key][edge_id]:
+                metadata[key] = self.get(edge_id, key)
+        for key, values in self.extras.items():
+            if edge_id in values:
+                metadata[key] = values[edge_id]
+        return metadata
+
+    def code(self, metric, value):
+        """Return the column representation of a value, or None."""
+        if self.kinds[metric] == "label":
+            return self._codes.get(value) if isinstance(value, str) else None
+        try:
+            return self._encode(metric, value)
+        except TypeError:
+            return None
+
+    def weight(self, key, default=1):
+        """Return a networkx weight function reading a metadata key."""
+        ids = self.ids
+        edge_key = self.edge_key
+        if self.kinds.get(key) == "float":
+            column, present = self.columns[key], self.present[key]
+
+            def weight(endpoint_a, endpoint_b, _data):
+                edge_id = ids[edge_key(endpoint_a, endpoint_b)]
+                return column[edge_id] if present[edge_id] else default
+            return weight
+
+        def extra_weight(endpoint_a, endpoint_b, _data):
+            edge_id = ids[edge_key(endpoint_a, endpoint_b)]
+            return self.get(edge_id, key, default)
+        return extra_weight
+
+
+class NodeInterner:
+    """Dense integer ids for the names of the graph nodes.
+
+    Switch and interface ids are long strings, so the graph, the store and
+    the searches work on the integer ids given here instead. The ids of
+    released names are reused by the next interned names. Copies share the
+    names until either interner changes them.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self._free = []
+        self._shared = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def copy(self):
+        """Return an interner giving the same ids to the same names."""
+        nodes = NodeInterner()
+        nodes.names, nodes.ids, nodes._free = self.names, self.ids, self._free
+        nodes._shared = self._shared = True
+        return nodes
+
+    def clear(self):
+        """Forget every name."""
+        self.names = []
+        self.ids = {}
+        self._free = []
+        self._shared = False
+
+    def _own(self):
+        """Copy the names shared with a copy of the interner."""
+        if self._shared:
+            self.names = list(self.names)
+            self.ids = dict(self.ids)
+            self._free = list(self._free)
+            self._shared = False
+
+    def intern(self, name):
+        """Return the id of a name, giving it a new one if needed."""
+        node_id = self.ids.get(name)
+        if node_id is None:
+            self._own()
+            if self._free:
+                node_id = self._free.pop()
+                self.names[node_id] = name
+            else:
+                node_id = len(self.names)
+                self.names.append(name)
+            self.ids[name] = node_id
+        return node_id
+
+    def get(self, name):
+        """Return the id of a name, or None if it is not interned."""
+        try:
+            return self.ids.get(name)
+        except TypeError:
+            return None
+
+    def release(self, name):
+        """Forget a name, freeing its id."""
+        if name not in self.ids:
+            return
+        self._own()
+        node_id = self.ids.pop(name)
+        self.names[node_id] = None
+        self._free.append(node_id)
+
+    def path(self, node_ids):
+        """Return the names of a path of ids."""
+        names = self.names
+        return [names[node_id] for node_id in node_ids]
@@ -0,0 +1,166 @@
+"""Module Switches of kytos/pathfinder Kytos Network Application."""
+
+from itertools import chain, product
+
+
+class SwitchGraph:
+    """Switch-level view of a graph of switches and their interfaces.
+
+    The graph has a node for every switch and interface, an edge from each
+    switch to its interfaces and an edge for each link between two
+    interfaces, so every hop between switches takes three edges. Here each
+    link is an edge between the switches of its interfaces annotated with
+    the interfaces, and searches only visit switches. The interfaces are
+    put back into the paths found, so they are the paths of the graph.
+
+    The switch of every interface is the one whose ``interfaces`` list it
+    in the topology.
+    """
+
+    def __init__(self, switch_of, partner):
+        self.switch_of = switch_of
+        self.partner = partner
+        self.links = {}
+        for interface, other in partner.items():
+            switch, neighbor = switch_of[interface], switch_of[other]
+            if switch != neighbor:
+                self.links.setdefault(switch, {}).setdefault(
+                    neighbor, []).append((interface, other))
+        self._tables = {}
+
+    @classmethod
+    def build(cls, graph, names, interfaces):
+        """Return the switch-level view of a graph, or None.
+
+        Interfaces map the name of every interface to the name of its
+        switch. None is returned when some link is not between two
+        interfaces or some interface has more than one link, since the
+        paths of the switch-level view would not be those of the graph.
+        """
+        switch_of, partner, links = {}, {}, []
+        for endpoint_a, endpoint_b in graph.edges:
+            name_a, name_b = names[endpoint_a], names[endpoint_b]
+            if interfaces.get(name_b) == name_a:
+                switch, interface = endpoint_a, endpoint_b
+            elif interfaces.get(name_a) == name_b:
+                switch, interface = endpoint_b, endpoint_a
+            else:
+                links.append((endpoint_a, endpoint_b))
+                continue
+            if interface in switch_of:
+                return None
+            switch_of[interface] = switch
+        for endpoint_a, endpoint_b in links:
+            if (endpoint_a not in switch_of or endpoint_b not in switch_of or
+                    endpoint_a in partner or endpoint_b in partner):
+                return None
+            partner[endpoint_a] = endpoint_b
+            partner[endpoint_b] = endpoint_a
+        if any(switch in switch_of for switch in switch_of.values()):
+            return None
+        return cls(switch_of, partner)
+
+    def table(self, key, weight):
+        """Return the hops between linked switches, cheapest first.
+
+        Hops are (cost, nodes) pairs, where nodes go from a switch through
+        the interfaces of a link to the other switch. Tables are kept by
+        key, the parameter weighting the edges.
+        """
+        table = self._tables.get(key)
+        if table is None:
+            table = {}
+            for switch, neighbors in self.links.items():
+                table[switch] = {
+                    neighbor: sorted(
+                        (weight(switch, interface) +
+                         weight(interface, other) +
+                         weight(other, neighbor),
+                         (switch, interface, other, neighbor))
+                        for interface, other in pairs)
+                    for neighbor, pairs in neighbors.items()}
+            self._tables[key] = table
+        return table
+
+    def view(self, source, destination, key, weight, allowed=None):
+        """Return the switch-level view of a query between two nodes."""
+        return SwitchView(self, source, destination, self.table(key, weight),
+                          weight, allowed)
+
+    def endpoint_hops(self, node, other, weight):
+        """Return the hops from an interface to the switches it reaches.
+
+        An interface reaches its switch and the switch of the interface
+        it is linked to, and that interface too when it is the other
+        endpoint of the query. Switches have no such hops.
+        """
+        switch = self.switch_of.get(node)
+        if switch is None:
+            return {}
+        hops = {switch: [(weight(node, switch), (node, switch))]}
+        linked = self.partner.get(node)
+        if linked is not None:
+            neighbor = self.switch_of[linked]
+            hops.setdefault(neighbor, []).append(
+                (weight(node, linked) + weight(linked, neighbor),
+                 (node, linked, neighbor)))
+            if linked == other:
+                hops[linked] = [(weight(node, linked), (node, linked))]
+        return hops
+
+
+class SwitchView:
+    """The switches of a SwitchGraph plus the endpoints of one query.
+
+    Interface endpoints are joined to the switches they reach, and to
+    each other when they are linked. Hops that allowed rejects are left
+    out, and only the cheapest hops between two nodes are kept.
+    """
+
+    def __init__(self, switches, source, destination, table, weight,
+                 allowed=None):
+        self.table = table
+        self.allowed = allowed
+        self.extra = {}
+        for node, other in ((source, destination), (destination, None)):
+            for neighbor, hops in switches.endpoint_hops(
+                    node, other, weight).items():
+                self.extra.setdefault(node, {}).setdefault(
+                    neighbor, []).extend(hops)
+                self.extra.setdefault(neighbor, {}).setdefault(
+                    node, []).extend((cost, nodes[::-1])
+                                     for cost, nodes in hops)
+        self._options = {}
+
+    def options(self, node, neighbor):
+        """Return the cost and the cheapest hops from node to neighbor."""
+        key = (node, neighbor)
+        if key not in self._options:
+            hops = [(cost, nodes) for cost, nodes in chain(
+                        self.table.get(node, {}).get(neighbor, ()),
+                        self.extra.get(node, {}).get(neighbor, ()))
+                    if self.allowed is None or self.allowed(nodes)]
+            cheapest = min((cost for cost, _ in hops), default=None)
+            self._options[key] = (cheapest, [nodes for cost, nodes in hops
+                                             if cost == cheapest])
+        return self._options[key]
+
+    def neighbors(self, node):
+        """Return the nodes reached from node by some allowed hop."""
+        return [neighbor for neighbor in set(chain(
+                    self.table.get(node, ()), self.extra.get(node, ())))
+                if self.options(node, neighbor)[0] is not None]
+
+    def cost(self, node, neighbor):
+        """Return the cost of the cheapest hop from node to neighbor."""
+        return self.options(node, neighbor)[0]
+
+    def expand(self, path):
+        """Generate the simple paths of the graph behind a path of hops."""
+        for parts in product(*(self.options(node, neighbor)[1]
+                               for node, neighbor in zip(path, path[1:]))):
+            nodes = list(path[:1])
+            for part in parts:
+                nodes.extend(part[1:])
+            if len(set(nodes)) == len(nodes):
+                yield nodes
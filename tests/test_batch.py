@@ -0,0 +1,98 @@
+"""Module to test the batch path queries of KytosGraph."""
+from itertools import product
+from unittest import skipUnless
+from unittest.mock import Mock
+
+# module under test
+from csr import CSRGraph
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestBatchPaths(TestKytosGraph):
+    """Compare batch queries with single queries on TestGraph2."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    backend = "networkx"
+
+    def setup(self):
+        """Build a graph to batch and a graph answering single queries."""
+        switches, links = self.generateTopology()
+        topology = Mock(switches=switches, links=links)
+        self.graph = KytosGraph(backend=self.backend)
+        self.graph.update_topology(topology)
+        self.expected = KytosGraph(cache_size=0)
+        self.expected.update_topology(topology)
+        self.nodes = ["User1", "User2", "User3", "S1:1", "S6", "X"]
+
+    def test_shortest_paths(self):
+        """Batch results match single queries, in the query order."""
+        self.setup()
+        queries = [(source, destination, parameter, max_paths)
+                   for parameter, max_paths in ((None, None), ("delay", 2))
+                   for source, destination in product(self.nodes, repeat=2)]
+        results = self.graph.shortest_paths_batch(queries)
+        self.assertEqual(len(results), len(queries))
+        for query, paths in zip(queries, results):
+            self.assertEqual(sorted(paths),
+                             sorted(self.expected.shortest_paths(*query)))
+
+    def test_constrained_paths(self):
+        """Batch constrained results match single queries."""
+        self.setup()
+        metrics = {"delay": 50, "bandwidth": 100, "ownership": "B"}
+        queries = [(source, destination, 2, metrics, None)
+                   for source, destination in product(self.nodes, repeat=2)]
+        results = self.graph.constrained_flexible_paths_batch(queries)
+        for query, found in zip(queries, results):
+            source, destination, flexible, metrics, _ = query
+            expected = self.expected.constrained_flexible_paths(
+                source, destination, flexible, **metrics)
+            self.assertEqual([result["metrics"] for result in found],
+                             [result["metrics"] for result in expected])
+            for result, expected_result in zip(found, expected):
+                self.assertEqual(sorted(result["paths"]),
+                                 sorted(expected_result["paths"]))
+
+    def test_constrained_timeout(self):
+        """A group timing out only fails its own queries, uncached."""
+        self.setup()
+        search = self.graph._constrained_flexible_paths_from
+
+        def timing_out(source, *args, **kwargs):
+            if source == self.graph.nodes.get("User1"):
+                raise TimeoutError("searches did not end in time")
+            return search(source, *args, **kwargs)
+        self.graph._constrained_flexible_paths_from = timing_out
+        metrics = {"delay": 50}
+        results = self.graph.constrained_flexible_paths_batch(
+            [("User1", "User2", 1, metrics, None),
+             ("User2", "User3", 1, metrics, None),
+             ("User1", "User3", 1, metrics, None)])
+        self.assertIsInstance(results[0], TimeoutError)
+        self.assertIsInstance(results[2], TimeoutError)
+        expected = self.expected.constrained_flexible_paths(
+            "User2", "User3", 1, **metrics)
+        self.assertEqual([sorted(result["paths"]) for result in results[1]],
+                         [sorted(result["paths"]) for result in expected])
+        self.graph._constrained_flexible_paths_from = search
+        self.assertIsInstance(self.graph.constrained_flexible_paths_batch(
+            [("User1", "User2", 1, metrics, None)])[0], list)
+
+    def test_shares_the_cache(self):
+        """Batch queries are cached like single queries."""
+        self.setup()
+        self.graph.shortest_paths_batch([("User1", "User2", None, None)])
+        self.graph.shortest_paths("User1", "User2")
+        self.assertEqual(self.graph.cache.stats["hits"], 1)
+
+
+@skipUnless(CSRGraph.available(), "scipy is not installed")
+class TestBatchPathsCSR(TestBatchPaths):
+    """Compare batch queries on the CSR backend with single queries."""
+
+    backend = "csr"
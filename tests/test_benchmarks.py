@@ -0,0 +1,166 @@
+"""Module to test the benchmark topologies, scenarios, gate and load."""
+import json
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import networkx as nx
+
+# module under test
+from benchmarks import compare
+from benchmarks.load import recorded_queries, run_load, synthetic_queries
+from benchmarks.run import percentile, run_benchmarks
+from benchmarks.topologies import GENERATORS, fat_tree
+
+
+class TestTopologies(TestCase):
+    """Generate connected topologies with link metadata."""
+
+    def test_generators(self):
+        """Every generator links about size switches."""
+        for name, generator in GENERATORS.items():
+            switches, links = generator(60, seed=1)
+            self.assertLess(abs(len(switches) - 60), 20, name)
+            graph = nx.Graph()
+            for link in links.values():
+                self.assertTrue(link.is_active())
+                self.assertIn("delay", link.metadata)
+                graph.add_edge(link.endpoint_a.switch.id,
+                               link.endpoint_b.switch.id)
+            self.assertEqual(len(graph), len(switches), name)
+            self.assertTrue(nx.is_connected(graph), name)
+
+    def test_fat_tree(self):
+        """A 4-ary fat tree has 20 switches and 32 links."""
+        switches, links = fat_tree(20)
+        self.assertEqual((len(switches), len(links)), (20, 32))
+
+
+class TestRun(TestCase):
+    """Run the scenarios on a small topology."""
+
+    def test_percentile(self):
+        """Percentiles are nearest-rank."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([3], 0.99), 3)
+
+    def test_run_benchmarks(self):
+        """Every scenario records its statistics."""
+        results = run_benchmarks(["ring"], size=10, queries=2, builds=1,
+                                 flaps=1)
+        self.assertEqual(results["meta"]["size"], 10)
+        scenarios = results["scenarios"]
+        self.assertIn("ring/update_topology", scenarios)
+        self.assertIn("ring/constrained_flexible_paths[flexible=4]",
+                      scenarios)
+        for stats in scenarios.values():
+            self.assertEqual(set(stats), {"operations", "throughput",
+                                          "p50_ms", "p99_ms",
+                                          "peak_memory_kib"})
+            self.assertGreater(stats["throughput"], 0)
+
+
+class TestCompare(TestCase):
+    """Compare the medians of the runs with a baseline."""
+
+    @staticmethod
+    def results(**stats):
+        """Return the results of a single scenario."""
+        scenario = {"operations": 10, "throughput": 100.0, "p50_ms": 10.0,
+                    "p99_ms": 20.0, "peak_memory_kib": 1000.0}
+        scenario.update(stats)
+        return {"meta": {}, "scenarios": {"grid/shortest_paths": scenario}}
+
+    def test_tolerances(self):
+        """Changes within the tolerances or the noise are no regression."""
+        baseline = self.results()
+        for stats in ({"p50_ms": 12.0}, {"p99_ms": 29.0},
+                      {"throughput": 81.0}, {"peak_memory_kib": 1290.0}):
+            self.assertEqual(compare.regressions(
+                baseline, self.results(**stats)), [])
+        self.assertEqual(compare.regressions(
+            self.results(p50_ms=0.01), self.results(p50_ms=0.04)), [])
+
+    def test_regressions(self):
+        """Slower, lower-throughput or heavier scenarios regress."""
+        found = compare.regressions(
+            self.results(), self.results(p50_ms=13.0, throughput=70.0,
+                                         peak_memory_kib=2000.0))
+        self.assertEqual([(key, before, after)
+                          for _, key, before, after, _ in found],
+                         [("p50_ms", 10.0, 13.0),
+                          ("peak_memory_kib", 1000.0, 2000.0),
+                          ("throughput", 100.0, 70.0)])
+        text = compare.report(self.results(), self.results(), found)
+        self.assertIn("3 regressions", text)
+        self.assertIn("+30.0%", text)
+
+    def test_scenario_tolerances(self):
+        """Tolerances of a scenario override those of every topology."""
+        tolerances = {"shortest_paths": {"p50_ms": 0.5},
+                      "grid/shortest_paths": {"throughput": 0.5}}
+        self.assertEqual(compare.regressions(
+            self.results(), self.results(p50_ms=14.0, throughput=60.0),
+            tolerances), [])
+        limits = compare.tolerance(tolerances, "ring/shortest_paths")
+        self.assertEqual(limits["p50_ms"], 0.5)
+        self.assertEqual(limits["throughput"], 0.2)
+
+    def test_record_and_compare(self):
+        """A recorded baseline is compared with the same options."""
+        with TemporaryDirectory() as directory:
+            baseline = str(Path(directory, "baseline.json"))
+            options = ["--baseline", baseline, "--runs", "2"]
+            with redirect_stdout(StringIO()):
+                self.assertEqual(compare.main(
+                    options + ["--record", "--topologies", "ring",
+                               "--size", "10", "--queries", "2",
+                               "--builds", "1", "--flaps", "1"]), 0)
+            with open(baseline) as source:
+                recorded = json.load(source)
+            self.assertEqual(recorded["meta"]["runs"], 2)
+            self.assertEqual(recorded["meta"]["topologies"], ["ring"])
+            output = StringIO()
+            with redirect_stdout(output):
+                compare.main(options)
+            self.assertIn("ring/update_topology", output.getvalue())
+            self.assertNotIn("Not in the baseline", output.getvalue())
+
+
+class TestLoad(TestCase):
+    """Drive the REST endpoints of Main under load."""
+
+    def test_synthetic_queries(self):
+        """The mix has weighted v2 queries and constrained v3 queries."""
+        switches, _ = GENERATORS["ring"](10)
+        queries = synthetic_queries(switches, 50, constrained=0.5)
+        endpoints = {query["endpoint"] for query in queries}
+        self.assertEqual(endpoints, {"v2", "v3"})
+        for query in queries:
+            self.assertEqual("metrics" in query["body"],
+                             query["endpoint"] == "v3")
+
+    def test_run_load(self):
+        """Recorded queries are answered while links flap."""
+        with TemporaryDirectory() as directory:
+            path = Path(directory, "queries.jsonl")
+            path.write_text("\n".join(json.dumps(query) for query in [
+                {"endpoint": "v2", "body": {"source": "S0",
+                                            "destination": "S5"}},
+                {"endpoint": "v3", "body": {"source": "S1",
+                                            "destination": "S7",
+                                            "metrics": {"delay": 40}}},
+                {"endpoint": "v2", "body": {"source": "S0",
+                                            "destination": "S5",
+                                            "max_paths": 0}}]))
+            self.assertEqual(len(recorded_queries(path)), 3)
+            report = run_load("ring", 10, str(path), concurrency=2,
+                              duration=0.5, update_interval=0.05)
+        self.assertGreater(report["requests"], 0)
+        self.assertEqual(report["endpoints"]["v3"]["error_rate"], 0)
+        self.assertGreater(report["endpoints"]["v2"]["error_rate"], 0)
+        self.assertGreater(report["updates"]["events"]["received"], 1)
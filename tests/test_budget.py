@@ -0,0 +1,91 @@
+"""Module to test the budgeted paths of KytosGraph."""
+from unittest.mock import Mock
+
+import networkx as nx
+
+# module under test
+from graph import KytosGraph
+from main import Main
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestBudgetPaths(TestKytosGraph):
+    """Compare budgeted paths with every simple path on TestGraph2."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    def setup(self):
+        """Build the TestGraph2 topology."""
+        switches, links = self.generateTopology()
+        self.graph = KytosGraph()
+        self.graph.update_topology(Mock(switches=switches, links=links))
+
+    def sums(self, path):
+        """Return the hop count and the total delay of a path."""
+        delay = sum(self.graph.get_metadata_from_link(u, v).get("delay", 0)
+                    for u, v in zip(path, path[1:]))
+        return {"hops": len(path) - 1, "delay": delay}
+
+    def expected(self, source, destination, budgets, minimize, **metrics):
+        """Return the lowest sum of minimize over the paths in budget."""
+        graph = nx.Graph()
+        graph.add_edges_from(self.graph.nodes.path(edge) for edge in
+                             self.graph._filter_edges(**metrics))
+        costs = [self.sums(path)[minimize]
+                 for path in nx.all_simple_paths(graph, source, destination,
+                                                 cutoff=20)
+                 if all(self.sums(path)[metric] <= budget
+                        for metric, budget in budgets.items())]
+        return min(costs, default=None)
+
+    def test_cheapest_within_budgets(self):
+        """Paths are the cheapest ones whose sums fit the budgets."""
+        self.setup()
+        for budgets, minimize, metrics in (
+                ({"hops": 12}, "delay", {}),
+                ({"hops": 20}, "delay", {}),
+                ({"delay": 126}, "hops", {}),
+                ({"delay": 200, "hops": 16}, "hops", {"bandwidth": 100}),
+                ({"hops": 4}, "delay", {})):
+            results = self.graph.budget_paths("User1", "User2", budgets,
+                                              minimize, **metrics)
+            cost = self.expected("User1", "User2", budgets, minimize,
+                                 **metrics)
+            if cost is None:
+                self.assertEqual(results, [])
+                continue
+            self.assertTrue(results)
+            for result in results:
+                path, = result["paths"]
+                sums = self.sums(path)
+                self.assertEqual(result["values"][minimize], cost)
+                self.assertEqual(sums[minimize], cost)
+                for metric, budget in budgets.items():
+                    self.assertEqual(result["values"][metric], sums[metric])
+                    self.assertLessEqual(sums[metric], budget)
+
+    def test_max_paths_and_same_node(self):
+        """max_paths bounds the results, and a node reaches itself."""
+        self.setup()
+        results = self.graph.budget_paths("User1", "User2", {"hops": 20},
+                                          max_paths=1)
+        self.assertEqual(len(results), 1)
+        results = self.graph.budget_paths("User1", "User1", {"delay": 0})
+        self.assertEqual(results[0]["paths"], [["User1"]])
+
+    def test_metrics_that_can_not_be_summed(self):
+        """Budgets and minimize on other metrics are rejected."""
+        self.setup()
+        for budgets, minimize in (({"bandwidth": 10}, None),
+                                  ({"latency": 10}, None),
+                                  ({"delay": 10}, "bandwidth")):
+            self.assertRaises(ValueError, self.graph.budget_paths, "User1",
+                              "User2", budgets, minimize)
+            self.assertIsNotNone(Main._mode_error(
+                {"mode": "budget", "budgets": budgets, "minimize": minimize}))
+        self.assertIsNone(Main._mode_error(
+            {"mode": "budget", "budgets": {"delay": 10, "hops": 3},
+             "minimize": "utilization"}))
@@ -0,0 +1,153 @@
+"""Module to test the path cache of KytosGraph."""
+from unittest import TestCase
+from unittest.mock import Mock
+
+# module under test
+from cache import PathCache
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph1
+
+# Core modules to import
+from kytos.core.link import Link
+
+
+class TestPathCache(TestCase):
+    """Test the LRU behaviour of PathCache."""
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted first."""
+        cache = PathCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_counters(self):
+        """Hits and misses are counted."""
+        cache = PathCache(2)
+        cache.get("a")
+        cache.put("a", 1)
+        cache.get("a")
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    def test_disabled(self):
+        """A cache without size keeps nothing."""
+        cache = PathCache(0)
+        cache.put("a", 1)
+        self.assertEqual(len(cache), 0)
+
+
+class TestGraphCache(TestKytosGraph):
+    """Test the caching of KytosGraph path results."""
+
+    generateTopology = staticmethod(test_graph1.TestGraph1.generateTopology)
+
+    def setup(self):
+        """Build the graph through update_topology."""
+        self.switches, self.links = self.generateTopology()
+        self.topology = Mock(switches=self.switches, links=self.links)
+        self.graph = KytosGraph()
+        self.graph.update_topology(self.topology)
+
+    def test_shortest_paths_cached(self):
+        """Repeated queries are answered from the cache."""
+        self.setup()
+        first = self.get_path("S1", "S2")
+        second = self.get_path("S1", "S2")
+        self.assertEqual(first, second)
+        self.assertEqual(self.graph.cache.stats["hits"], 1)
+        self.assertEqual(self.graph.cache.stats["misses"], 1)
+
+    def test_constrained_paths_cached(self):
+        """Repeated constrained queries are answered from the cache."""
+        self.setup()
+        first = self.get_path_constrained("S1", "S2", 1, ownership="blue")
+        first[0]["paths"].clear()
+        second = self.get_path_constrained("S1", "S2", 1, ownership="blue")
+        self.assertNotEqual(second[0]["paths"], [])
+        self.assertEqual(self.graph.cache.stats["hits"], 1)
+
+    def test_unhashable_metrics(self):
+        """Queries that can not be hashed skip the cache."""
+        self.setup()
+        self.get_path_constrained("S1", "S2", 0, ownership=["blue"])
+        self.assertEqual(len(self.graph.cache), 0)
+
+    def test_invalidated_on_update(self):
+        """A topology change invalidates the cached results."""
+        self.setup()
+        self.assertNotEqual(self.get_path("S1", "S2"), [])
+        version = self.graph.topology_version
+        self.links["S1:1<->S2:1"].deactivate()
+        self.links["S3:1<->S2:2"].deactivate()
+        self.graph.update_topology(self.topology)
+        self.assertGreater(self.graph.topology_version, version)
+        self.assertEqual(self.get_path("S1", "S2"), [])
+
+    def test_kept_on_empty_delta(self):
+        """Reapplying the same topology keeps the cached results."""
+        self.setup()
+        self.get_path("S1", "S2")
+        self.graph.update_topology(self.topology)
+        self.get_path("S1", "S2")
+        self.assertEqual(self.graph.cache.stats["hits"], 1)
+
+    def test_removal_keeps_unrelated_paths(self):
+        """A link going down only drops the paths that use it."""
+        self.setup()
+        self.get_path("S2", "S3")
+        self.get_path("S1", "S3")
+        self.links["S3:1<->S2:2"].deactivate()
+        self.graph.update_topology(self.topology)
+        self.assertEqual(len(self.graph.cache), 1)
+        self.assertEqual(self.get_path("S1", "S3"),
+                         [["S1", "S1:2", "S3:2", "S3"]])
+        self.assertEqual(self.graph.cache.stats["hits"], 1)
+
+    def test_metadata_change_keeps_unweighted_paths(self):
+        """Metadata changes only drop results that depend on metadata."""
+        self.setup()
+        self.get_path("S1", "S2")
+        self.assertEqual(
+            self.get_path_constrained("S1", "S2", 0, bandwidth=51), [])
+        self.links["S1:2<->S3:2"].extend_metadata({"bandwidth": 60})
+        self.graph.update_topology(self.topology)
+        self.assertEqual(len(self.graph.cache), 1)
+        results = self.get_path_constrained("S1", "S2", 0, bandwidth=51)
+        self.assertEqual(results[0]["paths"],
+                         [["S1", "S1:2", "S3:2", "S3", "S3:1", "S2:2", "S2"]])
+
+    def test_addition_drops_paths_in_component(self):
+        """A new link drops every path of its connected component."""
+        self.setup()
+        self.get_path("S1", "S4")
+        self.get_path("S5", "S5")
+        self.links["S2:3<->S4:1"] = Link(self.switches["S2"].interfaces[3],
+                                         self.switches["S4"].interfaces[1])
+        self.graph.update_links(self.links)
+        self.assertEqual(len(self.graph.cache), 1)
+        self.assertNotEqual(self.get_path("S1", "S4"), [])
+
+    def test_metadata_keys_added_and_removed(self):
+        """New and removed metadata keys drop the constrained results."""
+        self.setup()
+        direct = ["S1", "S1:1", "S2:1", "S2"]
+        results = self.get_path_constrained("S1", "S2", 0, priority=5)
+        self.assertIn(direct, results[0]["paths"])
+        link = self.links["S1:1<->S2:1"]
+        link.extend_metadata({"priority": 1})
+        self.graph.update_links(self.links)
+        results = self.get_path_constrained("S1", "S2", 0, priority=5)
+        self.assertNotIn(direct, results[0]["paths"])
+        link.remove_metadata("priority")
+        self.graph.update_links(self.links)
+        self.assertNotIn("priority", self.graph.get_metadata_from_link(
+            "S1:1", "S2:1"))
+        results = self.get_path_constrained("S1", "S2", 0, priority=5)
+        self.assertIn(direct, results[0]["paths"])
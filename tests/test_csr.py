@@ -0,0 +1,90 @@
+"""Module to test the CSR backend of KytosGraph."""
+from itertools import combinations, islice
+from unittest import skipUnless
+from unittest.mock import Mock
+
+import networkx as nx
+
+# module under test
+from csr import CSRGraph
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+@skipUnless(CSRGraph.available(), "scipy is not installed")
+class TestCSRBackend(TestKytosGraph):
+    """Compare the CSR backend with networkx on the TestGraph2 topology."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    def setup(self):
+        """Build the same topology on both backends."""
+        switches, links = self.generateTopology()
+        topology = Mock(switches=switches, links=links)
+        self.graph = KytosGraph(backend="csr", cache_size=0)
+        self.graph.update_topology(topology)
+        self.expected = KytosGraph(cache_size=0)
+        self.expected.update_topology(topology)
+        self.pairs = list(combinations(
+            ["User1", "User2", "User3", "User4", "S1:1", "S6"], 2))
+
+    def assert_same_paths(self, result, expected):
+        """Check that two lists have the same paths in any order."""
+        self.assertEqual(sorted(result), sorted(expected))
+
+    def test_all_shortest_paths(self):
+        """Hop count and weighted searches find the same paths."""
+        self.setup()
+        for source, destination in self.pairs + [("User1", "User1")]:
+            for parameter in (None, "delay", "custom"):
+                self.assert_same_paths(
+                    self.graph.shortest_paths(source, destination, parameter),
+                    self.expected.shortest_paths(source, destination,
+                                                 parameter))
+
+    def test_unknown_nodes(self):
+        """Unknown nodes have no paths."""
+        self.setup()
+        self.assertEqual(self.graph.shortest_paths("User1", "X"), [])
+        self.assertEqual(self.graph.shortest_paths("X", "X"), [])
+
+    def test_constrained_paths(self):
+        """Constrained searches find the same paths."""
+        self.setup()
+        metrics = {"delay": 50, "bandwidth": 100, "ownership": "B"}
+        for source, destination in self.pairs:
+            result = self.graph.constrained_flexible_paths(
+                source, destination, 3, **metrics)
+            expected = self.expected.constrained_flexible_paths(
+                source, destination, 3, **metrics)
+            self.assertEqual([r["metrics"] for r in result],
+                             [r["metrics"] for r in expected])
+            for paths, expected_paths in zip(result, expected):
+                self.assert_same_paths(paths["paths"],
+                                       expected_paths["paths"])
+
+    def test_shortest_simple_paths(self):
+        """Yen's algorithm yields simple paths by increasing cost."""
+        self.setup()
+        csr = self.graph._compiled()
+        for source, destination in self.pairs:
+            for parameter in (None, "delay"):
+                source_id = self.graph.nodes.get(source)
+                destination_id = self.graph.nodes.get(destination)
+                result = list(islice(csr.shortest_simple_paths(
+                    source_id, destination_id, parameter), 20))
+                expected = list(islice(nx.shortest_simple_paths(
+                    self.graph.graph, source_id, destination_id,
+                    self.graph._weight(parameter)), 20))
+                weight = self.graph._weight(parameter) or (
+                    lambda u, v, d: 1)
+
+                def cost(path, weight=weight):
+                    return sum(weight(u, v, {})
+                               for u, v in zip(path, path[1:]))
+                self.assertEqual([cost(path) for path in result],
+                                 [cost(path) for path in expected])
+                self.assertEqual(len(set(map(tuple, result))), len(result))
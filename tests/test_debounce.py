@@ -0,0 +1,101 @@
+"""Module to test the coalescing of topology updates."""
+from threading import Event
+from time import sleep
+from unittest import TestCase
+from unittest.mock import Mock
+
+# module under test
+from debounce import Debouncer
+from main import Main
+
+from tests import test_graph1
+
+
+class TestDebouncer(TestCase):
+    """Coalesce bursts of values into one call."""
+
+    def setUp(self):
+        """Record the values applied."""
+        self.applied = []
+        self.called = Event()
+
+    def apply(self, value):
+        """Record a value."""
+        self.applied.append(value)
+        self.called.set()
+
+    def test_burst(self):
+        """A burst is applied once, with its latest value."""
+        debouncer = Debouncer(self.apply, quiet=0.05, max_delay=5)
+        for value in range(10):
+            debouncer.submit(value)
+        self.assertTrue(self.called.wait(2))
+        self.assertEqual(self.applied, [9])
+        self.assertEqual(debouncer.stats, {"received": 10, "applied": 1,
+                                           "merged": 9, "pending": False})
+        debouncer.stop()
+
+    def test_max_delay(self):
+        """A steady stream of values is applied after the maximum delay."""
+        debouncer = Debouncer(self.apply, quiet=1, max_delay=0.05)
+        for value in range(10):
+            debouncer.submit(value)
+            sleep(0.02)
+        self.assertTrue(self.called.wait(2))
+        debouncer.stop()
+        self.assertGreater(len(self.applied), 1)
+        self.assertEqual(self.applied, sorted(self.applied))
+
+    def test_flush_and_stop(self):
+        """Flushing applies the pending value, and stopping drops it."""
+        debouncer = Debouncer(self.apply, quiet=60, max_delay=60)
+        debouncer.submit(1)
+        debouncer.submit(2)
+        self.assertTrue(debouncer.stats["pending"])
+        debouncer.flush()
+        self.assertEqual(self.applied, [2])
+        debouncer.submit(3)
+        debouncer.stop()
+        debouncer.flush()
+        self.assertEqual(self.applied, [2])
+        self.assertEqual(debouncer.stats["merged"], 1)
+
+    def test_disabled(self):
+        """A quiet window of 0 applies every value right away."""
+        debouncer = Debouncer(self.apply, quiet=0)
+        debouncer.submit(1)
+        debouncer.submit(2)
+        self.assertEqual(self.applied, [1, 2])
+        self.assertEqual(debouncer.stats["merged"], 0)
+
+    def test_errors(self):
+        """Errors are logged and later values are still applied."""
+        values = []
+
+        def apply(value):
+            values.append(value)
+            if value == 1:
+                raise ValueError(value)
+        debouncer = Debouncer(apply, quiet=0)
+        debouncer.submit(1)
+        debouncer.submit(2)
+        self.assertEqual(values, [1, 2])
+
+
+class TestTopologyEvents(TestCase):
+    """Apply the topology events of Main through a Debouncer."""
+
+    def test_links_follow_the_graph(self):
+        """Links of queries are looked up in the topology of the graph."""
+        napp = Main.__new__(Main)
+        napp.setup()
+        napp._updates = Debouncer(napp._apply_topology, quiet=5,
+                                  max_delay=10)
+        self.addCleanup(napp.shutdown)
+        switches, links = test_graph1.TestGraph1.generateTopology()
+        napp.update_topology(Mock(content={"topology": Mock(
+            switches=switches, links=links)}))
+        self.assertEqual(napp._link_endpoints(["S1:1<->S2:1"]), [])
+        napp._updates.flush()
+        self.assertEqual(napp._link_endpoints(["S1:1<->S2:1"]),
+                         [("S1:1", "S2:1")])
@@ -0,0 +1,170 @@
+"""Module to test the edge filtering of KytosGraph."""
+from unittest import TestCase
+from unittest.mock import patch
+
+# module under test
+from index import MetricIndex
+from store import LinkAttributeStore
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph1
+
+
+class TestEdgeFilters(TestKytosGraph):
+    """Test the edge filters on the topology used by TestGraph1."""
+
+    generateTopology = staticmethod(test_graph1.TestGraph1.generateTopology)
+
+    def edge_names(self, edges):
+        """Return the edges between node ids as sets of node names."""
+        return {frozenset(self.graph.nodes.path(edge)) for edge in edges}
+
+    def test_edge_masks(self):
+        """Each metric mask selects exactly the edges passing its filter."""
+        self.setup()
+        edges, masks = self.graph._edge_masks(bandwidth=50, ownership="blue",
+                                              unknown=1)
+        self.assertNotIn("unknown", masks)
+        self.assertEqual(
+            self.edge_names(
+                self.graph._masked_edges(edges, masks["bandwidth"])),
+            self.edge_names(self.graph.graph.edges) -
+            {frozenset(("S1:2", "S3:2"))})
+        self.assertEqual(
+            self.edge_names(
+                self.graph._masked_edges(edges, masks["ownership"])),
+            self.edge_names(self.graph.graph.edges) -
+            {frozenset(("S1:1", "S2:1"))})
+
+    def test_filter_edges(self):
+        """Filtering combines every metric."""
+        self.setup()
+        edges = self.edge_names(self.graph._filter_edges(
+            bandwidth=50, ownership="blue"))
+        self.assertIn(frozenset(("S3:1", "S2:2")), edges)
+        self.assertNotIn(frozenset(("S1:1", "S2:1")), edges)
+        self.assertNotIn(frozenset(("S1:2", "S3:2")), edges)
+        self.assertEqual(len(edges), 10)
+
+    def test_same_mask_searched_once(self):
+        """Combinations keeping the same edges are searched once."""
+        self.setup()
+        method = self.graph._masked_shortest_paths
+        with patch.object(self.graph, "_masked_shortest_paths",
+                          side_effect=method) as search:
+            results = self.get_path_constrained("S1", "S2", 2, bandwidth=1,
+                                                reliability=1)
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]["metrics"],
+                         {"bandwidth": 1, "reliability": 1})
+
+    def test_index_refreshed_by_changed_edges(self):
+        """update_links only reindexes the edges of changed links."""
+        self.setup()
+        switches, links = self.generateTopology()
+        self.graph.update_nodes(switches)
+        self.graph.update_links(links)
+        links["S1:1<->S2:1"].extend_metadata({"bandwidth": 500})
+        with patch.object(self.graph.index.__class__, "add",
+                          autospec=True,
+                          side_effect=self.graph.index.__class__.add) as add:
+            self.graph.update_links(links)
+        self.assertEqual(add.call_count, 1)
+        edges = self.edge_names(self.graph._filter_edges(bandwidth=500))
+        self.assertIn(frozenset(("S1:1", "S2:1")), edges)
+        self.assertNotIn(frozenset(("S1:2", "S3:2")), edges)
+
+
+class TestMetricIndex(TestCase):
+    """Test that index queries match a scan of every edge."""
+
+    def setUp(self):
+        """Index edges with missing, numeric and removed values."""
+        self.store = LinkAttributeStore({"bandwidth": "float",
+                                         "delay": "float",
+                                         "ownership": "label"})
+        self.index = MetricIndex(self.store, {"bandwidth": ">=",
+                                              "delay": "<=",
+                                              "ownership": "=="})
+        self.metadata = {
+            ("A", "B"): {"bandwidth": 10, "delay": 5, "ownership": "red"},
+            ("B", "C"): {"bandwidth": 100.5, "ownership": "blue"},
+            ("C", "D"): {},
+            ("D", "E"): {"bandwidth": 50, "delay": 50, "ownership": "blue"},
+            ("E", "F"): {"delay": 20},
+            ("F", "G"): {"bandwidth": 50, "delay": 1, "ownership": "red"},
+        }
+        self.index.add(self.store.add("X", "Y"))
+        for (endpoint_a, endpoint_b), metadata in self.metadata.items():
+            edge_id = self.store.add(endpoint_a, endpoint_b)
+            self.store.update(edge_id, metadata)
+            self.index.add(edge_id)
+        self.index.discard(self.store.edge_id("X", "Y"))
+        self.store.remove("X", "Y")
+
+    def expected(self, metric, predicate):
+        """Return the bitmask of the edges passing a predicate."""
+        return self.index.mask(
+            self.store.edge_id(*edge)
+            for edge, metadata in self.metadata.items()
+            if metric not in metadata or predicate(metadata[metric]))
+
+    def test_thresholds(self):
+        """Numeric thresholds return the same edges as a scan."""
+        for value in (0, 10, 11, 50, 100.5, 1000):
+            self.assertEqual(
+                self.index.query("delay", value),
+                self.expected("delay", lambda d, v=value: d <= v))
+            self.assertEqual(
+                self.index.query("bandwidth", value),
+                self.expected("bandwidth", lambda b, v=value: b >= v))
+
+    def test_equality(self):
+        """Equality queries return the same edges as a scan."""
+        for value in ("red", "blue", "green"):
+            self.assertEqual(
+                self.index.query("ownership", value),
+                self.expected("ownership", lambda o, v=value: o == v))
+
+    def test_value_of_another_type(self):
+        """Values of another type only pass the edges without the metric."""
+        self.assertEqual(self.index.matching("bandwidth", "fast"), [])
+        self.assertEqual(self.index.query("ownership", 1),
+                         self.expected("ownership", lambda o: False))
+
+    def test_removed_edges_never_pass(self):
+        """Free edge ids are not part of any result."""
+        self.assertEqual(self.index.alive, self.expected("", None))
+        self.assertEqual(self.index.query("delay", 1000) & ~self.index.alive,
+                         0)
+
+    def test_changed_values(self):
+        """Edges changed one by one are queried like the others."""
+        edge_id = self.store.edge_id("A", "B")
+        self.index.discard(edge_id)
+        self.store.replace(edge_id, {"bandwidth": 200})
+        self.index.add(edge_id)
+        self.metadata[("A", "B")] = {"bandwidth": 200}
+        for value in (10, 100, 200):
+            self.assertEqual(
+                self.index.query("bandwidth", value),
+                self.expected("bandwidth", lambda b, v=value: b >= v))
+        self.assertEqual(self.index.query("ownership", "red"),
+                         self.expected("ownership", lambda o: o == "red"))
+
+    def test_copy(self):
+        """Changes to a copy of the index leave the original alone."""
+        before = self.index.query("delay", 20)
+        store = self.store.copy()
+        index = self.index.copy(store)
+        edge_id = store.edge_id("E", "F")
+        index.discard(edge_id)
+        store.remove("E", "F")
+        self.assertEqual(self.index.query("delay", 20), before)
+        self.assertEqual(index.query("delay", 20), before & ~(1 << edge_id))
+
+    def test_mask(self):
+        """Masks only set the bits of the given edge ids."""
+        self.assertEqual(MetricIndex.mask([]), 0)
+        self.assertEqual(MetricIndex.mask([0, 3, 9]), 0b1000001001)
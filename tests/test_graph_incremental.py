@@ -0,0 +1,95 @@
+"""Module to test the incremental topology updates of KytosGraph."""
+from unittest.mock import Mock
+
+# module under test
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph1
+
+# Core modules to import
+from kytos.core.link import Link
+
+
+class TestIncrementalUpdate(TestKytosGraph):
+    """Apply topology deltas on top of the topology used by TestGraph1."""
+
+    generateTopology = staticmethod(test_graph1.TestGraph1.generateTopology)
+
+    def setup(self):
+        """Build the graph through update_topology."""
+        self.switches, self.links = self.generateTopology()
+        self.topology = Mock(switches=self.switches, links=self.links)
+        self.graph = KytosGraph()
+        self.delta = self.graph.update_topology(self.topology)
+
+    @staticmethod
+    def graph_contents(graph):
+        """Return the node names and the metadata by edge of a graph."""
+        nodes = set(graph.nodes.path(graph.graph.nodes))
+        edges = {}
+        for edge in graph.graph.edges:
+            endpoint_a, endpoint_b = graph.nodes.path(edge)
+            edges[frozenset((endpoint_a, endpoint_b))] = \
+                graph.get_metadata_from_link(endpoint_a, endpoint_b)
+        return nodes, edges
+
+    def assert_same_as_rebuilt(self):
+        """Check that the incremental graph matches a full rebuild."""
+        expected = KytosGraph(incremental=False)
+        expected.update_topology(self.topology)
+        self.assertEqual(self.graph_contents(self.graph),
+                         self.graph_contents(expected))
+
+    def test_first_update_adds_everything(self):
+        """The first update adds all nodes and edges."""
+        self.setup()
+        self.assertEqual(self.delta["nodes_added"], 14)
+        self.assertEqual(self.delta["edges_added"], 12)
+        self.assertEqual(self.delta["edges_removed"], 0)
+        self.assert_same_as_rebuilt()
+
+    def test_same_topology_is_empty_delta(self):
+        """Reapplying the same topology changes nothing."""
+        self.setup()
+        delta = self.graph.update_topology(self.topology)
+        self.assertEqual(delta, KytosGraph._empty_delta())
+
+    def test_link_deactivation(self):
+        """A link going down only removes its edge."""
+        self.setup()
+        self.links["S1:1<->S2:1"].deactivate()
+        delta = self.graph.update_topology(self.topology)
+        self.assertEqual(delta["edges_removed"], 1)
+        self.assertEqual(delta["edges_added"], 0)
+        self.assertEqual(delta["nodes_removed"], 0)
+        self.assertRaises(KeyError, self.graph.get_metadata_from_link,
+                          "S1:1", "S2:1")
+        self.assert_same_as_rebuilt()
+
+    def test_metadata_change(self):
+        """A metadata change re-attributes the edge in place."""
+        self.setup()
+        self.links["S1:1<->S2:1"].extend_metadata({"bandwidth": 10})
+        delta = self.graph.update_topology(self.topology)
+        self.assertEqual(delta["edges_updated"], 1)
+        self.assertEqual(
+            self.graph.get_metadata_from_link("S1:1", "S2:1")["bandwidth"], 10)
+        self.assert_same_as_rebuilt()
+
+    def test_switch_removal_and_new_link(self):
+        """Removing a switch drops its interfaces and their edges."""
+        self.setup()
+        interfaces = self.switches["S4"].interfaces
+        self.links["S2:3<->S4:1"] = Link(
+            self.switches["S2"].interfaces[3], interfaces[1])
+        delta = self.graph.update_topology(self.topology)
+        self.assertEqual(delta["edges_added"], 1)
+        self.assertNotEqual(self.get_path("S1", "S4"), [])
+
+        del self.links["S2:3<->S4:1"]
+        del self.switches["S4"]
+        delta = self.graph.update_topology(self.topology)
+        self.assertEqual(delta["nodes_removed"], 3)
+        self.assertEqual(delta["edges_removed"], 3)
+        self.assert_same_as_rebuilt()
@@ -0,0 +1,102 @@
+"""Module to test the contraction hierarchies of KytosGraph."""
+from random import Random
+from unittest import TestCase
+from unittest.mock import Mock
+
+import networkx as nx
+
+# module under test
+from graph import KytosGraph
+from hierarchy import contract
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestContraction(TestCase):
+    """Compare the hierarchies with nx.all_shortest_paths."""
+
+    def test_all_shortest_paths(self):
+        """Every shortest path is found, ties and weights of 0 included.
+
+        networkx repeats some paths when edges weigh 0, so the paths are
+        compared as sets.
+        """
+        random = Random(3)
+        for seed in range(8):
+            graph = nx.gnm_random_graph(50, 110, seed=seed)
+            for u, v in graph.edges:
+                graph[u][v]["weight"] = random.randint(seed % 2, 3)
+
+            def weight(u, v, graph=graph):
+                return graph[u][v]["weight"]
+            hierarchy = contract(graph.neighbors, graph.nodes, weight,
+                                 settle_limit=4 + seed)
+            for source, destination in [(0, 49), (7, 31), (12, 12),
+                                        (40, 2)]:
+                try:
+                    expected = {tuple(path) for path in nx.all_shortest_paths(
+                        graph, source, destination, "weight")}
+                except nx.NetworkXNoPath:
+                    expected = set()
+                paths = [tuple(path) for path in hierarchy.shortest_paths(
+                    source, destination)]
+                self.assertEqual(len(paths), len(set(paths)))
+                self.assertEqual(set(paths), expected)
+
+    def test_cancelled(self):
+        """A cancelled contraction returns no hierarchy."""
+        graph = nx.path_graph(5)
+        self.assertIsNone(contract(graph.neighbors, graph.nodes,
+                                   lambda u, v: 1, lambda: True))
+
+
+class TestHierarchyQueries(TestKytosGraph):
+    """Answer weighted queries on TestGraph2 from the hierarchies."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    def setup(self):
+        """Build the topology with a hierarchy for delay."""
+        switches, self.links = self.generateTopology()
+        self.topology = Mock(switches=switches, links=self.links)
+        self.graph = KytosGraph(cache_size=0, hierarchies=["delay"])
+        self.graph.update_topology(self.topology)
+        self.graph._building.result()
+
+    def assert_same_paths(self):
+        """Check the hierarchy against searching from the source."""
+        for source, destination in (("User1", "User2"), ("User1", "User4"),
+                                    ("User3", "S9"), ("S1:1", "User1"),
+                                    ("User1", "X")):
+            self.assertEqual(
+                sorted(self.graph.shortest_paths(source, destination,
+                                                 "delay")),
+                sorted(self.graph.shortest_paths(
+                    source, destination, "delay", algorithm="dijkstra")))
+
+    def test_answers_from_hierarchy(self):
+        """Built hierarchies answer the queries with the same paths."""
+        self.setup()
+        self.assertIn("delay", self.graph._snapshot.hierarchies)
+        self.assertEqual(self.graph._algorithm("delay", "auto"), "hierarchy")
+        self.assertIsNone(self.graph._algorithm("delay", "dijkstra"))
+        self.assert_same_paths()
+
+    def test_rebuilt_after_updates(self):
+        """Updates fall back to searching until the hierarchy is rebuilt."""
+        self.setup()
+        self.links["S3:1<->S5:1"].deactivate()
+        self.graph.shutdown()
+        self.graph._builder = Mock()
+        self.graph.update_topology(self.topology)
+        self.assertEqual(self.graph._snapshot.hierarchies, {})
+        self.assertNotEqual(self.graph._algorithm("delay", "auto"),
+                            "hierarchy")
+        self.assert_same_paths()
+        self.graph._builder = None
+        self.graph._build_in_background(self.graph._snapshot)
+        self.graph._building.result()
+        self.assertIn("delay", self.graph._snapshot.hierarchies)
+        self.assert_same_paths()
@@ -0,0 +1,130 @@
+"""Module to test the desired and undesired links of KytosGraph."""
+from unittest.mock import Mock
+
+import networkx as nx
+
+# module under test
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestLinkConstraints(TestKytosGraph):
+    """Compare link constraints with filtering every simple path."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    def setup(self):
+        """Build the TestGraph2 topology with all shortest paths."""
+        switches, links = self.generateTopology()
+        self.graph = KytosGraph()
+        self.graph.update_topology(Mock(switches=switches, links=links))
+
+    @staticmethod
+    def uses(path, link):
+        """Tell whether a path goes through a link, in any direction."""
+        hops = list(zip(path, path[1:]))
+        return link in hops or link[::-1] in hops
+
+    def expected(self, source, destination, desired=(), undesired=()):
+        """Return the cheapest simple paths honoring the links."""
+        graph = nx.Graph()
+        graph.add_edges_from(
+            self.graph.nodes.path(edge) for edge in self.graph.graph.edges)
+        paths = [path for path in nx.all_simple_paths(
+                     graph, source, destination, cutoff=20)
+                 if all(self.uses(path, link) for link in desired) and
+                 not any(self.uses(path, link) for link in undesired)]
+        if not paths:
+            return []
+        shortest = min(map(len, paths))
+        return sorted(path for path in paths if len(path) == shortest)
+
+    def test_undesired_links(self):
+        """Paths through undesired links are never returned."""
+        self.setup()
+        undesired = [("S5:1", "S3:1"), ("S11:3", "User2:2"), ("X", "Y")]
+        paths = self.graph.shortest_paths("User1", "User2",
+                                          undesired=undesired)
+        self.assertEqual(sorted(paths),
+                         self.expected("User1", "User2",
+                                       undesired=undesired[:2]))
+
+    def test_desired_links(self):
+        """Every path goes through all the desired links."""
+        self.setup()
+        for desired in ([("S6:5", "S10:1")],
+                        [("S8:3", "S7:2")],
+                        [("S6:5", "S10:1"), ("S5:1", "S3:1")]):
+            paths = self.graph.shortest_paths("User1", "User2",
+                                              desired=desired)
+            self.assertTrue(paths)
+            self.assertEqual(sorted(paths),
+                             self.expected("User1", "User2", desired))
+
+    def test_unknown_or_undesired_desired_link(self):
+        """Desired links that can not be used leave no path."""
+        self.setup()
+        self.assertEqual(self.graph.shortest_paths(
+            "User1", "User2", desired=[("X", "Y")]), [])
+        link = ("S6:5", "S10:1")
+        self.assertEqual(self.graph.shortest_paths(
+            "User1", "User2", desired=[link], undesired=[link]), [])
+
+    def test_max_paths(self):
+        """Waypoint paths stop after max_paths."""
+        self.setup()
+        paths = self.graph.shortest_paths(
+            "User1", "User2", max_paths=1, desired=[("S5:1", "S3:1")])
+        self.assertEqual(len(paths), 1)
+
+    def setup_edges(self, edges):
+        """Build a topology of links between the given nodes."""
+        links = {}
+        for endpoint_a, endpoint_b in edges:
+            link = Mock(endpoint_a=Mock(id=endpoint_a),
+                        endpoint_b=Mock(id=endpoint_b), metadata={})
+            link.is_active.return_value = True
+            links[f"{endpoint_a}<->{endpoint_b}"] = link
+        self.graph = KytosGraph()
+        self.graph.update_topology(Mock(switches={}, links=links))
+
+    def test_crossing_segments(self):
+        """A path is found when the shortest segments cross each other."""
+        self.setup_edges([("S", "X"), ("X", "A"), ("A", "B"), ("B", "X"),
+                          ("X", "D"), ("B", "Y"), ("Y", "Z"), ("Z", "D")])
+        paths = self.graph.shortest_paths("S", "D", desired=[("A", "B")])
+        self.assertEqual(paths, [["S", "X", "A", "B", "Y", "Z", "D"]])
+
+    def test_links_sharing_a_node(self):
+        """Desired links sharing a node are crossed through that node."""
+        self.setup_edges([("S", "B"), ("B", "A"), ("A", "C"), ("C", "D"),
+                          ("S", "A"), ("A", "D")])
+        paths = self.graph.shortest_paths("S", "D",
+                                          desired=[("A", "B"), ("A", "C")])
+        self.assertEqual(paths, [["S", "B", "A", "C", "D"]])
+
+    def test_links_touching_the_source(self):
+        """No path is returned when every route visits a node twice."""
+        self.setup_edges([("S", "A"), ("A", "X"), ("X", "B"), ("S", "B"),
+                          ("B", "D"), ("A", "D")])
+        self.assertEqual(self.graph.shortest_paths(
+            "S", "D", desired=[("S", "A"), ("S", "B")]), [])
+        self.assertEqual(self.graph.shortest_paths(
+            "S", "D", desired=[("A", "S"), ("X", "B")]),
+            [["S", "A", "X", "B", "D"]])
+
+    def test_repeated_link(self):
+        """A link desired twice is crossed once."""
+        self.setup()
+        link = ("S6:5", "S10:1")
+        expected = self.graph.shortest_paths("User1", "User2",
+                                             desired=[link])
+        for desired in ([link, link], [link, link[::-1]]):
+            paths = self.graph.shortest_paths("User1", "User2",
+                                              desired=desired)
+            self.assertEqual(paths, expected)
+            for path in paths:
+                self.assertEqual(len(set(path)), len(path))
@@ -0,0 +1,131 @@
+"""Module to test the REST endpoints of the Main NApp."""
+from unittest import TestCase
+from unittest.mock import Mock
+
+from flask import Flask
+
+# module under test
+from main import Main
+
+from tests import test_graph2
+
+PREFIX = "/api/kytos/pathfinder"
+METRICS = {"delay": 50, "bandwidth": 100, "ownership": "B"}
+
+
+class TestEndpoints(TestCase):
+    """Post queries to the v2/, v3/ and v2/batch endpoints."""
+
+    def setUp(self):
+        """Route the endpoints to a NApp knowing the TestGraph2 topology."""
+        self.napp = Main.__new__(Main)
+        self.napp.setup()
+        switches, links = test_graph2.TestKytosGraph.generateTopology()
+        self.napp.graph.update_topology(Mock(switches=switches,
+                                             links=links))
+        app = Flask(__name__)
+        napp = self.napp
+        for endpoint, function in (("v2/", napp.shortest_path),
+                                   ("v3/", napp.shortest_constrained_path),
+                                   ("v2/batch", napp.batch_paths)):
+            app.add_url_rule(f"{PREFIX}/{endpoint}", endpoint, function,
+                             methods=["POST"])
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Stop the NApp."""
+        self.napp.shutdown()
+
+    def post(self, endpoint, body):
+        """Post a body to an endpoint and return its status and JSON."""
+        response = self.client.post(f"{PREFIX}/{endpoint}", json=body)
+        return response.status_code, response.get_json()
+
+    def test_batch_order(self):
+        """Batch results are the single results, in the query order."""
+        queries = [
+            {"source": "User1", "destination": "User4", "max_paths": 2},
+            {"source": "User2", "destination": "User3",
+             "parameter": "delay"},
+            {"source": "User1", "destination": "User3", "metrics": METRICS,
+             "flexible": 1},
+            {"source": "User1", "destination": "User2",
+             "algorithm": "dijkstra"},
+            {"source": "User3", "destination": "User4", "metrics": METRICS,
+             "mode": "minimum", "flexible": 2},
+            {"source": "User1", "destination": "User2"},
+        ]
+        status, batch = self.post("v2/batch", {"queries": queries})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(batch["results"]), len(queries))
+        for query, result in zip(queries, batch["results"]):
+            endpoint = "v3/" if self.napp._constrained(query) else "v2/"
+            status, single = self.post(endpoint, query)
+            self.assertEqual(status, 200)
+            if endpoint == "v2/":
+                self.assertEqual(
+                    sorted(path["hops"] for path in result["paths"]),
+                    sorted(path["hops"] for path in single["paths"]))
+                continue
+            self.assertEqual([item["metrics"] for item in result],
+                             [item["metrics"] for item in single])
+            for item, single_item in zip(result, single):
+                self.assertEqual(sorted(item["paths"]),
+                                 sorted(single_item["paths"]))
+
+    def test_invalid_queries(self):
+        """Invalid queries get the same error in a batch and alone."""
+        queries = [
+            {"source": "User1", "destination": "User2", "max_paths": 0},
+            {"source": "User1", "destination": "User2", "parameter": 3},
+            {"source": "User1", "destination": "User2", "algorithm": "x"},
+            {"source": "User1", "destination": "User2", "metrics": [1]},
+            {"source": "User1", "destination": "User2", "flexible": "1"},
+            {"source": "User1", "destination": "User2", "mode": "x"},
+            {"source": 1, "destination": "User2", "metrics": METRICS},
+        ]
+        status, batch = self.post("v2/batch", {
+            "queries": [*queries, "query",
+                        {"source": "User1", "destination": "User2"}]})
+        self.assertEqual(status, 200)
+        results = batch["results"]
+        self.assertEqual(results[-2], {"error": "query must be an object"})
+        self.assertIn("paths", results[-1])
+        for query, result in zip(queries, results):
+            endpoint = "v3/" if self.napp._constrained(query) else "v2/"
+            status, single = self.post(endpoint, query)
+            self.assertEqual(status, 400)
+            self.assertIn("error", result)
+            self.assertEqual(single, result)
+        self.assertEqual(self.post("v2/batch", {"queries": {}})[0], 400)
+
+    def test_timeout(self):
+        """Queries timing out get an error, the others their paths."""
+        graph = self.napp.graph
+        graph.minimum_relaxation_paths = Mock(
+            side_effect=TimeoutError("2 of 4 searches not run"))
+        search = graph._constrained_flexible_paths_from
+
+        def timing_out(source, *args, **kwargs):
+            if source == graph.nodes.get("User1"):
+                raise TimeoutError("3 of 4 searches not run")
+            return search(source, *args, **kwargs)
+        graph._constrained_flexible_paths_from = timing_out
+        queries = [
+            {"source": "User1", "destination": "User3", "metrics": METRICS,
+             "flexible": 1},
+            {"source": "User2", "destination": "User3", "metrics": METRICS,
+             "flexible": 1},
+            {"source": "User2", "destination": "User3", "metrics": METRICS,
+             "mode": "minimum"},
+            {"source": "User1", "destination": "User2"},
+        ]
+        status, batch = self.post("v2/batch", {"queries": queries})
+        self.assertEqual(status, 200)
+        results = batch["results"]
+        self.assertEqual(results[0], {"error": "3 of 4 searches not run"})
+        self.assertIsInstance(results[1], list)
+        self.assertEqual(results[2], {"error": "2 of 4 searches not run"})
+        self.assertIn("paths", results[3])
+        status, single = self.post("v3/", queries[2])
+        self.assertEqual((status, single), (504, results[2]))
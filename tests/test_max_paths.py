@@ -0,0 +1,85 @@
+"""Module to test the bounded path enumeration of KytosGraph."""
+from unittest.mock import Mock
+
+import networkx as nx
+
+# module under test
+from csr import CSRGraph
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestMaxPaths(TestKytosGraph):
+    """Test max_paths on the TestGraph2 topology."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    def setup(self):
+        """Build the topology on every available backend."""
+        switches, links = self.generateTopology()
+        topology = Mock(switches=switches, links=links)
+        backends = ["networkx"] + (["csr"] if CSRGraph.available() else [])
+        self.graphs = []
+        for backend in backends:
+            graph = KytosGraph(backend=backend)
+            graph.update_topology(topology)
+            self.graphs.append(graph)
+        self.graph = self.graphs[0]
+
+    def assert_bounded(self, graph, *args, **kwargs):
+        """Check that max_paths keeps a prefix of the unbounded results."""
+        full = graph.shortest_paths(*args, **kwargs)
+        weight = graph._weight(kwargs.get("parameter")) or (
+            lambda u, v, d: 1)
+
+        def cost(path):
+            ids = [graph.nodes.get(hop) for hop in path]
+            return sum(weight(u, v, {}) for u, v in zip(ids, ids[1:]))
+
+        for max_paths in (1, 2, 5):
+            paths = graph.shortest_paths(*args, max_paths=max_paths,
+                                         **kwargs)
+            self.assertEqual(len(paths), min(max_paths, len(full)))
+            self.assertEqual([cost(path) for path in paths],
+                             [cost(path) for path in full[:max_paths]])
+            for path in paths:
+                self.assertIn(path, full)
+
+    def test_all_shortest_paths(self):
+        """All shortest paths stop after max_paths."""
+        self.setup()
+        for graph in self.graphs:
+            self.assert_bounded(graph, "User1", "User2")
+            self.assert_bounded(graph, "User1", "User2", parameter="delay")
+
+    def test_shortest_simple_paths(self):
+        """Yen's algorithm stops after max_paths, by increasing cost."""
+        self.setup()
+        for graph in self.graphs:
+            graph.set_path_fun(nx.shortest_simple_paths)
+            self.assert_bounded(graph, "User1", "User4", parameter="delay")
+            paths = graph.shortest_paths("User1", "User2", max_paths=3)
+            self.assertEqual(len(paths), 3)
+
+    def test_constrained_paths(self):
+        """Every combination of metrics keeps up to max_paths paths."""
+        self.setup()
+        for graph in self.graphs:
+            results = graph.constrained_flexible_paths(
+                "User1", "User2", 1, max_paths=1, bandwidth=100,
+                ownership="B")
+            self.assertTrue(results)
+            for result in results:
+                self.assertEqual(len(result["paths"]), 1)
+
+    def test_keyword_only(self):
+        """max_paths can not be taken for flexible or a metric by position."""
+        self.setup()
+        graph = self.graphs[0]
+        self.assertRaises(TypeError, graph.constrained_flexible_paths,
+                          "User1", "User2", 1, 1)
+        self.assertRaises(TypeError, graph.minimum_relaxation_paths,
+                          "User1", "User2", 1, 1)
@@ -0,0 +1,61 @@
+"""Module to test the minimum relaxation paths of KytosGraph."""
+from unittest.mock import Mock, patch
+
+# module under test
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestMinimumRelaxation(TestKytosGraph):
+    """Compare minimum relaxation with every combination on TestGraph2."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    metrics = {"delay": 50, "bandwidth": 100, "ownership": "B",
+               "reliability": 3}
+
+    def setup(self):
+        """Build the TestGraph2 topology with all shortest paths."""
+        switches, links = self.generateTopology()
+        self.graph = KytosGraph(cache_size=0)
+        self.graph.update_topology(Mock(switches=switches, links=links))
+
+    def searches(self, *args, **metrics):
+        """Return the minimum relaxation results and the searches run."""
+        method = self.graph._masked_shortest_paths
+        with patch.object(self.graph, "_masked_shortest_paths",
+                          side_effect=method) as search:
+            results = self.graph.minimum_relaxation_paths(*args, **metrics)
+        return results, search.call_count
+
+    def test_first_level_with_paths(self):
+        """Results are the least relaxed ones of every combination."""
+        self.setup()
+        for source, destination in (("User1", "User2"), ("User1", "User3"),
+                                    ("User2", "User4"), ("User1", "User1")):
+            results, _ = self.searches(source, destination, 4,
+                                       **self.metrics)
+            expected = self.graph.constrained_flexible_paths(
+                source, destination, 4, **self.metrics)
+            least = max(len(result["metrics"]) for result in expected)
+            self.assertEqual(results, [result for result in expected
+                                       if len(result["metrics"]) == least])
+
+    def test_stops_at_first_level(self):
+        """A query satisfied without relaxing runs a single search."""
+        self.setup()
+        results, searches = self.searches("User1", "User2", 2,
+                                          bandwidth=100)
+        self.assertEqual(searches, 1)
+        self.assertEqual(results[0]["metrics"], {"bandwidth": 100})
+
+    def test_unreachable(self):
+        """Unreachable destinations are found without searching paths."""
+        self.setup()
+        results, searches = self.searches("User1", "User2", 1,
+                                          bandwidth=10 ** 6, delay=0)
+        self.assertEqual(results, [])
+        self.assertEqual(searches, 0)
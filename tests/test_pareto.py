@@ -0,0 +1,88 @@
+"""Module to test the Pareto paths of KytosGraph."""
+from unittest import TestCase
+from unittest.mock import Mock
+
+# module under test
+from graph import KytosGraph
+from pareto import dominates, label_setting
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestLabelSetting(TestCase):
+    """Test the label-setting search on a small graph."""
+
+    def test_frontier(self):
+        """Only the paths that no other path dominates are returned."""
+        costs = {(0, 1): 5, (1, 3): 5, (0, 2): 1, (2, 3): 1, (0, 3): 9}
+        adjacency = {0: [1, 2, 3], 1: [3], 2: [3], 3: []}
+
+        def extend(vector, node, neighbor):
+            return vector[0] + 1, max(vector[1], costs[(node, neighbor)])
+
+        frontier = label_setting(adjacency.get, 0, 3, (0, 0), extend)
+        self.assertEqual(frontier, [((1, 9), (0, 3)), ((2, 1), (0, 2, 3))])
+        self.assertTrue(dominates((1, 1), (1, 1)))
+        self.assertFalse(dominates((1, 2), (2, 1)))
+
+
+class TestParetoPaths(TestKytosGraph):
+    """Compare the frontier with the flexible paths on TestGraph2."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    metrics = {"delay": 50, "bandwidth": 100, "ownership": "B",
+               "reliability": 3}
+
+    def setup(self):
+        """Build the TestGraph2 topology with all shortest paths."""
+        switches, links = self.generateTopology()
+        self.graph = KytosGraph()
+        self.graph.update_topology(Mock(switches=switches, links=links))
+
+    def test_frontier_answers_every_combination(self):
+        """The frontier has the shortest path of every metric combination."""
+        self.setup()
+        for source, destination in (("User1", "User2"), ("User1", "User3"),
+                                    ("User2", "User4")):
+            frontier = self.graph.pareto_paths(source, destination,
+                                               **self.metrics)
+            flexible = self.graph.constrained_flexible_paths(
+                source, destination, len(self.metrics), **self.metrics)
+            for result in flexible:
+                hops = [len(candidate["paths"][0]) - 1
+                        for candidate in frontier
+                        if candidate["metrics"].items() >=
+                        result["metrics"].items()]
+                self.assertEqual(min(hops), len(result["paths"][0]) - 1)
+
+    def test_values(self):
+        """Each path reports its values and the metrics they satisfy."""
+        self.setup()
+        frontier = self.graph.pareto_paths("User1", "User2", **self.metrics)
+        values = [tuple(result["values"].values()) for result in frontier]
+        self.assertEqual(len(set(values)), len(values))
+        for result in frontier:
+            path = result["paths"][0]
+            links = [self.graph.get_metadata_from_link(endpoint_a, endpoint_b)
+                     for endpoint_a, endpoint_b in zip(path, path[1:])]
+            self.assertEqual(result["values"]["hops"], len(links))
+            delays = [link["delay"] for link in links if "delay" in link]
+            self.assertEqual(result["values"].get("delay"),
+                             max(delays) if delays else None)
+            self.assertEqual("delay" in result["metrics"],
+                             all(delay <= 50 for delay in delays))
+            self.assertEqual(result["values"]["ownership"],
+                             all(link.get("ownership", "B") == "B"
+                                 for link in links))
+
+    def test_same_node(self):
+        """A path to the source itself satisfies every metric."""
+        self.setup()
+        self.assertEqual(self.graph.pareto_paths("User1", "User1",
+                                                 bandwidth=100),
+                         [{"paths": [["User1"]],
+                           "metrics": {"bandwidth": 100},
+                           "values": {"hops": 0}}])
@@ -0,0 +1,172 @@
+"""Module to test the point searches of KytosGraph."""
+from random import Random
+from unittest import TestCase
+from unittest.mock import Mock
+
+import networkx as nx
+
+# module under test
+from graph import KytosGraph
+from search import (Landmarks, astar_predecessors,
+                    bidirectional_predecessors, distances)
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestSearches(TestCase):
+    """Compare the searches with nx.all_shortest_paths on random graphs."""
+
+    @staticmethod
+    def graphs():
+        """Yield random graphs with small integer weights, ties included."""
+        random = Random(7)
+        for seed in range(8):
+            graph = nx.gnm_random_graph(60, 120, seed=seed)
+            for u, v in graph.edges:
+                graph[u][v]["weight"] = random.randint(0 if seed % 2 else 1,
+                                                       3)
+            yield graph
+
+    @staticmethod
+    def paths(source, destination, predecessors):
+        """Return the sorted paths of a predecessors map."""
+        return sorted(KytosGraph._paths_from_predecessors(
+            source, destination, predecessors))
+
+    @staticmethod
+    def expected(graph, source, destination, weight=None):
+        """Return the sorted shortest paths found by networkx.
+
+        networkx repeats the path of a node to itself when it has edges
+        of weight 0, so repeated paths are dropped.
+        """
+        try:
+            paths = nx.all_shortest_paths(graph, source, destination, weight)
+            return sorted(map(list, set(map(tuple, paths))))
+        except nx.NetworkXNoPath:
+            return []
+
+    def test_bidirectional(self):
+        """Searching from both ends finds every shortest path."""
+        for graph in self.graphs():
+            def weight(u, v, graph=graph):
+                return graph[u][v]["weight"]
+            for source, destination in [(0, 59), (3, 41), (10, 10),
+                                        (22, 5)]:
+                self.assertEqual(self.paths(
+                    source, destination, bidirectional_predecessors(
+                        graph.neighbors, source, destination)),
+                    self.expected(graph, source, destination))
+                self.assertEqual(self.paths(
+                    source, destination, bidirectional_predecessors(
+                        graph.neighbors, source, destination, weight)),
+                    self.expected(graph, source, destination, "weight"))
+
+    def test_astar(self):
+        """A* with landmarks finds every shortest path."""
+        for graph in self.graphs():
+            def weight(u, v, graph=graph):
+                return graph[u][v]["weight"]
+            landmarks = Landmarks(graph.neighbors, graph.nodes, weight, 4)
+            for source, destination in [(0, 59), (3, 41), (10, 10),
+                                        (22, 5)]:
+                self.assertEqual(self.paths(
+                    source, destination, astar_predecessors(
+                        graph.neighbors, source, destination, weight,
+                        landmarks.heuristic(destination))),
+                    self.expected(graph, source, destination, "weight"))
+
+    def test_landmark_bounds(self):
+        """Landmarks never bound a distance above its value."""
+        for graph in self.graphs():
+            def weight(u, v, graph=graph):
+                return graph[u][v]["weight"]
+            heuristic = Landmarks(graph.neighbors, graph.nodes, weight,
+                                  4).heuristic(0)
+            for node, distance in distances(graph.neighbors, 0,
+                                            weight).items():
+                self.assertLessEqual(heuristic(node), distance)
+
+    def test_fewer_expansions(self):
+        """Point searches expand fewer nodes than a whole Dijkstra."""
+        graph = nx.grid_2d_graph(30, 30)
+
+        def weight(u, v):
+            return 1 + (u[0] * v[1]) % 3
+
+        def expansions(search, *args):
+            expanded = []
+
+            def neighbors(node):
+                expanded.append(node)
+                return graph.neighbors(node)
+            search(neighbors, *args)
+            return len(expanded)
+
+        source, destination = (0, 0), (5, 6)
+        landmarks = Landmarks(graph.neighbors, graph.nodes, weight)
+        full = expansions(distances, source, weight)
+        self.assertLess(expansions(bidirectional_predecessors, source,
+                                   destination, weight), full / 2)
+        self.assertLess(expansions(astar_predecessors, source, destination,
+                                   weight, landmarks.heuristic(destination)),
+                        full / 2)
+
+
+class TestPointSearches(TestKytosGraph):
+    """Compare the algorithms of KytosGraph on TestGraph2."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    def setup(self):
+        """Build the TestGraph2 topology without caching results."""
+        switches, links = self.generateTopology()
+        self.topology = Mock(switches=switches, links=links)
+        self.links = links
+        self.graph = KytosGraph(cache_size=0)
+        self.graph.update_topology(self.topology)
+
+    def test_same_paths(self):
+        """Every algorithm finds the same shortest paths."""
+        self.setup()
+        for source, destination in (("User1", "User2"), ("User1", "User4"),
+                                    ("User3", "S9"), ("User1", "User1")):
+            for parameter in (None, "delay", "bandwidth"):
+                expected = sorted(self.graph.shortest_paths(
+                    source, destination, parameter, algorithm="dijkstra"))
+                for algorithm in KytosGraph.ALGORITHMS:
+                    self.assertEqual(sorted(self.graph.shortest_paths(
+                        source, destination, parameter,
+                        algorithm=algorithm)), expected)
+
+    def test_landmarks_are_refreshed(self):
+        """Landmarks in use are built again in the background."""
+        self.setup()
+        self.addCleanup(self.graph.shutdown)
+        self.graph.shortest_paths("User1", "User2", "delay",
+                                  algorithm="astar")
+        self.graph._building.result()
+        landmarks = self.graph._snapshot.landmarks["delay"]
+        self.links["S3:1<->S5:1"].deactivate()
+        self.graph.update_topology(self.topology)
+        self.graph._building.result()
+        self.assertIsNot(self.graph._snapshot.landmarks["delay"], landmarks)
+        self.assertEqual(
+            sorted(self.graph.shortest_paths("User1", "User2", "delay",
+                                             algorithm="astar")),
+            sorted(self.graph.shortest_paths("User1", "User2", "delay",
+                                             algorithm="dijkstra")))
+
+    def test_astar_before_landmarks(self):
+        """A* searches from both ends until the landmarks are built."""
+        self.setup()
+        self.graph._builder = Mock()
+        expected = sorted(self.graph.shortest_paths(
+            "User1", "User2", "delay", algorithm="dijkstra"))
+        for _ in range(2):
+            self.assertEqual(sorted(self.graph.shortest_paths(
+                "User1", "User2", "delay", algorithm="astar")), expected)
+        self.assertEqual(self.graph._snapshot.landmarks, {})
+        self.graph._builder.submit.assert_called_once()
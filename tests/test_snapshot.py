@@ -0,0 +1,134 @@
+"""Module to test the graph snapshots of KytosGraph."""
+from threading import Thread
+from unittest.mock import Mock, patch
+
+# module under test
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph1
+
+
+class TestGraphSnapshots(TestKytosGraph):
+    """Test that queries see whole versions of the topology."""
+
+    generateTopology = staticmethod(test_graph1.TestGraph1.generateTopology)
+
+    def setup(self):
+        """Build the graph through update_topology."""
+        self.switches, self.links = self.generateTopology()
+        self.topology = Mock(switches=self.switches, links=self.links)
+        self.graph = KytosGraph()
+        self.graph.update_topology(self.topology)
+
+    def update_in_thread(self):
+        """Apply the current topology from another thread."""
+        thread = Thread(target=self.graph.update_topology,
+                        args=(self.topology,))
+        thread.start()
+        thread.join()
+
+    def test_pinned_query_reads_its_snapshot(self):
+        """Updates published during a query are not seen by it."""
+        self.setup()
+        before = self.get_path("S1", "S2")
+        self.links["S1:1<->S2:1"].deactivate()
+        with self.graph._pinned():
+            version = self.graph.topology_version
+            self.update_in_thread()
+            self.assertEqual(self.graph.topology_version, version)
+            self.assertEqual(self.get_path("S1", "S2"), before)
+        self.assertGreater(self.graph.topology_version, version)
+        self.assertNotEqual(self.get_path("S1", "S2"), before)
+
+    def test_stale_results_are_not_cached(self):
+        """Results of an old snapshot do not reach the cache."""
+        self.setup()
+        self.links["S1:1<->S2:1"].deactivate()
+        with self.graph._pinned():
+            self.update_in_thread()
+            self.get_path("S1", "S2")
+        self.assertEqual(len(self.graph.cache), 0)
+
+    def test_failed_update_is_not_published(self):
+        """An update raising midway leaves the published graph untouched."""
+        self.setup()
+        edges = set(self.graph.graph.edges)
+        version = self.graph.topology_version
+        self.links["S1:1<->S2:1"].deactivate()
+        with patch.object(self.graph, "_remove_edge",
+                          side_effect=RuntimeError):
+            self.assertRaises(RuntimeError, self.graph.update_topology,
+                              self.topology)
+        self.assertEqual(set(self.graph.graph.edges), edges)
+        self.assertEqual(self.graph.topology_version, version)
+
+    def test_concurrent_updates(self):
+        """Queries during updates see either version of the topology."""
+        self.setup()
+        link = self.links["S1:1<->S2:1"]
+        expected = [self.get_path("S1", "S2")]
+        link.deactivate()
+        self.graph.update_topology(self.topology)
+        expected.append(self.get_path("S1", "S2"))
+
+        def toggle():
+            for _ in range(20):
+                link.activate()
+                self.graph.update_topology(self.topology)
+                link.deactivate()
+                self.graph.update_topology(self.topology)
+
+        thread = Thread(target=toggle)
+        thread.start()
+        while thread.is_alive():
+            self.assertIn(self.graph.shortest_paths("S1", "S2"), expected)
+        thread.join()
+
+    def test_updates_share_untouched_structures(self):
+        """An update copies only what it changes of the snapshot."""
+        self.setup()
+        before = self.graph._snapshot
+        edges = set(before.graph.edges)
+        edge_id = before.store.edge_id(before.nodes.get("S1:1"),
+                                       before.nodes.get("S2:1"))
+        metadata = before.store.metadata(edge_id)
+        self.links["S1:1<->S2:1"].extend_metadata({"bandwidth": 5})
+        self.graph.update_links(self.links)
+        after = self.graph._snapshot
+        self.assertIsNot(after, before)
+        node = before.nodes.get("S1:1")
+        self.assertIs(after.graph._adj[node], before.graph._adj[node])
+        self.assertIs(after.nodes.names, before.nodes.names)
+        self.assertIs(after.store.columns["delay"],
+                      before.store.columns["delay"])
+        self.assertIsNot(after.store.columns["bandwidth"],
+                         before.store.columns["bandwidth"])
+
+        self.links["S1:1<->S2:1"].deactivate()
+        self.graph.update_topology(self.topology)
+        self.assertEqual(set(before.graph.edges), edges)
+        self.assertNotEqual(set(self.graph.graph.edges), edges)
+        self.assertEqual(before.store.metadata(edge_id), metadata)
+
+    def test_unchanged_nodes_share_their_neighbors(self):
+        """Updating unchanged switches copies none of their neighbors."""
+        self.setup()
+        before = self.graph._snapshot
+        self.graph.update_nodes(self.switches)
+        after = self.graph._snapshot
+        self.assertIsNot(after, before)
+        for switch in self.switches:
+            node = before.nodes.get(switch)
+            self.assertIs(after.graph._adj[node], before.graph._adj[node])
+
+    def test_reads_do_not_wait_for_the_cache_lock(self):
+        """Queries skip the cache while its lock is taken."""
+        self.setup()
+        expected = self.get_path("S1", "S2")
+        with self.graph._cache_lock:
+            thread = Thread(target=self.get_path, args=("S1", "S2"))
+            thread.start()
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(self.get_path("S1", "S2"), expected)
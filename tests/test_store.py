@@ -0,0 +1,78 @@
+"""Module to test the link attribute store used by KytosGraph."""
+from unittest import TestCase
+from unittest.mock import patch
+
+# module under test
+from store import LinkAttributeStore, NodeInterner
+
+
+class TestLinkAttributeStore(TestCase):
+    """Test the typed columns of LinkAttributeStore."""
+
+    def setUp(self):
+        """Create a store with a numeric and a label column."""
+        self.store = LinkAttributeStore({"bandwidth": "float",
+                                         "ownership": "label"})
+        self.edge_id = self.store.add("A", "B")
+
+    def test_edge_ids(self):
+        """Edges get the same id in both directions and ids are reused."""
+        self.assertEqual(self.store.edge_id("B", "A"), self.edge_id)
+        other = self.store.add("B", "C")
+        self.store.remove("C", "B")
+        self.assertIsNone(self.store.edge_id("B", "C"))
+        self.assertEqual(self.store.add("C", "D"), other)
+        self.assertEqual(len(self.store), 2)
+
+    def test_metadata(self):
+        """Known metrics go to columns and other keys are kept apart."""
+        changed = self.store.update(self.edge_id, {"bandwidth": 10,
+                                                   "ownership": "red",
+                                                   "custom": [1]})
+        self.assertTrue(changed)
+        self.assertEqual(self.store.metadata(self.edge_id),
+                         {"bandwidth": 10, "ownership": "red",
+                          "custom": [1]})
+        self.assertFalse(self.store.update(self.edge_id, {"bandwidth": 10}))
+
+    def test_rejects_values_of_another_type(self):
+        """Values not matching the column type are not stored."""
+        with patch("store.log") as log:
+            changed = self.store.update(self.edge_id, {"bandwidth": "fast",
+                                                       "ownership": 1})
+        self.assertFalse(changed)
+        self.assertEqual(log.warning.call_count, 2)
+        self.assertEqual(self.store.metadata(self.edge_id), {})
+
+    def test_replace(self):
+        """Replacing metadata drops the keys that are not given."""
+        self.store.update(self.edge_id, {"bandwidth": 10, "custom": 1})
+        self.assertTrue(self.store.replace(self.edge_id, {"bandwidth": 10}))
+        self.assertFalse(self.store.replace(self.edge_id, {"bandwidth": 10}))
+        self.assertEqual(self.store.metadata(self.edge_id), {"bandwidth": 10})
+
+    def test_weight(self):
+        """Weight functions read the columns, defaulting to 1."""
+        self.store.update(self.edge_id, {"bandwidth": 10, "custom": 3})
+        self.store.add("B", "C")
+        bandwidth = self.store.weight("bandwidth")
+        self.assertEqual(bandwidth("B", "A", {}), 10)
+        self.assertEqual(bandwidth("B", "C", {}), 1)
+        self.assertEqual(self.store.weight("custom")("A", "B", {}), 3)
+
+
+class TestNodeInterner(TestCase):
+    """Test the integer ids of NodeInterner."""
+
+    def test_ids(self):
+        """Names get dense ids, and released ids are reused."""
+        nodes = NodeInterner()
+        self.assertEqual([nodes.intern(name) for name in "ABCA"],
+                         [0, 1, 2, 0])
+        nodes.release("B")
+        self.assertNotIn("B", nodes)
+        self.assertIsNone(nodes.get("B"))
+        self.assertIsNone(nodes.get(["B"]))
+        self.assertEqual(nodes.intern("D"), 1)
+        self.assertEqual(nodes.path([2, 1, 0]), ["C", "D", "A"])
+        self.assertEqual(len(nodes), 3)
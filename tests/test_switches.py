@@ -0,0 +1,122 @@
+"""Module to test the switch-level searches of KytosGraph."""
+from itertools import product
+from unittest.mock import Mock
+
+# module under test
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph1, test_graph2
+
+
+class TestSwitchSearches(TestKytosGraph):
+    """Compare switch-level searches with searching the whole graph."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    def setup(self):
+        """Build the topology without caching results."""
+        switches, self.links = self.generateTopology()
+        self.topology = Mock(switches=switches, links=self.links)
+        self.graph = KytosGraph(cache_size=0)
+        self.graph.update_topology(self.topology)
+
+    def assert_same_paths(self, nodes, **kwargs):
+        """Check every pair of nodes against the search of the graph."""
+        for source, destination in product(nodes, repeat=2):
+            for parameter in (None, "delay"):
+                expected = sorted(self.graph.shortest_paths(
+                    source, destination, parameter, algorithm="dijkstra",
+                    **kwargs))
+                for algorithm in ("bidirectional", "astar"):
+                    self.assertEqual(sorted(self.graph.shortest_paths(
+                        source, destination, parameter, algorithm=algorithm,
+                        **kwargs)), expected)
+
+    def test_switch_graph(self):
+        """Links become annotated edges between switches."""
+        self.setup()
+        switches = self.graph._switch_graph()
+        self.assertIsNotNone(switches)
+        names = self.graph.nodes.names
+        links = {(names[switch], names[neighbor]):
+                 sorted((names[interface], names[other])
+                        for interface, other in pairs)
+                 for switch, neighbors in switches.links.items()
+                 for neighbor, pairs in neighbors.items()}
+        self.assertEqual(links[("S5", "S6")],
+                         [("S5:3", "S6:1"), ("S5:4", "S6:2")])
+        self.assertEqual(links[("S6", "S5")],
+                         [("S6:1", "S5:3"), ("S6:2", "S5:4")])
+
+    def test_same_paths(self):
+        """Paths between switches and interfaces are those of the graph."""
+        self.setup()
+        self.assert_same_paths(["User1", "User2", "S5", "S6:1", "S5:3",
+                                "User1:1", "S8", "X"])
+
+    def test_masked_paths(self):
+        """Hops through undesired links are left out."""
+        self.setup()
+        self.assert_same_paths(["User1", "S6:1", "S5:3", "User2"],
+                               undesired=[("S5:3", "S6:1")])
+
+    def test_only_switches_are_searched(self):
+        """The search never visits interfaces other than the endpoints."""
+        self.setup()
+        switches = self.graph._switch_graph()
+        visited = []
+        view = switches.view
+        ids = [self.graph.nodes.get(name) for name in ("User1:1", "S6:1")]
+
+        def spy(*args):
+            found = view(*args)
+            neighbors = found.neighbors
+
+            def recorded(node):
+                visited.append(node)
+                return neighbors(node)
+            found.neighbors = recorded
+            return found
+        switches.view = spy
+        self.graph.shortest_paths("User1:1", "S6:1", algorithm="bidirectional")
+        self.assertTrue(visited)
+        self.assertFalse(set(visited) - set(ids) & set(switches.switch_of))
+
+    def test_not_a_switch_graph(self):
+        """Graphs with links outside interfaces are searched as they are."""
+        self.setup()
+        graph = KytosGraph(cache_size=0)
+        switches, links = test_graph1.TestGraph1.generateTopology()
+        graph.update_topology(Mock(switches=switches, links=links))
+        self.assertIsNotNone(graph._switch_graph())
+        graph._snapshot.graph.add_edge(graph.nodes.get("S1"),
+                                       graph.nodes.get("S2"))
+        graph._snapshot.switches = None
+        self.assertIsNone(graph._switch_graph())
+
+    def test_interfaces_from_topology(self):
+        """Interfaces belong to the switches listing them, whatever the ids."""
+        interfaces = {"A": ["port-1", "port-2"], "B": ["port-3"],
+                      "C": ["port-4"]}
+        switches = {name: Mock(id=name, interfaces={
+            port: Mock(id=port) for port in ports})
+                    for name, ports in interfaces.items()}
+        links = {}
+        for endpoint_a, endpoint_b in (("port-1", "port-3"),
+                                       ("port-2", "port-4")):
+            link = Mock(endpoint_a=Mock(id=endpoint_a),
+                        endpoint_b=Mock(id=endpoint_b), metadata={})
+            link.is_active.return_value = True
+            links[f"{endpoint_a}<->{endpoint_b}"] = link
+        self.graph = KytosGraph(cache_size=0)
+        self.graph.update_topology(Mock(switches=switches, links=links))
+        switch_graph = self.graph._switch_graph()
+        self.assertIsNotNone(switch_graph)
+        names = self.graph.nodes.names
+        self.assertEqual({names[interface]: names[switch] for interface,
+                          switch in switch_graph.switch_of.items()},
+                         {port: name for name, ports in interfaces.items()
+                          for port in ports})
+        self.assert_same_paths(["A", "B", "C", "port-3"])
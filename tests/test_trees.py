@@ -0,0 +1,173 @@
+"""Module to test the shortest path trees of KytosGraph."""
+from random import Random
+from unittest import TestCase
+from unittest.mock import Mock
+
+import networkx as nx
+
+# module under test
+from graph import KytosGraph
+from trees import shortest_path_tree
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestPathTree(TestCase):
+    """Compare the trees with nx.all_shortest_paths."""
+
+    def test_all_shortest_paths(self):
+        """Every shortest path is read from the tree, weighted or not."""
+        random = Random(5)
+        for seed in range(6):
+            graph = nx.gnm_random_graph(40, 90, seed=seed)
+            for u, v in graph.edges:
+                graph[u][v]["weight"] = random.randint(1, 3)
+
+            def weight(u, v, graph=graph):
+                return graph[u][v]["weight"]
+            for cost in (None, weight):
+                tree = shortest_path_tree(graph.neighbors, 0, cost)
+                for destination in (0, 17, 39):
+                    try:
+                        expected = sorted(nx.all_shortest_paths(
+                            graph, 0, destination,
+                            None if cost is None else "weight"))
+                    except nx.NetworkXNoPath:
+                        expected = []
+                    self.assertEqual(
+                        sorted(KytosGraph._paths_from_predecessors(
+                            0, destination, tree.predecessors)), expected)
+
+    def test_repaired(self):
+        """Repaired trees are the trees grown again after the changes."""
+        random = Random(7)
+        for seed in range(20):
+            graph = nx.gnm_random_graph(30, 60, seed=seed)
+            for u, v in graph.edges:
+                graph[u][v]["weight"] = random.randint(1, 4)
+
+            def weight(u, v, graph=graph):
+                return graph[u][v]["weight"]
+            cost = weight if seed % 2 else None
+            tree = shortest_path_tree(graph.neighbors, 0, cost)
+            removed, added = [], []
+            for u, v in random.sample(list(graph.edges), 4):
+                graph.remove_edge(u, v)
+                removed.append((u, v))
+            while len(added) < 4:
+                u, v = random.sample(range(30), 2)
+                if not graph.has_edge(u, v):
+                    graph.add_edge(u, v, weight=random.randint(1, 4))
+                    added.append((u, v))
+            for u, v in random.sample(list(graph.edges), 4):
+                graph[u][v]["weight"] = random.randint(1, 4)
+                removed.append((u, v))
+                added.append((u, v))
+            added = [edge for edge in added if graph.has_edge(*edge)]
+            repaired = tree.repaired(graph.neighbors, removed, added, cost)
+            expected = shortest_path_tree(graph.neighbors, 0, cost)
+            self.assertEqual(repaired.distance, expected.distance)
+            self.assertEqual(
+                {node: set(previous)
+                 for node, previous in repaired.predecessors.items()},
+                {node: set(previous)
+                 for node, previous in expected.predecessors.items()})
+
+    def test_not_repaired_with_zero_costs(self):
+        """Trees with edges costing 0 must be grown again."""
+        graph = nx.path_graph(4)
+        tree = shortest_path_tree(graph.neighbors, 0, lambda u, v: 0)
+        self.assertIsNone(tree.repaired(graph.neighbors, [(1, 2)]))
+        tree = shortest_path_tree(graph.neighbors, 0)
+        self.assertIsNone(tree.repaired(graph.neighbors, (), [(1, 2)],
+                                        lambda u, v: 0))
+
+    def test_stats(self):
+        """Trees count their predecessors and estimate their bytes."""
+        tree = shortest_path_tree(nx.cycle_graph(4).neighbors, 0)
+        self.assertEqual(tree.distance, {0: 0, 1: 1, 3: 1, 2: 2})
+        self.assertEqual(tree.entries, 4)
+        self.assertGreater(tree.size(), 0)
+
+
+class TestStoredTrees(TestKytosGraph):
+    """Answer queries on TestGraph2 from the stored trees."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    def setup(self, sources=("User1",)):
+        """Build the topology growing the trees of some sources."""
+        switches, self.links = self.generateTopology()
+        self.topology = Mock(switches=switches, links=self.links)
+        self.graph = KytosGraph(cache_size=0, tree_sources=sources,
+                                tree_parameters=[None, "delay"])
+        self.graph.update_topology(self.topology)
+        self.graph._building.result()
+
+    def assert_same_paths(self):
+        """Check the trees against searching from the source."""
+        for source, destination in (("User1", "User2"), ("User4", "User1"),
+                                    ("User1", "User1"), ("User1", "X"),
+                                    ("User3", "S9")):
+            for parameter in (None, "delay"):
+                self.assertEqual(
+                    sorted(self.graph.shortest_paths(source, destination,
+                                                     parameter)),
+                    sorted(self.graph.shortest_paths(
+                        source, destination, parameter,
+                        algorithm="dijkstra")))
+
+    def test_answers_from_trees(self):
+        """Queries from or to a hot source are read from its tree."""
+        self.setup()
+        self.assertTrue(self.graph.trees_ready)
+        user1 = self.graph.nodes.get("User1")
+        self.assertEqual(set(self.graph._snapshot.trees[None]), {user1})
+        self.assert_same_paths()
+        with self.graph._pinned():
+            self.assertIsNotNone(self.graph._tree_paths(
+                self.graph.nodes.get("User2"), user1, "delay", None))
+        stats = self.graph.tree_stats()
+        self.assertTrue(stats["ready"])
+        self.assertEqual(stats["trees"], 2)
+        self.assertGreater(stats["predecessors"], 0)
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_all_switches(self):
+        """Every switch gets a tree, and no interface does."""
+        self.setup("switches")
+        names = self.graph.nodes.path(self.graph._snapshot.trees["delay"])
+        self.assertIn("S1", names)
+        self.assertNotIn("S1:1", names)
+        self.assert_same_paths()
+
+    def test_repaired_after_updates(self):
+        """Link changes repair the trees when the update is published."""
+        self.setup()
+        self.graph.shutdown()
+        self.graph._builder = Mock()
+        for change in (self.links["S3:1<->S5:1"].deactivate,
+                       self.links["S1:1<->S2:1"].deactivate,
+                       self.links["S3:1<->S5:1"].activate):
+            change()
+            self.graph.update_topology(self.topology)
+            self.assertFalse(self.graph.trees_ready)
+            self.assertEqual(self.graph.tree_stats()["trees"], 2)
+            self.assert_same_paths()
+        self.graph._builder = None
+        self.graph._build_in_background(self.graph._snapshot)
+        self.graph._building.result()
+        self.assertTrue(self.graph.trees_ready)
+        self.assert_same_paths()
+
+    def test_grown_after_rebuilds(self):
+        """Rebuilding the graph searches as before until trees are grown."""
+        self.setup()
+        self.graph.shutdown()
+        self.graph._builder = Mock()
+        self.graph.incremental = False
+        self.graph.update_topology(self.topology)
+        self.assertEqual(self.graph.tree_stats()["trees"], 0)
+        self.assert_same_paths()
@@ -0,0 +1,72 @@
+"""Module to test the parallel flexible searches of KytosGraph."""
+from time import sleep
+from unittest import skipUnless
+from unittest.mock import Mock, patch
+
+# module under test
+from csr import CSRGraph
+from graph import KytosGraph
+
+from tests.test_graph import TestKytosGraph
+from tests import test_graph2
+
+
+class TestFlexibleWorkers(TestKytosGraph):
+    """Compare searches on worker pools with sequential searches."""
+
+    generateTopology = staticmethod(
+        test_graph2.TestKytosGraph.generateTopology)
+
+    metrics = {"delay": 50, "bandwidth": 100, "ownership": "B",
+               "reliability": 3}
+
+    def setup(self, **kwargs):
+        """Build a graph with the given options and a sequential one."""
+        switches, links = self.generateTopology()
+        topology = Mock(switches=switches, links=links)
+        self.graph = KytosGraph(cache_size=0, **kwargs)
+        self.graph.update_topology(topology)
+        self.addCleanup(self.graph.shutdown)
+        self.expected = KytosGraph(cache_size=0)
+        self.expected.update_topology(topology)
+
+    def assert_same_results(self):
+        """Check that every flexible search gets the sequential results."""
+        for flexible in range(len(self.metrics) + 1):
+            result = self.graph.constrained_flexible_paths(
+                "User1", "User2", flexible, **self.metrics)
+            expected = self.expected.constrained_flexible_paths(
+                "User1", "User2", flexible, **self.metrics)
+            self.assertEqual([r["metrics"] for r in result],
+                             [r["metrics"] for r in expected])
+            for paths, expected_paths in zip(result, expected):
+                self.assertEqual(sorted(paths["paths"]),
+                                 sorted(expected_paths["paths"]))
+
+    def test_thread_workers(self):
+        """Thread workers keep the order of the combinations."""
+        self.setup(workers=4)
+        self.assert_same_results()
+
+    @skipUnless(CSRGraph.available(), "scipy is not installed")
+    def test_process_workers(self):
+        """Process workers search the CSR graph in shared memory."""
+        self.setup(workers=2, executor="process", backend="csr")
+        self.assert_same_results()
+
+    @skipUnless(CSRGraph.available(), "scipy is not installed")
+    def test_process_workers_are_spawned(self):
+        """Worker processes do not fork the threads of the napp."""
+        self.setup(workers=2, executor="process", backend="csr")
+        pool = self.graph.pool._executor()
+        self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+
+    def test_deadline(self):
+        """Searches not done by the deadline raise TimeoutError."""
+        for workers in (0, 4):
+            self.setup(workers=workers, deadline=0.05)
+            with patch.object(self.graph, "_masked_shortest_paths",
+                              side_effect=lambda *args: sleep(0.2)):
+                self.assertRaises(TimeoutError,
+                                  self.graph.constrained_flexible_paths,
+                                  "User1", "User2", 2, **self.metrics)
@@ -0,0 +1,209 @@
+"""Module Trees of kytos/pathfinder Kytos Network Application."""
+
+from heapq import heapify, heappop, heappush
+from itertools import count
+from math import inf
+from sys import getsizeof
+
+
+class PathTree:
+    """Every shortest path from a source, kept as predecessor lists.
+
+    Each node reached maps to its distance from the source and to all its
+    neighbors on a shortest path to it, so the shortest paths to a node
+    are read backwards from it in time proportional to their length.
+    Positive tells whether every edge of the tree costs more than 0, which
+    repairing it needs.
+    """
+
+    def __init__(self, source, predecessors, distance, positive=True):
+        self.source = source
+        self.predecessors = predecessors
+        self.distance = distance
+        self.positive = positive
+
+    @property
+    def entries(self):
+        """Return the number of predecessors kept by the tree."""
+        return sum(len(previous) for previous in self.predecessors.values())
+
+    def size(self):
+        """Return an estimate of the bytes taken by the tree."""
+        return (getsizeof(self.predecessors) + getsizeof(self.distance) +
+                sum(getsizeof(previous)
+                    for previous in self.predecessors.values()))
+
+    def repaired(self, neighbors, removed=(), added=(), weight=None):
+        """Return a copy of the tree repaired after some edges changed.
+
+        Removed holds the edges removed or made more expensive, and added
+        the edges added or made cheaper, so an edge whose cost changed
+        either way may be in both. Neighbors and weight describe the graph
+        after the changes, as in shortest_path_tree. Following Ramalingam
+        and Reps, only the nodes whose distance grew are searched again,
+        from the nodes around them, and the nodes whose distance shrank
+        are searched from the added edges. Return None when some edge
+        costs 0 or less, and the tree must be grown again.
+        """
+        if not self.positive:
+            return None
+
+        def cost(endpoint_a, endpoint_b):
+            value = 1 if weight is None else weight(endpoint_a, endpoint_b)
+            if value <= 0:
+                raise ValueError(value)
+            return value
+
+        tree = PathTree(self.source, {
+            node: list(previous)
+            for node, previous in self.predecessors.items()},
+            dict(self.distance))
+        try:
+            shorter = tree._reattach(neighbors, cost,
+                                     tree._detach(neighbors, removed))
+            tree._relax(neighbors, cost, list(added) + shorter)
+        except ValueError:
+            return None
+        return tree
+
+    def _detach(self, neighbors, removed):
+        """Drop the predecessors lost with the removed edges.
+
+        Nodes left without predecessors are further away now, so they
+        are dropped as predecessors of their neighbors in turn. Return
+        those nodes.
+        """
+        predecessors = self.predecessors
+        affected = set()
+        stack = []
+
+        def drop(node, previous):
+            if previous in predecessors.get(node, ()):
+                predecessors[node].remove(previous)
+                if not predecessors[node] and node != self.source:
+                    affected.add(node)
+                    stack.append(node)
+
+        for endpoint_a, endpoint_b in removed:
+            drop(endpoint_a, endpoint_b)
+            drop(endpoint_b, endpoint_a)
+        while stack:
+            node = stack.pop()
+            for neighbor in neighbors(node):
+                drop(neighbor, node)
+        return affected
+
+    def _reattach(self, neighbors, cost, affected):
+        """Search the distances of the affected nodes again.
+
+        The search starts from the distances through the other neighbors
+        of each affected node and only visits affected nodes. Those that
+        are not reached any more are left out of the tree. An edge may not
+        have got more expensive after all, so nodes found at the same
+        distance again are put back as predecessors, and the edges leading
+        to shorter distances are returned to be relaxed.
+        """
+        predecessors, distance = self.predecessors, self.distance
+        for node in affected:
+            del predecessors[node], distance[node]
+        shorter = []
+        tie = count()
+        heap = []
+        for node in affected:
+            best = min((distance[neighbor] + cost(neighbor, node)
+                        for neighbor in neighbors(node)
+                        if neighbor in distance), default=inf)
+            if best < inf:
+                heap.append((best, next(tie), node))
+        heapify(heap)
+        while heap:
+            total, _, node = heappop(heap)
+            if node in distance:
+                continue
+            distance[node] = total
+            predecessors[node] = [
+                neighbor for neighbor in neighbors(node)
+                if neighbor != node and neighbor in distance and
+                distance[neighbor] + cost(neighbor, node) == total]
+            for neighbor in neighbors(node):
+                if neighbor == node:
+                    continue
+                through = total + cost(node, neighbor)
+                if neighbor not in distance:
+                    if neighbor in affected:
+                        heappush(heap, (through, next(tie), neighbor))
+                elif through < distance[neighbor]:
+                    shorter.append((node, neighbor))
+                elif through == distance[neighbor] and \
+                        node not in predecessors[neighbor]:
+                    predecessors[neighbor].append(node)
+        return shorter
+
+    def _relax(self, neighbors, cost, added):
+        """Spread the shorter distances found through the added edges.
+
+        Nodes whose distance shrank take their predecessors among all
+        their neighbors once their distance is final.
+        """
+        predecessors, distance = self.predecessors, self.distance
+        tie = count()
+        heap = []
+
+        def reach(node, neighbor):
+            total = distance[node] + cost(node, neighbor)
+            if total < distance.get(neighbor, inf):
+                distance[neighbor] = total
+                predecessors[neighbor] = [node]
+                heappush(heap, (total, next(tie), neighbor))
+            elif total == distance[neighbor] and \
+                    node not in predecessors[neighbor]:
+                predecessors[neighbor].append(node)
+
+        for endpoint_a, endpoint_b in added:
+            for node, neighbor in ((endpoint_a, endpoint_b),
+                                   (endpoint_b, endpoint_a)):
+                if node in distance:
+                    reach(node, neighbor)
+        while heap:
+            total, _, node = heappop(heap)
+            if total > distance[node]:
+                continue
+            predecessors[node] = [
+                neighbor for neighbor in neighbors(node)
+                if neighbor != node and
+                distance.get(neighbor, inf) + cost(neighbor, node) == total]
+            for neighbor in neighbors(node):
+                if neighbor != node:
+                    reach(node, neighbor)
+
+
+def shortest_path_tree(neighbors, source, weight=None):
+    """Return the PathTree of a source, keeping every tied predecessor.
+
+    Weight is called with the endpoints of an edge and returns its cost,
+    and every edge costs 1 when it is None. Edges are undirected.
+    """
+    distance = {source: 0}
+    predecessors = {source: []}
+    positive = True
+    settled = set()
+    tie = count()
+    heap = [(0, next(tie), source)]
+    while heap:
+        cost, _, node = heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        for neighbor in neighbors(node):
+            if neighbor == node:
+                continue
+            edge = 1 if weight is None else weight(node, neighbor)
+            positive = positive and edge > 0
+            total = cost + edge
+            if total < distance.get(neighbor, inf):
+                distance[neighbor] = total
+                predecessors[neighbor] = [node]
+                heappush(heap, (total, next(tie), neighbor))
+            elif total == distance[neighbor]:
+                predecessors[neighbor].append(node)
+    return PathTree(source, predecessors, distance, positive)